@@ -0,0 +1 @@
+"""Command line interface for git-camus."""
@@ -0,0 +1,907 @@
+"""CLI commands for git-camus."""
+
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Optional, TextIO
+
+import click
+
+from ..core import tracing
+from ..core.cache import MessageCache
+from ..core.config import LatencyProfile, get_config_values, settings
+from ..core.deadline import Deadline, DeadlineExceeded
+from ..core.fallback import fallback_commit_message
+from ..core.git_operations import (
+    can_commit_with_plumbing,
+    check_git_repository,
+    commit_with_plumbing,
+    get_git_diff,
+    get_git_status,
+    get_head,
+    get_index_tree,
+    get_tree_diff,
+    has_staged_changes,
+    perform_git_commit,
+)
+from ..core.health import HealthCache
+from ..core.hook import install_hook, prepare_commit_msg
+from ..core.history import HistoryCache
+from ..core.host_pool import HostPool, split_hosts
+from ..core.lazy import lazy_import
+from ..core.ollama_client import (
+    REQUEST_TIMEOUT,
+    OllamaClient,
+    OllamaRequest,
+    OllamaUnavailable,
+)
+from ..core.refine import Conversation, refine_interactively
+from ..core.router import ModelRouter, resolve_model
+from ..core.similarity import RecentMessages
+from ..core.split import ChangeGroup, commit_groups, split_staged_changes
+from ..core.stats import RunLog, run_record, summarize
+from ..core.throughput import ThroughputStats
+from ..core.timings import Timings
+
+if TYPE_CHECKING:
+    import httpx
+else:
+    httpx = lazy_import("httpx")
+
+
+# Name of the model built by `git-camus model build` unless configured otherwise
+DEFAULT_DERIVED_MODEL = "git-camus"
+
+# Instruction sent when a generated message repeats a recent one
+DIVERSITY_HINT = (
+    'That repeats a recent commit message of this repository: "{repeated}". '
+    "Write a different message, with other images and other wording."
+)
+
+
+def make_router() -> Optional[ModelRouter]:
+    """Create the model router configured in the settings.
+
+    Returns:
+        Optional[ModelRouter]: The router, or None if routing is off
+    """
+    if not settings.run.routes:
+        return None
+    return ModelRouter(settings.run.routes, ThroughputStats.for_user())
+
+
+def resolve_profile(name: Optional[str]) -> LatencyProfile:
+    """Look up a latency profile by name.
+
+    Args:
+        name: The profile name, the configured one if None
+
+    Returns:
+        LatencyProfile: The profile
+
+    Raises:
+        SystemExit: If there is no profile with that name
+    """
+    name = name or settings.run.latency_profile
+    if name not in settings.profiles:
+        click.echo(
+            f"Error: Unknown latency profile '{name}', expected one of: "
+            f"{', '.join(settings.profiles)}",
+            err=True,
+        )
+        sys.exit(1)
+    return settings.profiles[name]
+
+
+def make_client(ollama_host: str) -> OllamaClient:
+    """Create an Ollama client configured from the settings.
+
+    Args:
+        ollama_host: The Ollama host URL, or several separated by commas
+
+    Returns:
+        OllamaClient: The client
+    """
+    pool = HostPool.for_user(
+        split_hosts(ollama_host),
+        eject_after=settings.ollama.eject_after,
+        eject_seconds=settings.ollama.eject_seconds,
+        hedge_percentile=settings.ollama.hedge_percentile,
+    )
+    return OllamaClient(
+        ollama_host,
+        health_cache=HealthCache.for_user(settings.ollama.health_ttl),
+        pool=pool,
+        hedge=settings.ollama.hedge,
+        keep_alive=settings.ollama.keep_alive,
+    )
+
+
+def call_with_context(
+    client: OllamaClient,
+    request_data: OllamaRequest,
+    model_name: str,
+    follow_up: Optional[str],
+    deadline: Deadline,
+) -> dict[str, Any]:
+    """Generate a message, continuing the last conversation about the staged tree.
+
+    When the previous run generated for the same staged tree and model, only
+    the follow-up instruction is sent together with the stored context, so the
+    server does not process the instructions and the diff again.
+
+    Args:
+        client: The Ollama client to generate with
+        request_data: The full formatted request data
+        model_name: The model to use
+        follow_up: The instruction to send on top of the stored context, if any
+        deadline: The latency budget the request has to fit in
+
+    Returns:
+        dict[str, Any]: The API response containing the generated message
+    """
+    cache = MessageCache.for_repository()
+    tree = get_index_tree() if cache else ""
+    context = cache.get_context(tree, model_name) if cache else None
+
+    if context:
+        if follow_up is None:
+            follow_up = "Write another commit message for the same changes."
+        request_data = {**request_data, "messages": [{"role": "user", "content": follow_up}]}
+    else:
+        context = []
+
+    response = client.call_api(request_data, deadline=deadline, context=context)
+    if cache and isinstance(response.get("context"), list):
+        cache.put_context(tree, model_name, response["context"])
+    return response
+
+
+def find_examples(client: OllamaClient, diff: str, deadline: Deadline) -> Optional[list[str]]:
+    """Find earlier commit messages of the repository similar to the staged changes.
+
+    Examples only improve the message, so any problem finding them is
+    reported and the message is generated without them.
+
+    Args:
+        client: The Ollama client to embed with
+        diff: The staged diff
+        deadline: The latency budget the requests have to fit in
+
+    Returns:
+        Optional[list[str]]: Up to run.few_shot messages, or None if few-shot
+        examples are off or cannot be found
+    """
+    if settings.run.few_shot <= 0:
+        return None
+    try:
+        # NumPy is optional and only needed here
+        from ..core.examples import ExampleIndex
+    except ImportError:
+        click.echo("git-camus: run.few_shot needs NumPy, see git-camus[examples]", err=True)
+        return None
+    index = ExampleIndex.for_repository(settings.run.embedding_model)
+    if index is None:
+        return None
+    try:
+        return index.search(client, diff, settings.run.few_shot, deadline) or None
+    except (httpx.HTTPError, ValueError, DeadlineExceeded) as e:
+        click.echo(f"git-camus: no commit examples: {e}", err=True)
+        return None
+
+
+def read_history() -> Optional[list[str]]:
+    """Read the subjects of the latest commits for the prompt.
+
+    Returns:
+        Optional[list[str]]: Up to run.history subjects, newest first, or None
+        if history context is off or there is no history
+    """
+    if settings.run.history <= 0:
+        return None
+    cache = HistoryCache.for_repository()
+    return (cache.subjects(settings.run.history) or None) if cache else None
+
+
+def read_staged_changes() -> tuple[str, str]:
+    """Read the status and diff of the staged changes, exiting if there are none.
+
+    Nothing is committed when git cannot be read, as a message made up
+    without the changes would describe nothing. Git is waited for however
+    long it takes: the latency budget only bounds the wait for Ollama.
+
+    Returns:
+        tuple[str, str]: The git status and the staged diff
+    """
+    status = get_git_status()
+    if not has_staged_changes(status):
+        click.echo("No staged changes to commit.", err=True)
+        sys.exit(0)
+    diff = get_git_diff()
+    if not diff:
+        # Every staged change has at least a header, so git failed
+        click.echo("Error: cannot read the staged diff", err=True)
+        sys.exit(1)
+    return status, diff
+
+
+def find_revision(diff: str, model_name: str) -> Optional[tuple[str, str]]:
+    """Find the previewed message that the staged changes extend.
+
+    After `--show`, staging more files and running again only needs the
+    model to revise the previewed message for what was staged since.
+
+    Args:
+        diff: The diff of all staged changes
+        model_name: The model to generate with
+
+    Returns:
+        Optional[tuple[str, str]]: The previewed message and the diff staged
+        since, or None if there is no preview on the current commit or the
+        new diff is not smaller than the full one
+    """
+    if not settings.run.revise_preview:
+        return None
+    cache = MessageCache.for_repository()
+    preview = cache.get_preview(get_head(), model_name) if cache else None
+    if not preview:
+        return None
+    tree, message = preview
+    current = get_index_tree()
+    if not current or current == tree:
+        return None
+    delta = get_tree_diff(tree, current)
+    if not delta or len(delta) >= len(diff):
+        return None
+    return message, delta
+
+
+def find_repeat(
+    recent: RecentMessages, message: str, client: OllamaClient, deadline: Deadline
+) -> Optional[str]:
+    """Find a recent commit message that a generated one repeats.
+
+    The wording is compared first, from the stored MinHash signatures, if
+    run.repeat_threshold is set; only if that finds no repeat and
+    run.repeat_embedding_threshold is set are the meanings compared with
+    embeddings.
+
+    Args:
+        recent: The latest commit messages of the repository
+        message: The generated message
+        client: The Ollama client to embed with
+        deadline: The latency budget the request has to fit in
+
+    Returns:
+        Optional[str]: The repeated message, or None if the message is new enough
+    """
+    if settings.run.repeat_threshold > 0:
+        repeated, score = recent.closest(message)
+        if repeated is not None and score >= settings.run.repeat_threshold:
+            return repeated
+    threshold = settings.run.repeat_embedding_threshold
+    if threshold is None:
+        return None
+    try:
+        repeated, score = recent.closest_by_meaning(
+            message,
+            client,
+            settings.run.embedding_model,
+            deadline.timeout(REQUEST_TIMEOUT),
+        )
+    except (httpx.HTTPError, ValueError) as e:
+        click.echo(f"git-camus: cannot compare with recent messages: {e}", err=True)
+        return None
+    return repeated if score >= threshold else None
+
+
+def regenerate_if_repeated(
+    client: OllamaClient,
+    request_data: OllamaRequest,
+    response: dict[str, Any],
+    recent: RecentMessages,
+    deadline: Deadline,
+) -> dict[str, Any]:
+    """Generate the message once more if it repeats a recent one.
+
+    The second request continues the conversation with the repeated message
+    quoted, so the model knows what to steer away from. It is kept even if
+    it is still similar: one retry bounds the cost of the check.
+
+    Args:
+        client: The Ollama client to generate with
+        request_data: The request that produced the response
+        response: The API response holding the generated message
+        recent: The latest commit messages of the repository
+        deadline: The latency budget the requests have to fit in
+
+    Returns:
+        dict[str, Any]: The response to use
+    """
+    message = response.get("message", {}).get("content", "").strip()
+    repeated = find_repeat(recent, message, client, deadline) if message else None
+    if repeated is None:
+        return response
+    retry: OllamaRequest = {
+        **request_data,
+        "messages": [
+            *request_data["messages"],
+            {"role": "assistant", "content": message},
+            {"role": "user", "content": DIVERSITY_HINT.format(repeated=repeated)},
+        ],
+    }
+    second = client.call_api(retry, deadline=deadline)
+    return second if second.get("message", {}).get("content", "").strip() else response
+
+
+def run_git_camus(
+    show: bool = False,
+    message: Optional[str] = None,
+    deadline: Optional[float] = None,
+    interactive: bool = False,
+    latency: Optional[str] = None,
+    timings: Optional[str] = None,
+) -> None:
+    """Run the main git-camus logic.
+
+    Args:
+        show: If True, show the message without committing
+        message: Optional context message to include in the prompt
+        deadline: Seconds before giving up on Ollama and using a local message
+        interactive: If True, let the developer refine the message before using it
+        latency: Name of the latency profile to generate with, the configured one if None
+        timings: Print how long each phase took, as "text" or "json"
+    """
+    clock = Timings()
+
+    # Check if we're in a git repository
+    check_git_repository()
+
+    # Get configuration
+    ollama_host, model_name, prompt_message = get_config_values()
+    model_name, system_prompt = resolve_model(model_name)
+    profile = resolve_profile(latency)
+    budget = Deadline(deadline if deadline is not None else settings.run.deadline)
+
+    # Initialize Ollama client, loading the model while git does its part
+    client = make_client(ollama_host)
+    router = make_router()
+    if settings.run.auto_warm:
+        # Most commits are small, so with routing the smallest tier's model is the likely one
+        client.warm_async(router.tiers[0].models[0] if router else model_name)
+
+    status = diff = ""
+    fallback_used = False
+    conversation: Optional[Conversation] = None
+    recent: Optional[RecentMessages] = None
+    # Get git status and diff; a message is only ever made from the real changes
+    with clock.phase("git"):
+        status, diff = read_staged_changes()
+
+    try:
+        with clock.phase("health"):
+            if not client.is_available(budget.timeout(settings.ollama.health_timeout)):
+                raise OllamaUnavailable(f"Ollama is not reachable at {ollama_host}")
+
+        with clock.phase("prompt"):
+            # Pick a model suited to the size of the changes
+            if router:
+                model_name, system_prompt = resolve_model(
+                    model_name, router.route(diff, status, profile)
+                )
+
+            # Generate the commit message, or revise the last preview for what was staged since
+            request_data = client.generate_commit_message_request(
+                diff,
+                status,
+                model_name,
+                prompt_message,
+                system_prompt=system_prompt,
+                profile=profile,
+                examples=find_examples(client, diff, budget),
+                history=read_history(),
+                body_min_files=settings.run.body_min_files,
+                revision=find_revision(diff, model_name),
+            )
+
+            # Add context message if provided
+            follow_up = None
+            if message:
+                follow_up = f"Original commit message context: {message}\n\nPlease consider this context when generating the philosophical reflection."
+                request_data["messages"].append({"role": "user", "content": follow_up})
+
+        # Call the API, through a context that refinements can continue from
+        with clock.phase("ollama"):
+            if settings.run.reuse_context or interactive:
+                response = call_with_context(client, request_data, model_name, follow_up, budget)
+            else:
+                response = client.call_api(request_data, deadline=budget)
+            if (
+                settings.run.repeat_threshold > 0
+                or settings.run.repeat_embedding_threshold is not None
+            ):
+                recent = RecentMessages.for_repository()
+            if recent:
+                recent.follow_head()
+                response = regenerate_if_repeated(client, request_data, response, recent, budget)
+        clock.record_response(response)
+
+        # Extract the commit message from the response
+        commit_message = response.get("message", {}).get("content", "").strip()
+        ThroughputStats.for_user().record(model_name, response)
+        if interactive:
+            conversation = Conversation(client, request_data, response)
+    except (DeadlineExceeded, OllamaUnavailable) as e:
+        click.echo(f"git-camus: {e}; using a locally generated message", err=True)
+        commit_message = fallback_commit_message(diff, status)
+        fallback_used = True
+
+    if not commit_message:
+        click.echo("Error: No commit message generated", err=True)
+        sys.exit(1)
+
+    if interactive:
+        with clock.phase("refine"):
+            refined = refine_interactively(commit_message, conversation)
+        if refined is None:
+            click.echo("Aborted, nothing committed.", err=True)
+            sys.exit(1)
+        commit_message = refined
+        if conversation and conversation.context:
+            cache = MessageCache.for_repository()
+            if cache:
+                cache.put_context(get_index_tree(), model_name, conversation.context)
+
+    with clock.phase("commit"):
+        if show:
+            # Remember the preview so the prepare-commit-msg hook can reuse it
+            cache = MessageCache.for_repository()
+            if cache:
+                tree = get_index_tree()
+                cache.put(tree, model_name, commit_message, fallback=fallback_used)
+                if not fallback_used:
+                    cache.put_preview(get_head(), tree, model_name, commit_message)
+            click.echo(commit_message)
+        else:
+            if not (settings.run.fast_commit and commit_with_plumbing(commit_message)):
+                perform_git_commit(commit_message)
+            if recent:
+                recent.add(commit_message, head=get_head())
+
+    if settings.run.record_stats:
+        RunLog.for_user().append(
+            run_record(clock, "run", model_name, diff, commit_message, fallback=fallback_used)
+        )
+    if timings:
+        click.echo(clock.format(timings), err=True)
+
+
+def generate_group_message(
+    client: OllamaClient,
+    group: ChangeGroup,
+    status: str,
+    message: Optional[str],
+    profile: LatencyProfile,
+    router: Optional[ModelRouter],
+    deadline: Deadline,
+) -> str:
+    """Generate the commit message of one group of a split.
+
+    Args:
+        client: The Ollama client to generate with
+        group: The files to describe
+        status: The status of all changes
+        message: Optional context message to include in the prompt
+        profile: The latency profile to generate with
+        router: Optional router picking a model for the size of the group
+        deadline: The latency budget the request has to fit in
+
+    Returns:
+        str: The message, generated locally if Ollama does not answer in time
+    """
+    status = group.status(status)
+    _, model_name, prompt_message = get_config_values()
+    model_name, system_prompt = resolve_model(
+        model_name, router.route(group.diff, status, profile) if router else None
+    )
+    request_data = client.generate_commit_message_request(
+        group.diff,
+        status,
+        model_name,
+        prompt_message,
+        system_prompt=system_prompt,
+        profile=profile,
+        body_min_files=settings.run.body_min_files,
+    )
+    if message:
+        request_data["messages"].append(
+            {"role": "user", "content": f"Original commit message context: {message}"}
+        )
+    try:
+        response = client.call_api(request_data, deadline=deadline)
+    except (DeadlineExceeded, OllamaUnavailable) as e:
+        click.echo(f"git-camus: {e}; using a locally generated message", err=True)
+        return fallback_commit_message(group.diff, status)
+    ThroughputStats.for_user().record(model_name, response)
+    content = response.get("message", {}).get("content", "").strip()
+    return content or fallback_commit_message(group.diff, status)
+
+
+def run_split(
+    show: bool = False,
+    message: Optional[str] = None,
+    deadline: Optional[float] = None,
+    latency: Optional[str] = None,
+    timings: Optional[str] = None,
+) -> None:
+    """Commit the staged changes as several commits of related files.
+
+    The staged files are grouped by directory, by how often earlier commits
+    changed them together and by how alike their diffs are. The message of
+    every group is generated at the same time from its own small diff, then
+    the groups are committed in order through a temporary index, leaving the
+    working tree and the staged contents as they are.
+
+    Args:
+        show: If True, show the groups and their messages without committing
+        message: Optional context message to include in the prompts
+        deadline: Seconds before giving up on Ollama and using local messages
+        latency: Name of the latency profile to generate with, the configured one if None
+        timings: Print how long each phase took, as "text" or "json"
+    """
+    clock = Timings()
+    check_git_repository()
+    ollama_host, _, _ = get_config_values()
+    profile = resolve_profile(latency)
+    budget = Deadline(deadline if deadline is not None else settings.run.deadline)
+
+    with clock.phase("git"):
+        status = get_git_status()
+        if not has_staged_changes(status):
+            click.echo("No staged changes to commit.", err=True)
+            sys.exit(0)
+        groups = split_staged_changes()
+
+    together = "showing one message for them" if show else "committing them together"
+    if len(groups) < 2:
+        click.echo(f"The staged changes are all related; {together}.", err=True)
+        run_git_camus(
+            show=show, message=message, deadline=deadline, latency=latency, timings=timings
+        )
+        return
+    if not show and not can_commit_with_plumbing():
+        click.echo(
+            "git-camus: --split skips commit hooks and cannot conclude a merge, cherry-pick "
+            f"or revert; {together}.",
+            err=True,
+        )
+        run_git_camus(
+            show=show, message=message, deadline=deadline, latency=latency, timings=timings
+        )
+        return
+
+    client = make_client(ollama_host)
+    router = make_router()
+    with clock.phase("health"):
+        try:
+            available = client.is_available(budget.timeout(settings.ollama.health_timeout))
+        except DeadlineExceeded:
+            available = False
+    if available:
+        with clock.phase("ollama"):
+            with ThreadPoolExecutor(max_workers=max(1, settings.run.split_parallel)) as executor:
+                messages = list(
+                    executor.map(
+                        lambda group: generate_group_message(
+                            client, group, status, message, profile, router, budget
+                        ),
+                        groups,
+                    )
+                )
+    else:
+        click.echo(
+            f"git-camus: Ollama is not reachable at {ollama_host}; using locally generated "
+            "messages",
+            err=True,
+        )
+        messages = [fallback_commit_message(g.diff, g.status(status)) for g in groups]
+
+    with clock.phase("commit"):
+        if show:
+            for group, group_message in zip(groups, messages):
+                click.echo(f"# {' '.join(group.paths)}\n{group_message}\n")
+        else:
+            try:
+                commits = commit_groups(groups, messages)
+            except subprocess.CalledProcessError as e:
+                click.echo(f"Error committing: {e}", err=True)
+                sys.exit(1)
+            for commit, group_message in zip(commits, messages):
+                click.echo(f"Committed {commit[:12]} with message: {group_message}")
+    if timings:
+        click.echo(clock.format(timings), err=True)
+
+
+@click.group(invoke_without_command=True)
+@click.option("--show", "-s", is_flag=True, help="Show the generated message without committing")
+@click.option(
+    "--message", "-m", help="Original commit message to enhance with Camus-style existentialism"
+)
+@click.option(
+    "--message-file",
+    "-F",
+    type=click.File(encoding="utf-8"),
+    help="Read the original commit message from a file, or from stdin with -",
+)
+@click.option(
+    "--deadline",
+    type=float,
+    help="Seconds to wait for Ollama before committing a locally generated message",
+)
+@click.option(
+    "--interactive",
+    "-i",
+    is_flag=True,
+    help="Accept, regenerate, shorten or edit the message before it is used",
+)
+@click.option(
+    "--latency",
+    metavar="PROFILE",
+    help="Latency profile to generate with, e.g. fast, balanced or quality",
+)
+@click.option(
+    "--timings",
+    type=click.Choice(["text", "json"]),
+    is_flag=False,
+    flag_value="text",
+    help="Print how long each phase took, as text or as a JSON line",
+)
+@click.option(
+    "--trace",
+    type=click.Path(dir_okay=False),
+    help="Append an OTLP/JSON trace of the run to this file",
+)
+@click.option(
+    "--profile",
+    "profile_file",
+    type=click.Path(dir_okay=False),
+    help="Profile the run, writing pstats to this file and a summary next to it",
+)
+@click.option(
+    "--profile-memory", is_flag=True, help="Trace memory allocations as well with --profile"
+)
+@click.option(
+    "--split",
+    is_flag=True,
+    help="Commit the staged changes as several commits of related files",
+)
+@click.option("--model", help="Model to generate with instead of the configured one")
+@click.option("--host", help="Ollama host URL, or comma separated URLs, to send requests to")
+@click.pass_context
+def main(
+    ctx: click.Context,
+    show: bool,
+    message: Optional[str],
+    message_file: Optional[TextIO],
+    deadline: Optional[float],
+    interactive: bool,
+    latency: Optional[str],
+    timings: Optional[str],
+    trace: Optional[str],
+    profile_file: Optional[str],
+    profile_memory: bool,
+    split: bool,
+    model: Optional[str],
+    host: Optional[str],
+) -> None:
+    """Generate an existential commit message in the style of Albert Camus using local Ollama."""
+    # Flags beat the environment and the configuration files, for subcommands as well
+    overrides: dict[str, dict[str, Any]] = {}
+    if model:
+        # A model asked for by name is used as is, not the derived one
+        overrides["run"] = {"model_name": model, "derived_model": None}
+    if host:
+        overrides["ollama"] = {"host": host}
+    if latency:
+        overrides.setdefault("run", {})["latency_profile"] = latency
+    if deadline is not None:
+        overrides.setdefault("run", {})["deadline"] = deadline
+    ctx.with_resource(settings.overridden(**overrides))
+
+    trace_file = trace or settings.run.trace_file
+    if trace_file:
+        tracing.configure(trace_file)
+        command = ctx.invoked_subcommand or "run"
+        ctx.with_resource(tracing.span(f"git-camus {command}", **{"git_camus.command": command}))
+    if ctx.invoked_subcommand is None:
+        if message_file is not None:
+            if message:
+                raise click.UsageError("--message and --message-file cannot be used together")
+            message = message_file.read()
+        if split and interactive:
+            raise click.UsageError("--split and --interactive cannot be used together")
+        if profile_file:
+            # cProfile and tracemalloc are only loaded when asked for
+            from ..core.profiling import Profiler
+
+        with Profiler(profile_file, memory=profile_memory) if profile_file else nullcontext():
+            if split:
+                run_split(
+                    show=show,
+                    message=message,
+                    deadline=deadline,
+                    latency=latency,
+                    timings=timings,
+                )
+                return
+            run_git_camus(
+                show=show,
+                message=message,
+                deadline=deadline,
+                interactive=interactive,
+                latency=latency,
+                timings=timings,
+            )
+
+
+@main.command()
+@click.option("--model", help="Model to load instead of the configured one")
+def warm(model: Optional[str]) -> None:
+    """Load the model into memory ahead of the next commit."""
+    ollama_host, model_name, _ = get_config_values()
+    model_name = model or resolve_model(model_name)[0]
+    client = make_client(ollama_host)
+    failed = 0
+    for host in client.hosts:
+        try:
+            client.warm(model_name, host)
+            click.echo(f"Loaded {model_name} on {host}")
+        except httpx.HTTPError as e:
+            click.echo(f"Could not load {model_name} on {host}: {e}", err=True)
+            failed += 1
+    if failed == len(client.hosts):
+        sys.exit(1)
+
+
+def format_value(value: Optional[float], template: str) -> str:
+    """Format an optional statistic, with a dash when it is unknown."""
+    return "-" if value is None else template.format(value)
+
+
+@main.command()
+@click.option(
+    "--days",
+    type=float,
+    default=7.0,
+    show_default=True,
+    help="Only count runs from this many days back, 0 for all",
+)
+@click.option("--json", "as_json", is_flag=True, help="Print the statistics as JSON")
+def stats(days: float, as_json: bool) -> None:
+    """Report latency percentiles, cache hit rate and tokens/s per model."""
+    since = time.time() - days * 86400 if days > 0 else None
+    models = {name: s.to_dict() for name, s in summarize(RunLog.for_user().records(since)).items()}
+    if as_json:
+        click.echo(json.dumps(models))
+        return
+    if not models:
+        click.echo("No runs recorded yet.")
+        return
+
+    click.echo(
+        f"{'Model':<24} {'Runs':>6} {'p50':>8} {'p95':>8} {'p99':>8} "
+        f"{'Cache':>6} {'Fallback':>8} {'Tokens/s':>9}"
+    )
+    for name, row in sorted(models.items()):
+        click.echo(
+            f"{name:<24} {row['runs']:>6} "
+            f"{format_value(row['p50'], '{:.2f}s'):>8} "
+            f"{format_value(row['p95'], '{:.2f}s'):>8} "
+            f"{format_value(row['p99'], '{:.2f}s'):>8} "
+            f"{format_value(row['cache_hit_rate'], '{:.0%}'):>6} "
+            f"{format_value(row['fallback_rate'], '{:.0%}'):>8} "
+            f"{format_value(row['tokens_per_second'], '{:.1f}'):>9}"
+        )
+
+
+@main.group("config")
+def config_group() -> None:
+    """Inspect the git-camus configuration."""
+
+
+@config_group.command("check")
+def config_check() -> None:
+    """Validate the configuration files and the environment strictly."""
+    # pydantic is only needed, and loaded, to check the settings
+    from ..core.schema import check_settings
+
+    files, problems = check_settings()
+    for path in files:
+        click.echo(f"Checked {path}")
+    if problems:
+        for problem in problems:
+            click.echo(f"Error: {problem}", err=True)
+        sys.exit(1)
+    click.echo("Configuration OK")
+
+
+@main.group()
+def model() -> None:
+    """Manage the model git-camus generates with."""
+
+
+@model.command("build")
+@click.option("--name", help=f"Name of the model to create [default: {DEFAULT_DERIVED_MODEL}]")
+@click.option("--from", "base_model", help="Model to derive from instead of the configured one")
+def model_build(name: Optional[str], base_model: Optional[str]) -> None:
+    """Create a model with the Camus system prompt and generation options baked in."""
+    ollama_host, model_name, _ = get_config_values()
+    name = name or settings.run.derived_model or DEFAULT_DERIVED_MODEL
+    base_model = base_model or model_name
+    client = make_client(ollama_host)
+    failed = 0
+    for host in client.hosts:
+        try:
+            client.create_model(
+                name,
+                base_model,
+                settings.run.system_prompt,
+                settings.run.derived_parameters,
+                host,
+            )
+            click.echo(f"Built {name} from {base_model} on {host}")
+        except httpx.HTTPError as e:
+            click.echo(f"Could not build {name} on {host}: {e}", err=True)
+            failed += 1
+    if failed == len(client.hosts):
+        sys.exit(1)
+    if settings.run.derived_model != name:
+        click.echo(f"Set run.derived_model to {name} to generate with it", err=True)
+
+
+@main.group()
+def hook() -> None:
+    """Generate messages from git's own commit flow."""
+
+
+@hook.command("install")
+@click.option("--force", is_flag=True, help="Replace an existing prepare-commit-msg hook")
+def hook_install(force: bool) -> None:
+    """Install the prepare-commit-msg hook in the current repository."""
+    hook_path = install_hook(force=force)
+    click.echo(f"Installed {hook_path}")
+
+
+@hook.command("run")
+@click.argument("message_file", type=click.Path(dir_okay=False))
+@click.argument("source", required=False)
+@click.argument("sha", required=False)
+@click.option("--deadline", type=float, help="Seconds to wait for a message before giving up")
+def hook_run(
+    message_file: str, source: Optional[str], sha: Optional[str], deadline: Optional[float]
+) -> None:
+    """Fill MESSAGE_FILE as git's prepare-commit-msg hook."""
+    ollama_host, model_name, prompt_message = get_config_values()
+    model_name, system_prompt = resolve_model(model_name)
+    if deadline is None:
+        deadline = settings.run.hook_deadline
+    try:
+        prepare_commit_msg(
+            message_file,
+            source,
+            make_client(ollama_host),
+            model_name,
+            prompt_message,
+            deadline,
+            system_prompt=system_prompt,
+            profile=settings.profiles.get(settings.run.latency_profile),
+            router=make_router(),
+            run_log=RunLog.for_user() if settings.run.record_stats else None,
+            body_min_files=settings.run.body_min_files,
+        )
+    except Exception as e:
+        # A failing hook aborts the commit, so never let generation problems escape
+        click.echo(f"git-camus: {e}", err=True)
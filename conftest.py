@@ -2,14 +2,36 @@ from __future__ import annotations
 
 import os.path
 
+import pytest
+
 
 def pytest_configure(config):
     source_root = os.path.dirname(os.path.abspath(__file__))
     if os.getcwd() != source_root:
         os.chdir(source_root)
+    config.addinivalue_line("markers", "bench: end-to-end benchmark, only run with --bench")
+
+
+def pytest_collection_modifyitems(config, items) -> None:
+    if config.getoption("--bench"):
+        return
+    skip_bench = pytest.mark.skip(reason="benchmarks only run with --bench")
+    for item in items:
+        if "bench" in item.keywords:
+            item.add_marker(skip_bench)
 
 
 def pytest_addoption(parser) -> None:
     parser.addoption(
         "--bench", action="store_true", default=False, help="Enable the benchmark test runs"
     )
+
+
+@pytest.fixture(autouse=True)
+def isolated_user_cache(tmp_path_factory, monkeypatch):
+    """Keep state shared across runs, such as Ollama reachability, out of the user's cache.
+
+    The user's configuration file is kept out as well, so tests see the defaults.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path_factory.mktemp("cache")))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path_factory.mktemp("config")))
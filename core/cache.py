@@ -0,0 +1,165 @@
+"""Commit message cache functionality."""
+
+import os
+from typing import Optional
+
+from .git_operations import get_git_dir
+from .state import read_json, write_json
+
+# Number of generated messages kept per repository
+MAX_CACHE_ENTRIES = 64
+
+
+class MessageCache:
+    """Generated commit messages keyed by the staged tree and model.
+
+    The cache lives inside the repository's git directory, so it is never
+    committed and disappears together with the clone.
+    """
+
+    def __init__(self, path: str, max_entries: int = MAX_CACHE_ENTRIES) -> None:
+        """Initialize the message cache.
+
+        Args:
+            path: The JSON file backing the cache
+            max_entries: Maximum number of messages to keep
+        """
+        self.path = path
+        self.max_entries = max_entries
+
+    @classmethod
+    def for_repository(cls) -> Optional["MessageCache"]:
+        """Open the cache of the current repository.
+
+        Returns:
+            Optional[MessageCache]: The cache, or None outside a git repository
+        """
+        git_dir = get_git_dir()
+        if not git_dir:
+            return None
+        return cls(os.path.join(git_dir, "camus", "messages.json"))
+
+    @staticmethod
+    def _key(tree: str, model_name: str) -> str:
+        return f"{model_name}:{tree}"
+
+    def get(self, tree: str, model_name: str) -> Optional[str]:
+        """Look up the message generated for a staged tree.
+
+        Args:
+            tree: The object id of the staged tree
+            model_name: The model that generated the message
+
+        Returns:
+            Optional[str]: The cached message, or None on a miss
+        """
+        if not tree:
+            return None
+        entry = read_json(self.path).get(self._key(tree, model_name))
+        if not isinstance(entry, dict) or entry.get("fallback"):
+            return None
+        if isinstance(entry.get("message"), str):
+            return entry["message"]  # type: ignore[no-any-return]
+        return None
+
+    def put(self, tree: str, model_name: str, message: str, fallback: bool = False) -> None:
+        """Store the message generated for a staged tree.
+
+        Messages built by the local fallback are recorded as such and never
+        served from the cache, so the model gets another chance next time.
+
+        Args:
+            tree: The object id of the staged tree
+            model_name: The model that generated the message
+            message: The generated commit message
+            fallback: Whether the message came from the local fallback
+        """
+        if not tree or not message:
+            return
+        data = read_json(self.path)
+        key = self._key(tree, model_name)
+        data.pop(key, None)
+        data[key] = {"message": message, "fallback": fallback}
+        # Dicts keep insertion order, so the oldest entries come first
+        while len(data) > self.max_entries:
+            del data[next(iter(data))]
+        write_json(self.path, data)
+
+    @property
+    def context_path(self) -> str:
+        """Get the JSON file holding the latest Ollama context."""
+        return os.path.join(os.path.dirname(self.path), "context.json")
+
+    def get_context(self, tree: str, model_name: str) -> Optional[list[int]]:
+        """Look up the Ollama context of the last generation for a staged tree.
+
+        Args:
+            tree: The object id of the staged tree
+            model_name: The model that generated the context
+
+        Returns:
+            Optional[list[int]]: The context, or None if the last generation
+            was for another tree or model
+        """
+        if not tree:
+            return None
+        data = read_json(self.context_path)
+        context = data.get("context")
+        if data.get("key") != self._key(tree, model_name) or not isinstance(context, list):
+            return None
+        return context
+
+    def put_context(self, tree: str, model_name: str, context: list[int]) -> None:
+        """Store the Ollama context of the last generation.
+
+        Contexts are large, so only the latest one is kept.
+
+        Args:
+            tree: The object id of the staged tree
+            model_name: The model that generated the context
+            context: The context returned by Ollama
+        """
+        if not tree or not context:
+            return
+        write_json(self.context_path, {"key": self._key(tree, model_name), "context": context})
+
+    @property
+    def preview_path(self) -> str:
+        """Get the JSON file holding the latest previewed message."""
+        return os.path.join(os.path.dirname(self.path), "preview.json")
+
+    def get_preview(self, head: str, model_name: str) -> Optional[tuple[str, str]]:
+        """Look up the message last previewed on top of a commit.
+
+        Args:
+            head: The commit HEAD points at
+            model_name: The model that generated the message
+
+        Returns:
+            Optional[tuple[str, str]]: The staged tree and message of the
+            preview, or None if the last one was on another commit or by
+            another model
+        """
+        data = read_json(self.preview_path)
+        tree, message = data.get("tree"), data.get("message")
+        if data.get("key") != self._key(head, model_name):
+            return None
+        if not isinstance(tree, str) or not isinstance(message, str) or not tree:
+            return None
+        return tree, message
+
+    def put_preview(self, head: str, tree: str, model_name: str, message: str) -> None:
+        """Store the message previewed for a staged tree, replacing the last one.
+
+        Args:
+            head: The commit HEAD points at
+            tree: The object id of the staged tree
+            model_name: The model that generated the message
+            message: The previewed commit message
+        """
+        if not tree or not message:
+            return
+        write_json(
+            self.preview_path,
+            {"key": self._key(head, model_name), "tree": tree, "message": message},
+        )
@@ -1,48 +1,507 @@
 """Configuration management for git-camus."""
 
+import json
 import os
-from typing import Tuple
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields
+from functools import lru_cache
+from typing import Any, Optional, Tuple, Union, get_args, get_origin, get_type_hints
 
-from pydantic import BaseModel
-from pydantic_settings import BaseSettings
+import click
 
+# Settings classes are plain dataclasses, so the CLI never imports pydantic;
+# `git-camus config check` validates them with pydantic in core.schema. They
+# are frozen, as one snapshot is shared by the whole process: a command that
+# needs other values resolves new settings through LazySettings.overridden()
+_DATACLASS_OPTIONS: dict[str, Any] = {"frozen": True}
+if sys.version_info >= (3, 10):
+    _DATACLASS_OPTIONS["slots"] = True
 
-class OllamaConfig(BaseModel):
+# Per-repository configuration file, looked up from the working directory
+REPO_CONFIG_NAME = ".git-camus.toml"
+
+# Per-user configuration file, in the user's configuration directory
+USER_CONFIG_NAME = "config.toml"
+
+# Environment variables holding a whole settings section as JSON, matched case-insensitively
+ENV_SECTIONS = ("ollama", "run", "api", "profiles")
+
+
+@dataclass(**_DATACLASS_OPTIONS)
+class OllamaConfig:
     """Ollama API configuration."""
-    host: str = "http://localhost:11434"
+    host: str = "http://localhost:11434"  # One URL, or several separated by commas
+    hedge: bool = False  # Duplicate slow requests to a second host
+    hedge_percentile: float = 0.95  # Time-to-first-token percentile before hedging
+    eject_after: int = 3  # Consecutive failures before a host leaves the rotation
+    eject_seconds: float = 30.0  # Seconds before an ejected host is tried again
+    health_timeout: float = 0.5  # Seconds the reachability probe may take
+    health_ttl: float = 15.0  # Seconds a reachability result is reused across runs
+    keep_alive: Optional[str] = "30m"  # How long Ollama keeps the model loaded between runs
+
+
+@dataclass(**_DATACLASS_OPTIONS)
+class LatencyProfile:
+    """Ollama generation options trading message quality for latency."""
+    num_predict: int = 64  # Tokens generated at most; a 150 character message needs ~40
+    max_ctx: int = 4096  # Largest context window; the window is sized to the prompt below it
+    max_diff_length: int = 8000  # Characters of diff sent; bounds the prompt processing time
+    # The message is a single line, so stop at its end
+    stop: list[str] = field(default_factory=lambda: ["\n"])
+    num_thread: Optional[int] = None  # CPU threads; Ollama picks them by default
+    temperature: float = 0.7
+    top_p: float = 0.9
+
+
+@dataclass(**_DATACLASS_OPTIONS)
+class RouteTier:
+    """Models generating messages for staged changes up to a given size."""
+    models: list[str]  # Candidate models, preferred first
+    max_lines: Optional[int] = None  # Changed lines at most; no limit if None
+    max_files: Optional[int] = None  # Changed files at most; no limit if None
+    budget: Optional[float] = None  # Seconds a candidate is expected to take at most
 
 
-class RunConfig(BaseModel):
+@dataclass(**_DATACLASS_OPTIONS)
+class RunConfig:
     """Runtime configuration."""
     host: str = "0.0.0.0"
     port: int = 8000
     model_name: str = "llama3.2"  # Default model name for Ollama
-    prompt_message: str = (
+    hook_deadline: float = 10.0  # Seconds the prepare-commit-msg hook may spend generating
+    deadline: Optional[float] = None  # Seconds before falling back to a local message
+    auto_warm: bool = False  # Load the model while git data is being collected
+    latency_profile: str = "balanced"  # Key of the profiles used unless --latency is given
+    # Size tiers picking the model, smallest first; off if empty
+    routes: list[RouteTier] = field(default_factory=list)
+    record_stats: bool = True  # Append a record of every run for `git-camus stats`
+    trace_file: Optional[str] = None  # Append OTLP/JSON traces of every run to this file
+    reuse_context: bool = False  # Continue from Ollama's returned context on follow-up runs
+    fast_commit: bool = False  # Commit with plumbing, skipping the index refresh, if no hooks
+    body_min_files: Optional[int] = None  # Files changed before a body is added; off if None
+    split_parallel: int = 4  # Messages generated at once by --split
+    revise_preview: bool = False  # Revise the last --show message from the newly staged diff
+    history: int = 0  # Subjects of the latest commits added to the prompt; off if 0
+    few_shot: int = 0  # Earlier commit messages similar to the changes added to the prompt
+    embedding_model: str = "nomic-embed-text"  # Model indexing commits for few_shot
+    # Regenerate a message sharing this much wording with a recent one, e.g. 0.5; off if 0
+    repeat_threshold: float = 0.0
+    # Also compare meanings with embeddings at this cosine similarity; off if None
+    repeat_embedding_threshold: Optional[float] = None
+    # Instructions sent as a fixed system message, so the server can reuse their KV cache
+    system_prompt: str = (
         "You are an AI assistant that generates philosophical commit messages in the style of Albert Camus.\n"
         "Your task is to analyze git changes and create a commit message that reflects on the absurdity, rebellion, and human condition.\n\n"
-        "Git Diff:\n{diff}\n\nGit Status:\n{status}\n\n"
         "Generate a philosophical commit message that:\n"
         "1. Reflects on the nature of the changes made\n"
         "2. Incorporates themes of existentialism and the absurd\n"
         "3. Is concise but meaningful (max 150 characters)\n"
         "4. Avoids technical jargon in favor of philosophical reflection\n\n"
+        "The user sends the git status followed by the git diff.\n"
         "Respond with only the commit message, no explanations or additional text."
     )
+    # Variable part of the prompt; the diff comes last as it changes the most
+    prompt_message: str = "Git Status:\n{status}\n\nGit Diff:\n{diff}"
+    # Model built by `git-camus model build` with the system prompt baked in
+    derived_model: Optional[str] = None
+    # Generation options baked into the derived model
+    derived_parameters: dict[str, Any] = field(
+        default_factory=lambda: {
+            "num_predict": 64,
+            "num_ctx": 4096,
+            "stop": ["\n"],
+            "temperature": 0.7,
+            "top_p": 0.9,
+        }
+    )
 
 
-class ApiPrefix(BaseModel):
+@dataclass(**_DATACLASS_OPTIONS)
+class ApiPrefix:
     """API prefix configuration."""
     prefix: str = "/api"
 
 
-class Settings(BaseSettings):
+DEFAULT_PROFILES = {
+    "fast": LatencyProfile(num_predict=48, max_ctx=2048, max_diff_length=3000, temperature=0.5),
+    "balanced": LatencyProfile(),
+    "quality": LatencyProfile(num_predict=128, max_ctx=8192, max_diff_length=16000),
+}
+
+
+def default_profiles() -> dict[str, LatencyProfile]:
+    """Get fresh copies of the built-in latency profiles."""
+    return {name: LatencyProfile(**asdict(profile)) for name, profile in DEFAULT_PROFILES.items()}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
+class Settings:
     """Application settings."""
-    ollama: OllamaConfig = OllamaConfig()
-    run: RunConfig = RunConfig()
-    api: ApiPrefix = ApiPrefix()
+    ollama: OllamaConfig = field(default_factory=OllamaConfig)
+    run: RunConfig = field(default_factory=RunConfig)
+    api: ApiPrefix = field(default_factory=ApiPrefix)
+    profiles: dict[str, LatencyProfile] = field(default_factory=default_profiles)
+
+
+def user_config_dir() -> str:
+    """Get the per-user directory for git-camus configuration."""
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "git-camus")
+
+
+def find_repo_config(start: Optional[str] = None) -> Optional[str]:
+    """Find the repository configuration file.
+
+    The directories from the start up to the repository's top level are
+    searched, without running git.
+
+    Args:
+        start: The directory to start from, the working directory by default
+
+    Returns:
+        Optional[str]: The path of the file, or None if there is none
+    """
+    directory = os.path.abspath(start or os.getcwd())
+    while True:
+        path = os.path.join(directory, REPO_CONFIG_NAME)
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if os.path.exists(os.path.join(directory, ".git")) or parent == directory:
+            return None
+        directory = parent
+
+
+def config_files(start: Optional[str] = None) -> list[str]:
+    """Get the configuration files that apply, lowest precedence first.
+
+    Args:
+        start: The directory to look for the repository file from
+
+    Returns:
+        list[str]: The existing user and repository files
+    """
+    paths = [os.path.join(user_config_dir(), USER_CONFIG_NAME), find_repo_config(start)]
+    return [path for path in paths if path and os.path.isfile(path)]
+
+
+# Parsed configuration files by path, with the (mtime, size) they were parsed at
+_parsed_files: dict[str, tuple[tuple[int, int], dict[str, Any]]] = {}
+
+
+def read_toml(path: str) -> dict[str, Any]:
+    """Parse a TOML configuration file, reusing the result while it is unchanged.
+
+    Long-running processes resolve the configuration again for every
+    request; a file is only parsed again once its modification time or size
+    changes.
+
+    Args:
+        path: The file to read
+
+    Returns:
+        dict[str, Any]: The parsed values
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not valid TOML
+    """
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _parsed_files.get(path)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        import tomli as tomllib
+
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+    _parsed_files[path] = (version, data)
+    return data
+
+
+def deep_merge(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
+    """Merge nested settings, the override winning on conflicts.
+
+    Args:
+        base: The lower precedence values
+        override: The higher precedence values
+
+    Returns:
+        dict[str, Any]: A new merged dict; the inputs are left untouched
+    """
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def read_config_files(start: Optional[str] = None) -> dict[str, Any]:
+    """Merge the user and repository configuration files.
+
+    A file that cannot be read or parsed is skipped with a warning, so a
+    typo never blocks a commit.
+
+    Args:
+        start: The directory to look for the repository file from
+
+    Returns:
+        dict[str, Any]: The merged values, the repository file winning
+    """
+    values: dict[str, Any] = {}
+    for path in config_files(start):
+        try:
+            values = deep_merge(values, read_toml(path))
+        except (OSError, ValueError) as e:
+            click.echo(f"git-camus: ignoring {path}: {e}", err=True)
+    return values
+
+
+def environment_settings() -> dict[str, Any]:
+    """Read the settings sections given as JSON in the environment, e.g. OLLAMA='{"hedge": true}'.
+
+    A variable that is not valid JSON is skipped with a warning.
+
+    Returns:
+        dict[str, Any]: The values by section
+    """
+    environ = {key.lower(): value for key, value in os.environ.items()}
+    values: dict[str, Any] = {}
+    for section in ENV_SECTIONS:
+        if section not in environ:
+            continue
+        try:
+            values[section] = json.loads(environ[section])
+        except ValueError as e:
+            click.echo(f"git-camus: ignoring ${section.upper()}: {e}", err=True)
+    return values
+
+
+# Strings read as booleans, as `git-camus config check` reads them
+_BOOLEANS = {
+    **dict.fromkeys(("1", "true", "t", "yes", "y", "on"), True),
+    **dict.fromkeys(("0", "false", "f", "no", "n", "off"), False),
+}
+
+
+def coerce(value: Any, annotation: Any) -> Any:
+    """Convert a configured value to the type of its field.
+
+    The conversions are the ones `git-camus config check` accepts, e.g. "5"
+    for a number or "false" for a flag, so both read a file the same way.
+
+    Args:
+        value: The value from a file or the environment
+        annotation: The type of the field
+
+    Returns:
+        Any: The converted value
+
+    Raises:
+        ValueError: If the value cannot be converted
+    """
+    origin = get_origin(annotation)
+    if origin is Union:
+        options = get_args(annotation)
+        if value is None and type(None) in options:
+            return None
+        for option in options:
+            if option is not type(None):
+                try:
+                    return coerce(value, option)
+                except ValueError:
+                    pass
+        raise ValueError(f"expected {annotation}, got {value!r}")
+    if origin is list:
+        if not isinstance(value, list):
+            raise ValueError(f"expected a list, got {value!r}")
+        (item,) = get_args(annotation) or (Any,)
+        return [coerce(v, item) for v in value]
+    if origin is dict:
+        if not isinstance(value, dict):
+            raise ValueError(f"expected a table, got {value!r}")
+        return value
+    if annotation is Any:
+        return value
+    if annotation is bool:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, int) and value in (0, 1):
+            return bool(value)
+        if isinstance(value, str) and value.strip().lower() in _BOOLEANS:
+            return _BOOLEANS[value.strip().lower()]
+    elif annotation is int:
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, str):
+            try:
+                return int(value.strip())
+            except ValueError:
+                pass
+    elif annotation is float:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        if isinstance(value, str):
+            try:
+                return float(value.strip())
+            except ValueError:
+                pass
+    elif isinstance(value, annotation):
+        return value
+    raise ValueError(f"expected {getattr(annotation, '__name__', annotation)}, got {value!r}")
+
+
+@lru_cache(maxsize=None)
+def _field_types(cls: Any) -> dict[str, Any]:
+    return get_type_hints(cls)
+
+
+def _section(cls: Any, values: Any, where: str) -> Any:
+    if not isinstance(values, dict):
+        raise ValueError(f"expected a table for {where}, got {values!r}")
+    types = _field_types(cls)
+    kwargs = {}
+    # Unknown keys are left for `git-camus config check` to report
+    for key, value in values.items():
+        if key not in types:
+            continue
+        try:
+            kwargs[key] = coerce(value, types[key])
+        except ValueError as e:
+            # A mistyped value keeps its default, so a typo never blocks a commit
+            click.echo(f"git-camus: ignoring {where}.{key}: {e}", err=True)
+    try:
+        return cls(**kwargs)
+    except TypeError as e:
+        raise ValueError(f"invalid {where}: {e}") from e
+
+
+def settings_from_dict(values: dict[str, Any]) -> Settings:
+    """Build the settings from nested plain values.
+
+    Values are converted to the types of their fields; one that cannot be
+    is skipped with a warning, keeping its default.
+
+    Args:
+        values: The settings by section, missing values keeping their defaults
+
+    Returns:
+        Settings: The settings
+
+    Raises:
+        ValueError: If a section or route is malformed
+    """
+    for section in ENV_SECTIONS:
+        if not isinstance(values.get(section, {}), dict):
+            raise ValueError(f"expected a table for {section}, got {values[section]!r}")
+    run = dict(values.get("run", {}))
+    routes = run.get("routes", [])
+    if not isinstance(routes, list):
+        raise ValueError(f"expected a list for run.routes, got {routes!r}")
+    run["routes"] = [
+        _section(RouteTier, tier, f"run.routes.{index}") for index, tier in enumerate(routes)
+    ]
+    profiles = {name: asdict(profile) for name, profile in DEFAULT_PROFILES.items()}
+    profiles = deep_merge(profiles, values.get("profiles", {}))
+    return Settings(
+        ollama=_section(OllamaConfig, values.get("ollama", {}), "ollama"),
+        run=_section(RunConfig, run, "run"),
+        api=_section(ApiPrefix, values.get("api", {}), "api"),
+        profiles={
+            name: _section(LatencyProfile, profile, f"profiles.{name}")
+            for name, profile in profiles.items()
+        },
+    )
+
+
+def resolve_values(**overrides: Any) -> dict[str, Any]:
+    """Merge the configuration layers into nested plain values.
+
+    From lowest to highest precedence: the user configuration file, the
+    repository's .git-camus.toml, the environment, and the overrides, e.g.
+    from command line flags. Defaults fill in whatever none of them sets.
 
+    Args:
+        **overrides: Nested values taking precedence over everything else
 
-settings = Settings()
+    Returns:
+        dict[str, Any]: The merged values
+    """
+    values = deep_merge(read_config_files(), environment_settings())
+    return deep_merge(values, overrides)
+
+
+def load_settings(**overrides: Any) -> Settings:
+    """Resolve the settings from all configuration layers.
+
+    Args:
+        **overrides: Nested values taking precedence over everything else
+
+    Returns:
+        Settings: The resolved settings
+
+    Raises:
+        ValueError: If a section or route is malformed
+    """
+    return settings_from_dict(resolve_values(**overrides))
+
+
+class LazySettings:
+    """The application settings, built on first use.
+
+    Building the settings reads the configuration files and the environment,
+    which commands that never read a setting, such as --help, do not pay
+    for. The settings are resolved once per process, or once more with the
+    command line flags through overridden(); long-running processes call
+    load_settings() instead.
+    """
+
+    def __init__(self) -> None:
+        """Initialize without building the settings."""
+        self._settings: Optional[Settings] = None
+        self.overrides: dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        if self._settings is None:
+            self._settings = self._load()
+        return getattr(self._settings, name)
+
+    @staticmethod
+    def _load(**overrides: Any) -> Settings:
+        try:
+            return load_settings(**overrides)
+        except ValueError as e:
+            # A typo in a configuration file must never block a commit
+            click.echo(f"git-camus: {e}; using the default settings", err=True)
+            return Settings()
+
+    @contextmanager
+    def overridden(self, **overrides: Any) -> Iterator[None]:
+        """Resolve the settings once more with overrides for the duration of a command.
+
+        Args:
+            **overrides: Nested values taking precedence over every other layer,
+                e.g. from command line flags
+        """
+        previous = self._settings, self.overrides
+        self._settings, self.overrides = self._load(**overrides), overrides
+        try:
+            yield
+        finally:
+            self._settings, self.overrides = previous
+
+
+settings: Settings = LazySettings()  # type: ignore[assignment]
 
 
 def get_config_values() -> Tuple[str, str, str]:
@@ -54,17 +513,7 @@ def get_config_values() -> Tuple[str, str, str]:
     # Default values
     default_host = "http://localhost:11434"
     default_model = "llama3.2"
-    default_prompt = (
-        "You are an AI assistant that generates philosophical commit messages in the style of Albert Camus.\n"
-        "Your task is to analyze git changes and create a commit message that reflects on the absurdity, rebellion, and human condition.\n\n"
-        "Git Diff:\n{diff}\n\nGit Status:\n{status}\n\n"
-        "Generate a philosophical commit message that:\n"
-        "1. Reflects on the nature of the changes made\n"
-        "2. Incorporates themes of existentialism and the absurd\n"
-        "3. Is concise but meaningful (max 150 characters)\n"
-        "4. Avoids technical jargon in favor of philosophical reflection\n\n"
-        "Respond with only the commit message, no explanations or additional text."
-    )
+    default_prompt = "Git Status:\n{status}\n\nGit Diff:\n{diff}"
 
     try:
         ollama_host = settings.ollama.host
@@ -75,8 +524,11 @@ def get_config_values() -> Tuple[str, str, str]:
         model_name = default_model
         prompt_message = default_prompt
 
-    # Environment variables take precedence
-    ollama_host = os.environ.get("OLLAMA_HOST", ollama_host)
-    model_name = os.environ.get("OLLAMA_MODEL", model_name)
+    # Environment variables take precedence, unless given on the command line
+    overrides = getattr(settings, "overrides", {})
+    if "host" not in overrides.get("ollama", {}):
+        ollama_host = os.environ.get("OLLAMA_HOST", ollama_host)
+    if "model_name" not in overrides.get("run", {}):
+        model_name = os.environ.get("OLLAMA_MODEL", model_name)
 
     return ollama_host, model_name, prompt_message
@@ -0,0 +1,65 @@
+"""Latency budget functionality."""
+
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the latency budget of a run has been used up."""
+
+
+class Deadline:
+    """A latency budget shared by every phase of a run.
+
+    A deadline without a budget never expires, so callers can thread one
+    through unconditionally.
+    """
+
+    def __init__(self, seconds: Optional[float] = None) -> None:
+        """Initialize the deadline.
+
+        Args:
+            seconds: The budget in seconds from now, or None for no limit
+        """
+        self.seconds = seconds
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> Optional[float]:
+        """Get the seconds left in the budget.
+
+        Returns:
+            Optional[float]: Seconds left (never negative), or None without a limit
+        """
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """Check whether the budget has been used up."""
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0.0
+
+    def check(self) -> None:
+        """Stop the run once the budget has been used up.
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed
+        """
+        if self.expired():
+            raise DeadlineExceeded(f"deadline of {self.seconds:g}s exceeded")
+
+    def timeout(self, default: float) -> float:
+        """Clamp a timeout to the remaining budget.
+
+        Args:
+            default: The timeout to use when the budget allows it
+
+        Returns:
+            float: The smaller of the default and the remaining budget
+
+        Raises:
+            DeadlineExceeded: If the deadline has already passed
+        """
+        self.check()
+        remaining = self.remaining()
+        return default if remaining is None else min(default, remaining)
@@ -0,0 +1,350 @@
+"""Commit example index functionality."""
+
+import os
+import subprocess
+import tempfile
+from typing import TYPE_CHECKING, Any, Optional
+
+import numpy as np
+
+from .deadline import Deadline, DeadlineExceeded
+from .git_operations import get_git_dir, get_head
+from .lazy import lazy_import
+from .ollama_client import REQUEST_TIMEOUT
+from .state import read_json, write_json
+
+if TYPE_CHECKING:
+    import httpx
+
+    from .ollama_client import OllamaClient
+else:
+    httpx = lazy_import("httpx")
+
+# Commits read per update, so the first one only indexes the newest of a long history
+MAX_WALK = 200
+
+# Commits kept in the index, the oldest dropped first
+MAX_EXAMPLES = 2000
+
+# Characters of a diff embedded, both for indexed commits and for the staged changes
+EMBED_DIFF_LENGTH = 2000
+
+# Characters of an example message added to the prompt
+EXAMPLE_LENGTH = 400
+
+# Texts embedded per request
+EMBED_BATCH = 32
+
+# Seconds a search spends bringing the index up to date, later runs embed the rest
+UPDATE_BUDGET = 1.0
+
+# Separators of the `git log` records, which cannot appear in messages or diffs
+_RECORD = "\x1e"
+_FIELD = "\x1f"
+
+
+def read_commits(
+    since: str = "", limit: int = MAX_WALK, diff_length: int = EMBED_DIFF_LENGTH
+) -> list[tuple[str, str, str]]:
+    """Read the newest commits on HEAD together with the start of their diffs.
+
+    The log is streamed and each diff is cut short while reading, so large
+    commits do not have to fit in memory.
+
+    Args:
+        since: Only read commits not reachable from this one, all if empty
+        limit: Maximum number of commits to read
+        diff_length: Characters of each diff to keep
+
+    Returns:
+        list[tuple[str, str, str]]: The object id, message and diff of each
+        commit, newest first
+
+    Raises:
+        subprocess.CalledProcessError: If git cannot read the history, e.g.
+        because `since` no longer exists
+    """
+    command = [
+        "git",
+        "log",
+        f"--max-count={limit}",
+        "--no-merges",
+        "--no-color",
+        "--no-ext-diff",
+        "--patch",
+        f"--format={_RECORD}%H{_FIELD}%B{_FIELD}",
+        f"{since}..HEAD" if since else "HEAD",
+    ]
+    commits: list[tuple[str, str, str]] = []
+    oid = ""
+    message: list[str] = []
+    diff: list[str] = []
+    diff_size = 0
+    in_message = False
+
+    with subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    ) as process:
+        assert process.stdout is not None
+        for line in process.stdout:
+            if line.startswith(_RECORD):
+                if oid:
+                    commits.append((oid, "".join(message).strip(), "".join(diff)[:diff_length]))
+                oid, _, line = line[1:].partition(_FIELD)
+                message, diff, diff_size, in_message = [], [], 0, True
+            if in_message:
+                text, end, _ = line.partition(_FIELD)
+                message.append(text)
+                in_message = not end
+            elif diff_size < diff_length:
+                diff.append(line)
+                diff_size += len(line)
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, command)
+    if oid:
+        commits.append((oid, "".join(message).strip(), "".join(diff)[:diff_length]))
+    return commits
+
+
+def normalize(vectors: Any) -> "np.ndarray":
+    """Scale vectors to unit length, so cosine similarity is a dot product.
+
+    Args:
+        vectors: A matrix with one vector per row
+
+    Returns:
+        np.ndarray: The float32 matrix with every non-zero row of length one
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, np.finfo(np.float32).tiny)  # type: ignore[no-any-return]
+
+
+class ExampleIndex:
+    """Embeddings of the repository's commits, to find the ones most like the staged changes.
+
+    The vectors are stored as a NumPy array file in the repository's git
+    directory, next to a JSON file mapping each row to its commit. Every
+    update embeds only the commits made since the last indexed HEAD.
+    """
+
+    def __init__(self, directory: str, model_name: str, max_examples: int = MAX_EXAMPLES) -> None:
+        """Initialize the example index.
+
+        Args:
+            directory: The directory holding the index files
+            model_name: The embedding model; an index built by another one is rebuilt
+            max_examples: Maximum number of commits to keep
+        """
+        self.directory = directory
+        self.model_name = model_name
+        self.max_examples = max_examples
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.oids: list[str] = []
+        self.messages: list[str] = []
+        self.head = ""
+
+    @classmethod
+    def for_repository(cls, model_name: str) -> Optional["ExampleIndex"]:
+        """Open the index of the current repository.
+
+        Args:
+            model_name: The embedding model
+
+        Returns:
+            Optional[ExampleIndex]: The loaded index, or None outside a git repository
+        """
+        git_dir = get_git_dir()
+        if not git_dir:
+            return None
+        index = cls(os.path.join(git_dir, "camus"), model_name)
+        index.load()
+        return index
+
+    @property
+    def vectors_path(self) -> str:
+        """Get the NumPy file holding one embedding per row."""
+        return os.path.join(self.directory, "examples.npy")
+
+    @property
+    def ids_path(self) -> str:
+        """Get the JSON file mapping the rows to commits."""
+        return os.path.join(self.directory, "examples.json")
+
+    def __len__(self) -> int:
+        return len(self.oids)
+
+    def load(self) -> None:
+        """Read the index, starting over if it is missing, corrupt or for another model."""
+        ids = read_json(self.ids_path)
+        try:
+            vectors = np.load(self.vectors_path)
+        except (OSError, ValueError):
+            return
+        oids, messages = ids.get("oids"), ids.get("messages")
+        if (
+            ids.get("model") != self.model_name
+            or not isinstance(oids, list)
+            or not isinstance(messages, list)
+            or vectors.ndim != 2
+            or not len(oids) == len(messages) == vectors.shape[0]
+        ):
+            return
+        self.vectors = vectors.astype(np.float32, copy=False)
+        self.oids = oids
+        self.messages = messages
+        self.head = ids.get("head", "") if isinstance(ids.get("head"), str) else ""
+
+    def save(self) -> None:
+        """Write the index, best effort like the other state files."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".state-", suffix=".npy")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, self.vectors)
+            os.replace(tmp_path, self.vectors_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+        write_json(
+            self.ids_path,
+            {
+                "model": self.model_name,
+                "head": self.head,
+                "oids": self.oids,
+                "messages": self.messages,
+            },
+        )
+
+    def add(self, oids: list[str], messages: list[str], vectors: Any) -> None:
+        """Append commits to the index, dropping the oldest beyond the limit.
+
+        Args:
+            oids: The object ids of the commits, oldest first
+            messages: Their messages
+            vectors: Their embeddings, one row per commit
+        """
+        rows = normalize(vectors)
+        if len(self):
+            rows = np.concatenate([self.vectors, rows])
+        self.oids = self.oids + oids
+        self.messages = self.messages + messages
+        if len(self.oids) > self.max_examples:
+            rows = rows[-self.max_examples :]
+            self.oids = self.oids[-self.max_examples :]
+            self.messages = self.messages[-self.max_examples :]
+        self.vectors = rows
+
+    def update(self, client: "OllamaClient", deadline: Optional[Deadline] = None) -> int:
+        """Embed the commits made since the last update.
+
+        Progress is saved after every batch, so an interrupted update picks up
+        where it stopped instead of embedding the same commits again.
+
+        Args:
+            client: The Ollama client to embed with
+            deadline: The latency budget the requests have to fit in
+
+        Returns:
+            int: The number of commits added
+
+        Raises:
+            httpx.HTTPError: If the server cannot compute the embeddings
+            ValueError: If the server returns malformed embeddings
+            DeadlineExceeded: If the deadline passes before the update is done
+        """
+        head = get_head()
+        if not head or head == self.head:
+            return 0
+        try:
+            commits = read_commits(self.head)
+        except subprocess.CalledProcessError:
+            # The last indexed commit is gone, e.g. after a rewrite and gc
+            commits = read_commits()
+
+        known = set(self.oids)
+        pending = [commit for commit in reversed(commits) if commit[0] not in known and commit[1]]
+        deadline = deadline or Deadline()
+        for start in range(0, len(pending), EMBED_BATCH):
+            batch = pending[start : start + EMBED_BATCH]
+            vectors = client.embed(
+                self.model_name,
+                [f"{message}\n\n{diff}" for _, message, diff in batch],
+                timeout=deadline.timeout(REQUEST_TIMEOUT),
+            )
+            self.add([oid for oid, _, _ in batch], [message for _, message, _ in batch], vectors)
+            self.save()
+        self.head = head
+        self.save()
+        return len(pending)
+
+    def nearest(self, vector: Any, k: int) -> list[str]:
+        """Find the messages of the commits most similar to a vector.
+
+        Args:
+            vector: The embedding to compare with
+            k: The number of messages to return
+
+        Returns:
+            list[str]: Up to k messages, the most similar first
+        """
+        k = min(k, len(self))
+        if k <= 0:
+            return []
+        query = normalize([vector])[0]
+        if query.shape[0] != self.vectors.shape[1]:
+            return []
+        scores = self.vectors @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self.messages[i] for i in top]
+
+    def search(
+        self, client: "OllamaClient", diff: str, k: int, deadline: Optional[Deadline] = None
+    ) -> list[str]:
+        """Bring the index up to date and find the commits most like the staged changes.
+
+        The update gets a small budget of its own, so that indexing a long
+        history does not hold up the run: whatever it did not get to is
+        embedded by the following runs, and the search uses the commits
+        indexed so far.
+
+        Args:
+            client: The Ollama client to embed with
+            diff: The staged diff
+            k: The number of examples to return
+            deadline: The latency budget the requests have to fit in
+
+        Returns:
+            list[str]: Up to k commit messages, the most similar first, each
+            cut to a length suitable for the prompt
+
+        Raises:
+            httpx.HTTPError: If the server cannot compute the embeddings
+            ValueError: If the server returns malformed embeddings
+            DeadlineExceeded: If the deadline passes before the search is done
+        """
+        deadline = deadline or Deadline()
+        remaining = deadline.remaining()
+        budget = UPDATE_BUDGET if remaining is None else min(UPDATE_BUDGET, remaining)
+        try:
+            self.update(client, Deadline(budget))
+        except (DeadlineExceeded, httpx.TimeoutException):
+            pass
+        if not len(self):
+            return []
+        [vector] = client.embed(
+            self.model_name,
+            [diff[:EMBED_DIFF_LENGTH]],
+            timeout=deadline.timeout(REQUEST_TIMEOUT),
+        )
+        return [message[:EXAMPLE_LENGTH] for message in self.nearest(vector, k)]
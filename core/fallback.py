@@ -0,0 +1,75 @@
+"""Local commit message fallback functionality."""
+
+import os
+
+# Same limit the prompt asks the model to respect
+MAX_FALLBACK_LENGTH = 150
+
+
+def summarize_diff(diff: str) -> list[tuple[str, int, int]]:
+    """Count added and removed lines per file in a unified diff.
+
+    Args:
+        diff: The git diff output
+
+    Returns:
+        list[tuple[str, int, int]]: (path, added, removed) in diff order
+    """
+    files: list[tuple[str, int, int]] = []
+    path = ""
+    added = removed = 0
+    for line in diff.splitlines():
+        if line.startswith("diff --git "):
+            if path:
+                files.append((path, added, removed))
+            path = line.rsplit(" b/", 1)[-1]
+            added = removed = 0
+        elif line.startswith(("+++", "---")):
+            continue
+        elif line.startswith("+"):
+            added += 1
+        elif line.startswith("-"):
+            removed += 1
+    if path:
+        files.append((path, added, removed))
+    return files
+
+
+def fallback_commit_message(diff: str, status: str) -> str:
+    """Build a commit message locally from the staged change statistics.
+
+    Used when Ollama cannot answer within the latency budget. The result only
+    depends on its inputs, so the same staged changes always get the same
+    message.
+
+    Args:
+        diff: The git diff output, possibly empty or truncated
+        status: The git status output
+
+    Returns:
+        str: The commit message
+    """
+    files = summarize_diff(diff)
+    if files:
+        paths = [path for path, _, _ in files]
+        added = sum(a for _, a, _ in files)
+        removed = sum(r for _, _, r in files)
+        stats = f" (+{added}/-{removed})"
+    else:
+        paths = [line[3:].strip() for line in status.splitlines() if line.strip()]
+        stats = ""
+
+    if not paths:
+        subject = "the staged changes"
+    elif len(paths) == 1:
+        subject = os.path.basename(paths[0])
+    else:
+        directories = sorted({os.path.dirname(path) or "." for path in paths})
+        subject = f"{len(paths)} files in {', '.join(directories[:3])}"
+        if len(directories) > 3:
+            subject += ", ..."
+
+    message = f"Roll the boulder through {subject}{stats}; one must imagine Sisyphus happy"
+    if len(message) > MAX_FALLBACK_LENGTH:
+        message = message[: MAX_FALLBACK_LENGTH - 3].rstrip() + "..."
+    return message
@@ -1,41 +1,179 @@
 """Git operations functionality."""
 
+import os
 import subprocess
 import sys
+from typing import Optional
 
 import click
 
+from .tracing import current_span, traced
 
-def get_git_diff() -> str:
-    """Get the git diff of staged changes."""
+
+@traced("git.diff")
+def get_git_diff(timeout: Optional[float] = None) -> str:
+    """Get the git diff of staged changes.
+
+    Args:
+        timeout: Seconds to wait for git, or None to wait indefinitely
+
+    Raises:
+        subprocess.TimeoutExpired: If git does not finish within the timeout
+    """
     try:
-        return subprocess.check_output(
-            ["git", "diff", "--cached"], text=True, stderr=subprocess.PIPE
+        diff = subprocess.check_output(
+            ["git", "diff", "--cached"], text=True, stderr=subprocess.PIPE, timeout=timeout
         )
     except subprocess.CalledProcessError:
         return ""
+    current_span().set_attribute("git.diff.bytes", len(diff))
+    return diff
+
+
+@traced("git.diff_trees")
+def get_tree_diff(old_tree: str, new_tree: str, timeout: Optional[float] = None) -> str:
+    """Get the diff between two trees, e.g. two states of the index.
+
+    Args:
+        old_tree: The object id of the earlier tree
+        new_tree: The object id of the later tree
+        timeout: Seconds to wait for git, or None to wait indefinitely
+
+    Returns:
+        str: The diff, empty if the trees are equal or one of them is missing
+
+    Raises:
+        subprocess.TimeoutExpired: If git does not finish within the timeout
+    """
+    try:
+        diff = subprocess.check_output(
+            ["git", "diff", "--no-color", "--no-ext-diff", old_tree, new_tree, "--"],
+            text=True,
+            stderr=subprocess.PIPE,
+            timeout=timeout,
+        )
+    except subprocess.CalledProcessError:
+        return ""
+    current_span().set_attribute("git.diff.bytes", len(diff))
+    return diff
+
+
+@traced("git.status")
+def get_git_status(timeout: Optional[float] = None) -> str:
+    """Get the git status of staged changes.
 
+    Args:
+        timeout: Seconds to wait for git, or None to wait indefinitely
 
-def get_git_status() -> str:
-    """Get the git status of staged changes."""
+    Raises:
+        subprocess.TimeoutExpired: If git does not finish within the timeout
+    """
     try:
         return subprocess.check_output(
-            ["git", "status", "--porcelain"], text=True, stderr=subprocess.PIPE
+            ["git", "status", "--porcelain"], text=True, stderr=subprocess.PIPE, timeout=timeout
         )
     except subprocess.CalledProcessError:
         return ""
 
 
+# Hooks `git commit` runs, which the plumbing commit would skip
+COMMIT_HOOKS = ("pre-commit", "prepare-commit-msg", "commit-msg", "post-commit")
+
+# State files of an operation that `git commit` has to conclude
+PENDING_OPERATIONS = ("MERGE_HEAD", "CHERRY_PICK_HEAD", "REVERT_HEAD")
+
+
+def can_commit_with_plumbing() -> bool:
+    """Check whether a commit can skip `git commit` without changing the outcome.
+
+    That is not the case when a commit hook is installed, a merge, cherry-pick
+    or revert is in progress, or commits are to be signed.
+    """
+    paths = [f"hooks/{hook}" for hook in COMMIT_HOOKS] + list(PENDING_OPERATIONS)
+    arguments = [argument for path in paths for argument in ("--git-path", path)]
+    try:
+        resolved = subprocess.check_output(
+            ["git", "rev-parse", *arguments],
+            text=True,
+            stderr=subprocess.PIPE,
+        ).splitlines()
+        signing = subprocess.run(
+            ["git", "config", "--type=bool", "commit.gpgSign"],
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except subprocess.CalledProcessError:
+        return False
+    if signing == "true" or len(resolved) != len(paths):
+        return False
+    hooks, pending = resolved[: len(COMMIT_HOOKS)], resolved[len(COMMIT_HOOKS) :]
+    if any(os.access(hook, os.X_OK) for hook in hooks):
+        return False
+    return not any(os.path.exists(path) for path in pending)
+
+
+@traced("git.commit_tree")
+def commit_with_plumbing(message: str) -> bool:
+    """Commit the index with plumbing commands instead of `git commit`.
+
+    `git commit` refreshes the index and looks for hooks, which takes long in
+    large repositories. Here the tree is written from the index as it is,
+    the commit object is created with the message on stdin, and HEAD is moved
+    only if it still points where it did, so a concurrent commit is never
+    overwritten.
+
+    Args:
+        message: The commit message
+
+    Returns:
+        bool: True if the commit was made; False if `git commit` is needed
+        instead, because of hooks or other state it handles, or because a
+        plumbing step failed
+    """
+    if not can_commit_with_plumbing():
+        return False
+    tree = get_index_tree()
+    if not tree:
+        return False
+    parent = get_head()
+    subject = message.splitlines()[0] if message else ""
+    try:
+        commit = subprocess.run(
+            ["git", "commit-tree", tree, *(["-p", parent] if parent else [])],
+            input=message,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        reflog = f"commit: {subject}" if parent else f"commit (initial): {subject}"
+        subprocess.run(
+            ["git", "update-ref", "-m", reflog, "HEAD", commit, parent],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except subprocess.CalledProcessError:
+        return False
+    click.echo(f"Committed with message: {message}")
+    return True
+
+
+@traced("git.commit")
 def perform_git_commit(message: str) -> None:
-    """Perform the git commit with the given message."""
+    """Perform the git commit with the given message.
+
+    The message is passed on stdin rather than the command line, which keeps
+    long messages clear of argument length limits and out of process listings.
+    """
     try:
-        subprocess.run(["git", "commit", "-m", message], check=True, text=True)
+        subprocess.run(["git", "commit", "-F", "-"], input=message, check=True, text=True)
         click.echo(f"Committed with message: {message}")
     except subprocess.CalledProcessError as e:
         click.echo(f"Error committing: {e}", err=True)
         sys.exit(1)
 
 
+@traced("git.check_repository")
 def check_git_repository() -> None:
     """Check if we're in a git repository."""
     try:
@@ -48,5 +186,57 @@ def check_git_repository() -> None:
 
 
 def has_staged_changes(status: str) -> bool:
-    """Check if there are any staged changes."""
-    return bool(status.strip())
+    """Check if there are any staged changes.
+
+    The first column of `git status --porcelain` is the state in the index,
+    which is blank for files with only unstaged changes and marks untracked
+    and ignored files with ? and !.
+    """
+    return any(line[:1] not in ("", " ", "\t", "?", "!") for line in status.splitlines())
+
+
+def get_git_dir() -> str:
+    """Get the path of the repository's git directory."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--absolute-git-dir"], text=True, stderr=subprocess.PIPE
+        ).strip()
+    except subprocess.CalledProcessError:
+        return ""
+
+
+def get_git_path(path: str) -> str:
+    """Resolve a path inside the git directory, honouring settings such as core.hooksPath."""
+    try:
+        resolved = subprocess.check_output(
+            ["git", "rev-parse", "--git-path", path], text=True, stderr=subprocess.PIPE
+        ).strip()
+    except subprocess.CalledProcessError:
+        return ""
+    return os.path.abspath(resolved)
+
+
+def get_head() -> str:
+    """Get the object id HEAD points at, or an empty string before the first commit."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "-q", "--verify", "HEAD^{commit}"],
+            text=True,
+            stderr=subprocess.PIPE,
+        ).strip()
+    except subprocess.CalledProcessError:
+        return ""
+
+
+def get_index_tree() -> str:
+    """Get the object id of the tree recorded in the index.
+
+    The id identifies the staged changes exactly, which makes it a stable
+    cache key for anything derived from them.
+    """
+    try:
+        return subprocess.check_output(
+            ["git", "write-tree"], text=True, stderr=subprocess.PIPE
+        ).strip()
+    except subprocess.CalledProcessError:
+        return ""
@@ -0,0 +1,68 @@
+"""Ollama reachability state functionality."""
+
+import os
+import time
+from typing import Optional
+
+from .state import read_json, user_cache_dir, write_json
+
+# Seconds a reachability probe result stays valid
+HEALTH_TTL = 15.0
+
+
+class HealthCache:
+    """Recent reachability results per Ollama host.
+
+    Shared by every invocation of the current user, so that while a server is
+    down only the first invocation pays for the probe.
+    """
+
+    def __init__(self, path: str, ttl: float = HEALTH_TTL) -> None:
+        """Initialize the health cache.
+
+        Args:
+            path: The JSON file backing the cache
+            ttl: Seconds a recorded result stays valid
+        """
+        self.path = path
+        self.ttl = ttl
+
+    @classmethod
+    def for_user(cls, ttl: float = HEALTH_TTL) -> "HealthCache":
+        """Open the health cache of the current user.
+
+        Args:
+            ttl: Seconds a recorded result stays valid
+
+        Returns:
+            HealthCache: The cache in the user's cache directory
+        """
+        return cls(os.path.join(user_cache_dir(), "health.json"), ttl)
+
+    def get(self, host: str) -> Optional[bool]:
+        """Look up the recent reachability of a host.
+
+        Args:
+            host: The Ollama host URL
+
+        Returns:
+            Optional[bool]: Whether the host was reachable, or None if unknown or stale
+        """
+        entry = read_json(self.path).get(host)
+        if not isinstance(entry, dict):
+            return None
+        checked_at = entry.get("checked_at", 0.0)
+        if not 0.0 <= time.time() - checked_at < self.ttl:
+            return None
+        return bool(entry.get("ok"))
+
+    def put(self, host: str, ok: bool) -> None:
+        """Record the reachability of a host.
+
+        Args:
+            host: The Ollama host URL
+            ok: Whether the host was reachable
+        """
+        data = read_json(self.path)
+        data[host] = {"ok": ok, "checked_at": time.time()}
+        write_json(self.path, data)
@@ -0,0 +1,107 @@
+"""Commit history context functionality."""
+
+import os
+import subprocess
+from typing import Optional
+
+from .git_operations import get_git_dir, get_head
+from .state import read_json, write_json
+
+# Subjects kept per repository; also the most a single walk reads
+MAX_SUBJECTS = 50
+
+
+def read_log(revisions: str, limit: int = MAX_SUBJECTS) -> list[tuple[str, list[str], str]]:
+    """Read the newest commits of a revision range.
+
+    Args:
+        revisions: The revisions to walk, e.g. "HEAD" or "old..HEAD"
+        limit: Maximum number of commits to read
+
+    Returns:
+        list[tuple[str, list[str], str]]: The object id, parent ids and subject
+        of each commit, newest first
+
+    Raises:
+        subprocess.CalledProcessError: If git cannot walk the range, e.g.
+        because one of its ends no longer exists
+    """
+    output = subprocess.check_output(
+        ["git", "log", f"--max-count={limit}", "--format=%H%x00%P%x00%s", revisions, "--"],
+        text=True,
+        stderr=subprocess.PIPE,
+    )
+    commits = []
+    for line in output.splitlines():
+        oid, parents, subject = line.split("\0", 2)
+        commits.append((oid, parents.split(), subject))
+    return commits
+
+
+class HistoryCache:
+    """Subjects of the latest commits, keyed by the commit HEAD points at.
+
+    While HEAD stays put the subjects are served from the cache without
+    walking the history. When HEAD moves forward only the new commits are
+    read; after a rewrite, reset or branch switch the newest commits are read
+    again, never more than the cache holds.
+    """
+
+    def __init__(self, path: str, max_subjects: int = MAX_SUBJECTS) -> None:
+        """Initialize the history cache.
+
+        Args:
+            path: The JSON file backing the cache
+            max_subjects: Maximum number of subjects to keep
+        """
+        self.path = path
+        self.max_subjects = max_subjects
+
+    @classmethod
+    def for_repository(cls) -> Optional["HistoryCache"]:
+        """Open the history cache of the current repository.
+
+        Returns:
+            Optional[HistoryCache]: The cache, or None outside a git repository
+        """
+        git_dir = get_git_dir()
+        if not git_dir:
+            return None
+        return cls(os.path.join(git_dir, "camus", "history.json"))
+
+    def _walk(self, head: str, cached_head: str, cached: list[str]) -> list[str]:
+        if cached_head:
+            try:
+                new = read_log(f"{cached_head}..{head}", self.max_subjects)
+            except subprocess.CalledProcessError:
+                new = []
+            # A forward move ends in a commit whose parent is the cached head
+            if len(new) == self.max_subjects or (new and cached_head in new[-1][1]):
+                return ([subject for _, _, subject in new] + cached)[: self.max_subjects]
+        try:
+            return [subject for _, _, subject in read_log(head, self.max_subjects)]
+        except subprocess.CalledProcessError:
+            return []
+
+    def subjects(self, count: int) -> list[str]:
+        """Get the subjects of the latest commits on HEAD.
+
+        Args:
+            count: The number of subjects wanted, at most max_subjects
+
+        Returns:
+            list[str]: Up to count subjects, newest first; empty before the
+            first commit
+        """
+        head = get_head()
+        if not head:
+            return []
+        data = read_json(self.path)
+        cached = data.get("subjects")
+        cached = [s for s in cached if isinstance(s, str)] if isinstance(cached, list) else []
+        cached_head = data.get("head") if isinstance(data.get("head"), str) else ""
+
+        if head != cached_head or not cached:
+            cached = self._walk(head, cached_head if cached else "", cached)
+            write_json(self.path, {"head": head, "subjects": cached})
+        return cached[:count]
@@ -0,0 +1,213 @@
+"""prepare-commit-msg hook functionality."""
+
+import os
+import stat
+import subprocess
+import threading
+from typing import Optional
+
+import click
+
+from .cache import MessageCache
+from .config import LatencyProfile
+from .deadline import Deadline, DeadlineExceeded
+from .git_operations import get_git_diff, get_git_path, get_git_status, get_index_tree
+from .ollama_client import HEALTH_TIMEOUT, OllamaClient, OllamaRequest
+from .router import ModelRouter, resolve_model
+from .stats import RunLog, run_record
+from .timings import Timings
+
+HOOK_NAME = "prepare-commit-msg"
+HOOK_MARKER = "# Installed by git-camus"
+HOOK_SCRIPT = f"""#!/bin/sh
+{HOOK_MARKER}
+# Commit as usual when git-camus is not on the PATH of this commit, e.g. outside its virtualenv
+command -v git-camus >/dev/null 2>&1 || exit 0
+exec git-camus hook run "$@"
+"""
+
+# Commit message sources for which git already has a message we must not replace
+PRESERVED_SOURCES = ("message", "merge", "squash", "commit")
+
+
+def install_hook(force: bool = False) -> str:
+    """Install the git-camus prepare-commit-msg hook in the current repository.
+
+    Args:
+        force: Replace an existing hook that was not installed by git-camus
+
+    Returns:
+        str: The path of the installed hook
+
+    Raises:
+        click.ClickException: If the hook cannot be installed
+    """
+    hook_path = get_git_path(f"hooks/{HOOK_NAME}")
+    if not hook_path:
+        raise click.ClickException("Not in a git repository")
+
+    if os.path.exists(hook_path) and not force:
+        with open(hook_path, encoding="utf-8", errors="replace") as f:
+            if HOOK_MARKER not in f.read():
+                raise click.ClickException(
+                    f"{hook_path} already exists; use --force to replace it"
+                )
+
+    os.makedirs(os.path.dirname(hook_path), exist_ok=True)
+    with open(hook_path, "w", encoding="utf-8") as f:
+        f.write(HOOK_SCRIPT)
+    mode = os.stat(hook_path).st_mode
+    os.chmod(hook_path, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return hook_path
+
+
+def generate_with_deadline(
+    client: OllamaClient, request_data: OllamaRequest, deadline: float
+) -> Optional[str]:
+    """Stream a commit message, giving up once the deadline has passed.
+
+    The generation runs on a daemon thread so that a stalled server cannot
+    hold the commit hostage: when the deadline expires the partial result is
+    discarded and the thread is left to die with the process.
+
+    Args:
+        client: The Ollama client to generate with
+        request_data: The formatted request data
+        deadline: Seconds allowed for the whole generation
+
+    Returns:
+        Optional[str]: The generated message, or None if it did not finish in time
+    """
+    result: dict[str, str] = {}
+
+    def generate() -> None:
+        try:
+            parts = list(client.stream_api(request_data, timeout=deadline))
+        except Exception as e:
+            result["error"] = str(e)
+            return
+        result["message"] = "".join(parts).strip()
+
+    worker = threading.Thread(target=generate, daemon=True)
+    worker.start()
+    worker.join(deadline)
+
+    if worker.is_alive():
+        click.echo(f"git-camus: no message after {deadline:g}s, leaving it to you", err=True)
+        return None
+    if "error" in result:
+        click.echo(f"git-camus: {result['error']}", err=True)
+        return None
+    return result.get("message") or None
+
+
+def prepare_commit_msg(
+    message_file: str,
+    source: Optional[str],
+    client: OllamaClient,
+    model_name: str,
+    prompt_message: str,
+    deadline: float,
+    system_prompt: Optional[str] = None,
+    profile: Optional[LatencyProfile] = None,
+    router: Optional[ModelRouter] = None,
+    run_log: Optional[RunLog] = None,
+    body_min_files: Optional[int] = None,
+) -> bool:
+    """Fill the commit message file that git hands to prepare-commit-msg.
+
+    A message previewed earlier for the same staged tree is reused as is;
+    otherwise one is streamed from Ollama. The deadline covers the whole
+    hook, reading the changes and probing the server included. The file is
+    left untouched whenever no message could be produced in time, so the
+    hook never gets in the way of the commit.
+
+    The message is not remembered for the check for repeats here, as it can
+    still be edited or the commit aborted; later runs pick it up from HEAD.
+
+    Args:
+        message_file: Path of the file holding the commit message
+        source: The source of the message as passed by git, if any
+        client: The Ollama client to generate with on a cache miss
+        model_name: The model to use
+        prompt_message: The prompt template
+        deadline: Seconds the hook may take to produce a message
+        system_prompt: Optional fixed instructions sent as the system message
+        profile: Optional generation options, the balanced ones by default
+        router: Optional router picking the model by the size of the changes; a
+            routed model is sent the system prompt it needs instead
+        run_log: Optional log to record the run in
+        body_min_files: Ask for a body as well when at least this many files changed
+
+    Returns:
+        bool: True if the message file was filled
+    """
+    if source in PRESERVED_SOURCES:
+        return False
+
+    budget = Deadline(deadline)
+    clock = Timings()
+    try:
+        with clock.phase("git"):
+            status = get_git_status(timeout=budget.remaining())
+        if not status.strip():
+            return False
+
+        diff: Optional[str] = None
+        if router:
+            # Routing needs the diff, which is otherwise only read on a cache miss
+            with clock.phase("git"):
+                diff = get_git_diff(timeout=budget.remaining())
+            routed = router.route(diff, status, profile or LatencyProfile())
+            if routed:
+                model_name, system_prompt = resolve_model(model_name, routed)
+
+        tree = get_index_tree()
+        cache = MessageCache.for_repository()
+        commit_message = cache.get(tree, model_name) if cache else None
+        cache_hit = commit_message is not None
+
+        if commit_message is None:
+            if not client.is_available(timeout=budget.timeout(HEALTH_TIMEOUT)):
+                click.echo(f"git-camus: Ollama is not reachable at {client.host}", err=True)
+                return False
+            if diff is None:
+                with clock.phase("git"):
+                    diff = get_git_diff(timeout=budget.remaining())
+            request_data = client.generate_commit_message_request(
+                diff,
+                status,
+                model_name,
+                prompt_message,
+                system_prompt=system_prompt,
+                profile=profile,
+                body_min_files=body_min_files,
+            )
+            with clock.phase("ollama"):
+                commit_message = generate_with_deadline(
+                    client, request_data, budget.timeout(deadline)
+                )
+            if commit_message and cache:
+                cache.put(tree, model_name, commit_message)
+    except (subprocess.TimeoutExpired, DeadlineExceeded):
+        click.echo(f"git-camus: no message after {deadline:g}s, leaving it to you", err=True)
+        return False
+
+    if run_log:
+        run_log.append(
+            run_record(
+                clock, "hook", model_name, diff or "", commit_message or "", cache_hit=cache_hit
+            )
+        )
+    if commit_message is None:
+        return False
+
+    try:
+        with open(message_file, encoding="utf-8") as f:
+            existing = f.read()
+    except OSError:
+        existing = ""
+
+    with open(message_file, "w", encoding="utf-8") as f:
+        f.write(f"{commit_message}\n{existing}")
+    return True
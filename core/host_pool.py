@@ -0,0 +1,227 @@
+"""Ollama host pool functionality."""
+
+import math
+import os
+import threading
+import time
+from collections.abc import Iterable
+from typing import Any, Optional
+
+from .state import read_json, user_cache_dir, write_json
+
+# Consecutive failures after which a host is taken out of rotation
+EJECT_AFTER_FAILURES = 3
+
+# Seconds an ejected host stays out of rotation before it is tried again
+EJECT_SECONDS = 30.0
+
+# Time-to-first-token percentile after which a hedged request is sent
+HEDGE_PERCENTILE = 0.95
+
+# Time-to-first-token samples needed before hedging kicks in
+MIN_HEDGE_SAMPLES = 5
+
+# Time-to-first-token samples kept for the percentile
+MAX_SAMPLES = 100
+
+# Seconds between writes of new time-to-first-token samples alone
+SAMPLES_SAVE_SECONDS = 60.0
+
+
+def split_hosts(host: str) -> list[str]:
+    """Split a comma separated list of Ollama host URLs.
+
+    Args:
+        host: One host URL, or several separated by commas
+
+    Returns:
+        list[str]: The host URLs without trailing slashes, in order
+    """
+    hosts = [part.strip().rstrip("/") for part in host.split(",")]
+    return [h for h in hosts if h] or [host]
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Get a percentile of samples using the nearest-rank method.
+
+    Args:
+        samples: The samples, in any order
+        fraction: The percentile as a fraction between 0 and 1
+
+    Returns:
+        float: The sample at the requested rank
+    """
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+class HostPool:
+    """Routing and health tracking over a set of Ollama hosts.
+
+    Requests go to the healthy host with the fewest requests in flight.
+    Hosts failing several times in a row are ejected for a while and then
+    re-admitted on probation: one more failure ejects them again, a success
+    restores them fully. Time-to-first-token samples give the hedging delay.
+    """
+
+    def __init__(
+        self,
+        hosts: list[str],
+        eject_after: int = EJECT_AFTER_FAILURES,
+        eject_seconds: float = EJECT_SECONDS,
+        hedge_percentile: float = HEDGE_PERCENTILE,
+        state_path: Optional[str] = None,
+    ) -> None:
+        """Initialize the host pool.
+
+        Args:
+            hosts: The Ollama host URLs, in order of preference
+            eject_after: Consecutive failures after which a host is ejected
+            eject_seconds: Seconds an ejected host stays out of rotation
+            hedge_percentile: Time-to-first-token percentile used as hedging delay
+            state_path: Optional JSON file keeping health and latency across runs
+        """
+        self.hosts = list(hosts)
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.hedge_percentile = hedge_percentile
+        self.state_path = state_path
+        self.outstanding = dict.fromkeys(self.hosts, 0)
+        self.failures = dict.fromkeys(self.hosts, 0)
+        self.ejected_until = dict.fromkeys(self.hosts, 0.0)
+        self.samples: list[float] = []
+        self.saved_at = 0.0
+        self._lock = threading.Lock()
+        if state_path:
+            self._load(state_path)
+
+    @classmethod
+    def for_user(cls, hosts: list[str], **kwargs: Any) -> "HostPool":
+        """Create a pool whose health and latency are shared by the user's runs.
+
+        Args:
+            hosts: The Ollama host URLs, in order of preference
+            **kwargs: Further HostPool arguments
+
+        Returns:
+            HostPool: The pool backed by the user's cache directory
+        """
+        return cls(hosts, state_path=os.path.join(user_cache_dir(), "hosts.json"), **kwargs)
+
+    def _load(self, path: str) -> None:
+        data = read_json(path)
+        hosts = data.get("hosts")
+        for host, entry in hosts.items() if isinstance(hosts, dict) else ():
+            if host not in self.failures or not isinstance(entry, dict):
+                continue
+            # Entries of an older or hand-edited file are skipped rather than trusted
+            failures = entry.get("failures", 0)
+            ejected_until = entry.get("ejected_until", 0.0)
+            if isinstance(failures, int) and isinstance(ejected_until, (int, float)):
+                self.failures[host] = failures
+                self.ejected_until[host] = float(ejected_until)
+        samples = data.get("samples", [])
+        if isinstance(samples, list):
+            samples = [float(s) for s in samples if isinstance(s, (int, float))]
+            self.samples = samples[-MAX_SAMPLES:]
+        saved_at = data.get("saved_at", 0.0)
+        self.saved_at = float(saved_at) if isinstance(saved_at, (int, float)) else 0.0
+
+    def _save(self) -> None:
+        if not self.state_path:
+            return
+        self.saved_at = time.time()
+        data = read_json(self.state_path)
+        hosts = data.get("hosts")
+        if not isinstance(hosts, dict):
+            hosts = {}
+        for host in self.hosts:
+            hosts[host] = {
+                "failures": self.failures[host],
+                "ejected_until": self.ejected_until[host],
+            }
+        write_json(
+            self.state_path,
+            {"hosts": hosts, "samples": self.samples, "saved_at": self.saved_at},
+        )
+
+    def is_ejected(self, host: str) -> bool:
+        """Check whether a host is currently out of rotation."""
+        return self.ejected_until.get(host, 0.0) > time.time()
+
+    def available_hosts(self) -> list[str]:
+        """Get the hosts currently in rotation, in order of preference."""
+        with self._lock:
+            return [h for h in self.hosts if not self.is_ejected(h)]
+
+    def acquire(self, exclude: Iterable[str] = ()) -> Optional[str]:
+        """Pick the host for the next request and count it as in flight.
+
+        When every host is ejected, the one due back soonest is used rather
+        than failing outright.
+
+        Args:
+            exclude: Hosts not to use, such as those already tried
+
+        Returns:
+            Optional[str]: The host URL, or None if every host is excluded
+        """
+        excluded = set(exclude)
+        with self._lock:
+            candidates = [h for h in self.hosts if h not in excluded]
+            if not candidates:
+                return None
+            healthy = [h for h in candidates if not self.is_ejected(h)]
+            if healthy:
+                host = min(healthy, key=lambda h: (self.outstanding[h], self.failures[h]))
+            else:
+                host = min(candidates, key=lambda h: self.ejected_until[h])
+            self.outstanding[host] += 1
+            return host
+
+    def release(self, host: str, ok: bool, first_token: Optional[float] = None) -> None:
+        """Record the outcome of a request acquired from the pool.
+
+        The state file is written when the host's health changes; samples on
+        their own are written at most once every SAMPLES_SAVE_SECONDS.
+
+        Args:
+            host: The host the request went to
+            ok: Whether the host answered
+            first_token: Seconds until the first generated token, if measured
+        """
+        with self._lock:
+            self.outstanding[host] = max(0, self.outstanding[host] - 1)
+            before = (self.failures[host], self.ejected_until[host])
+            if ok:
+                self.failures[host] = 0
+                self.ejected_until[host] = 0.0
+            else:
+                self.failures[host] += 1
+                if self.failures[host] >= self.eject_after:
+                    self.ejected_until[host] = time.time() + self.eject_seconds
+            if first_token is not None:
+                self.samples = (self.samples + [first_token])[-MAX_SAMPLES:]
+            if (self.failures[host], self.ejected_until[host]) != before or (
+                first_token is not None and time.time() - self.saved_at >= SAMPLES_SAVE_SECONDS
+            ):
+                self._save()
+
+    def eject(self, host: str) -> None:
+        """Take a host out of rotation straight away, e.g. after a failed probe."""
+        with self._lock:
+            self.failures[host] = max(self.failures[host], self.eject_after)
+            self.ejected_until[host] = time.time() + self.eject_seconds
+            self._save()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Get how long to wait for a first token before sending a hedged request.
+
+        Returns:
+            Optional[float]: The delay in seconds, or None without enough samples
+        """
+        with self._lock:
+            if len(self.samples) < MIN_HEDGE_SAMPLES:
+                return None
+            return percentile(self.samples, self.hedge_percentile)
@@ -0,0 +1,50 @@
+"""Lazy import functionality."""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Import a module on first attribute access instead of right away.
+
+    The module is registered in sys.modules, so later imports and mock
+    patches of it share the same object.
+
+    Args:
+        name: The absolute module name
+
+    Returns:
+        ModuleType: The module, loaded once one of its attributes is used
+
+    Raises:
+        ModuleNotFoundError: If the module is not installed
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def load_now(module: ModuleType) -> ModuleType:
+    """Finish loading a module from lazy_import in the calling thread.
+
+    The lazy loader is not thread-safe: when two threads use a module first
+    at the same time, one of them can see it half initialised. Code that
+    shares such a module with other threads loads it before starting them.
+
+    Args:
+        module: The module, lazily imported or not
+
+    Returns:
+        ModuleType: The same module, fully loaded
+    """
+    getattr(module, "__dict__")
+    return module
@@ -1,10 +1,136 @@
 """Ollama API client functionality."""
 
+import json
+import queue
 import sys
-from typing import Any, TypedDict
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any, Optional, TypedDict
 
 import click
-import httpx
+
+from .config import LatencyProfile
+from .deadline import Deadline, DeadlineExceeded
+from .fallback import summarize_diff
+from .health import HealthCache
+from .host_pool import HostPool, split_hosts
+from .lazy import lazy_import, load_now
+from .tracing import current_span, traced
+
+if TYPE_CHECKING:
+    import httpx
+else:
+    # Loaded once a client is created, so commands that never reach Ollama skip it
+    httpx = lazy_import("httpx")
+
+# Seconds to wait for a complete response when no deadline is tighter
+REQUEST_TIMEOUT = 120.0
+
+# Seconds the reachability probe may take before the server counts as down
+HEALTH_TIMEOUT = 0.5
+
+
+# Characters per token assumed when sizing the context window, on the low side
+CHARS_PER_TOKEN = 3
+
+# Smallest context window requested
+MIN_CONTEXT = 2048
+
+# Recent commit subjects take at most 1/HISTORY_SHARE of the diff budget
+HISTORY_SHARE = 8
+
+# Tokens added to num_predict per changed file when a body is asked for, and the cap
+BODY_TOKENS_PER_FILE = 24
+MAX_BODY_TOKENS = 512
+
+# Changed files named in the request for a body
+MAX_BODY_FILES = 40
+
+# Instruction following the diff of a large change
+BODY_INSTRUCTION = (
+    "\n\nThese changes are large. Write the message as a subject line, then a blank line, "
+    "then a body with one line starting with \"- \" for each changed file: {files}."
+)
+
+# Request to revise a previewed message, ahead of the changes staged since
+REVISION_PROMPT = (
+    "This commit message was written for the changes staged earlier:\n{message}\n\n"
+    "Revise it so it reflects the changes staged since as well, which follow.\n\n"
+)
+
+
+def history_block(subjects: list[str], budget: int) -> str:
+    """List recent commit subjects for the prompt, newest first.
+
+    Args:
+        subjects: The subjects, newest first
+        budget: Characters the block may take
+
+    Returns:
+        str: As many subjects as fit in the budget, or an empty string if none does
+    """
+    header = "Recent commit subjects in this repository:\n"
+    lines: list[str] = []
+    size = len(header) + 1
+    for subject in subjects:
+        size += len(subject) + 3
+        if size > budget:
+            break
+        lines.append(f"- {subject}\n")
+    return f"{header}{''.join(lines)}\n" if lines else ""
+
+
+def context_size(prompt_length: int, profile: LatencyProfile) -> int:
+    """Size the context window to hold the prompt and the reply.
+
+    Sizes are powers of two: Ollama reloads the model whenever num_ctx
+    changes, so only a handful of distinct values should ever be requested.
+
+    Args:
+        prompt_length: Characters in the prompt
+        profile: The latency profile bounding the window
+
+    Returns:
+        int: The num_ctx to request
+    """
+    needed = prompt_length // CHARS_PER_TOKEN + profile.num_predict
+    size = MIN_CONTEXT
+    while size < needed and size < profile.max_ctx:
+        size *= 2
+    return min(size, profile.max_ctx)
+
+
+def generation_options(profile: LatencyProfile, prompt_length: int) -> dict[str, Any]:
+    """Translate a latency profile into Ollama generation options.
+
+    Args:
+        profile: The latency profile
+        prompt_length: Characters in the prompt
+
+    Returns:
+        dict[str, Any]: The options of an Ollama request
+    """
+    options: dict[str, Any] = {
+        "temperature": profile.temperature,
+        "top_p": profile.top_p,
+        "num_predict": profile.num_predict,
+        "num_ctx": context_size(prompt_length, profile),
+    }
+    if profile.stop:
+        options["stop"] = list(profile.stop)
+    if profile.num_thread is not None:
+        options["num_thread"] = profile.num_thread
+    return options
+
+
+class OllamaError(Exception):
+    """Raised when a request cannot be sent to Ollama."""
+
+
+class OllamaUnavailable(OllamaError):
+    """Raised when the Ollama server cannot be reached."""
 
 
 class OllamaMessage(TypedDict):
@@ -14,76 +140,587 @@ class OllamaMessage(TypedDict):
     content: str
 
 
-class OllamaRequest(TypedDict):
-    """Type for an Ollama API request."""
-
+class _OllamaRequestBase(TypedDict):
     model: str
     messages: list[OllamaMessage]
     stream: bool
     options: dict[str, Any]
 
 
+class OllamaRequest(_OllamaRequestBase, total=False):
+    """Type for an Ollama API request."""
+
+    keep_alive: str
+
+
 class OllamaClient:
     """Client for interacting with Ollama API."""
 
-    def __init__(self, host: str) -> None:
+    def __init__(
+        self,
+        host: str,
+        health_cache: Optional[HealthCache] = None,
+        pool: Optional[HostPool] = None,
+        hedge: bool = False,
+        keep_alive: Optional[str] = None,
+    ) -> None:
         """Initialize the Ollama client.
         
         Args:
-            host: The Ollama host URL
+            host: The Ollama host URL, or several separated by commas
+            health_cache: Optional cache of recent reachability results
+            pool: Optional pool routing requests over the hosts
+            hedge: Send a duplicate request to a second host when the first is slow
+            keep_alive: How long the server keeps the model loaded after a request
         """
-        self.host = host
+        # Requests run on several threads, which must not race to load httpx
+        load_now(httpx)
+        self.hosts = split_hosts(host)
+        self.host = self.hosts[0]
+        self.health_cache = health_cache
+        self.pool = pool if pool is not None else HostPool(self.hosts)
+        self.hedge = hedge
+        self.keep_alive = keep_alive
+
+    def check_health(self, timeout: float = HEALTH_TIMEOUT, host: Optional[str] = None) -> bool:
+        """Probe an Ollama server with a cheap request.
+
+        Args:
+            timeout: Seconds to wait for the server
+            host: The host to probe, the first configured one by default
+
+        Returns:
+            bool: True if the server answered
+        """
+        try:
+            response = httpx.get(f"{host or self.host}/api/version", timeout=timeout)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            return False
+        return True
+
+    def is_available(self, timeout: float = HEALTH_TIMEOUT) -> bool:
+        """Check whether any Ollama server is reachable, reusing recent results.
+
+        Hosts failing the probe are ejected from the pool, so requests are
+        not routed to them.
+
+        Args:
+            timeout: Seconds each probe may take when no recent result is known
+
+        Returns:
+            bool: True if at least one server is reachable
+        """
+        for host in self.pool.available_hosts() or self.hosts:
+            ok = self.health_cache.get(host) if self.health_cache is not None else None
+            if ok is None:
+                ok = self.check_health(timeout, host)
+                if self.health_cache is not None:
+                    self.health_cache.put(host, ok)
+            if ok:
+                return True
+            self.pool.eject(host)
+        return False
 
     def generate_commit_message_request(
-        self, diff: str, status: str, model_name: str, prompt_message: str, max_diff_length: int = 8000
+        self,
+        diff: str,
+        status: str,
+        model_name: str,
+        prompt_message: str,
+        max_diff_length: Optional[int] = None,
+        system_prompt: Optional[str] = None,
+        profile: Optional[LatencyProfile] = None,
+        examples: Optional[list[str]] = None,
+        history: Optional[list[str]] = None,
+        body_min_files: Optional[int] = None,
+        revision: Optional[tuple[str, str]] = None,
     ) -> OllamaRequest:
         """Format the git diff and status data for the Ollama API.
 
+        The instructions go into a system message that is identical for every
+        request, followed by the user message with the diff last. Keeping the
+        prefix stable lets the server reuse its KV cache instead of processing
+        the instructions again.
+
         Args:
             diff: The git diff output
             status: The git status output
             model_name: The model to use
             prompt_message: The prompt template
-            max_diff_length: Maximum length for git diff
+            max_diff_length: Maximum length for git diff, the profile's by default
+            system_prompt: Optional fixed instructions sent as the system message
+            profile: The generation options to use, the balanced ones by default
+            examples: Optional earlier commit messages of the repository to imitate
+            history: Optional subjects of the latest commits, newest first; they
+                take at most an eighth of the diff budget, and the diff the rest
+            body_min_files: Ask for a subject and a body with a line per file when
+                at least this many files changed; subject only if None
+            revision: Optional message previewed for earlier staged changes and the
+                diff staged since; the prompt then asks for a revision of the
+                message and carries that diff only, in place of the full one
 
         Returns:
             OllamaRequest: The formatted request for the Ollama API
         """
+        if profile is None:
+            profile = LatencyProfile()
+        if max_diff_length is None:
+            max_diff_length = profile.max_diff_length
+
+        # Counted on the whole diff, before it is truncated
+        files = [path for path, _, _ in summarize_diff(diff)]
+        body = body_min_files is not None and len(files) >= body_min_files
+        if body:
+            # Subject and body come from the same generation, so it must go past the first line
+            profile = replace(
+                profile,
+                stop=[],
+                num_predict=min(
+                    MAX_BODY_TOKENS, profile.num_predict + BODY_TOKENS_PER_FILE * len(files)
+                ),
+            )
+
+        recent = history_block(history, max_diff_length // HISTORY_SHARE) if history else ""
+        max_diff_length -= len(recent)
+
+        if revision is not None:
+            previewed, diff = revision
+            max_diff_length -= len(previewed)
+
         # Truncate diff if it's too long
         if len(diff) > max_diff_length:
-            diff = diff[:max_diff_length] + "\n... (truncated)"
+            diff = diff[: max(0, max_diff_length)] + "\n... (truncated)"
+
+        prompt = recent + prompt_message.format(diff=diff, status=status)
+        if body:
+            named = ", ".join(files[:MAX_BODY_FILES])
+            if len(files) > MAX_BODY_FILES:
+                named += f" and {len(files) - MAX_BODY_FILES} more"
+            prompt += BODY_INSTRUCTION.format(files=named)
+        if revision is not None:
+            prompt = REVISION_PROMPT.format(message=previewed) + prompt
+        if examples:
+            # Ahead of the changes, keeping the system message the same for every request
+            listed = "\n\n".join(f"---\n{example}" for example in examples)
+            prompt = f"Earlier commit messages in this repository:\n{listed}\n---\n\n{prompt}"
 
-        prompt = prompt_message.format(diff=diff, status=status)
+        messages: list[OllamaMessage] = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
 
-        return {
+        request_data: OllamaRequest = {
             "model": model_name,
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": messages,
             "stream": False,
-            "options": {"temperature": 0.7, "top_p": 0.9, "max_tokens": 150},
+            "options": generation_options(profile, sum(len(m["content"]) for m in messages)),
         }
+        if body:
+            # Override the stop a derived model may have baked in
+            request_data["options"]["stop"] = []
+        if self.keep_alive is not None:
+            request_data["keep_alive"] = self.keep_alive
+        return request_data
+
+    def warm(self, model_name: str, host: Optional[str] = None) -> None:
+        """Load a model into memory without generating anything.
+
+        Args:
+            model_name: The model to load
+            host: The host to load it on, the first configured one by default
+
+        Raises:
+            httpx.HTTPError: If the server cannot load the model
+        """
+        payload: dict[str, Any] = {"model": model_name}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        response = httpx.post(
+            f"{host or self.host}/api/generate", json=payload, timeout=REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+
+    def create_model(
+        self,
+        model_name: str,
+        base_model: str,
+        system_prompt: str,
+        parameters: dict[str, Any],
+        host: Optional[str] = None,
+    ) -> None:
+        """Create a model deriving from another one with a baked-in system prompt.
+
+        Requests to the derived model need no system message: the server
+        applies the stored one, keeping every payload down to the changes.
+
+        Args:
+            model_name: The name of the model to create
+            base_model: The model to derive from
+            system_prompt: The system prompt stored with the model
+            parameters: Default generation options stored with the model
+            host: The host to create it on, the first configured one by default
 
-    def call_api(self, request_data: OllamaRequest) -> dict[str, Any]:
+        Raises:
+            httpx.HTTPError: If the server cannot create the model
+        """
+        payload = {
+            "model": model_name,
+            "from": base_model,
+            "system": system_prompt,
+            "parameters": parameters,
+            "stream": False,
+        }
+        response = httpx.post(
+            f"{host or self.host}/api/create", json=payload, timeout=REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+
+    @traced("ollama.embed")
+    def embed(
+        self, model_name: str, texts: list[str], timeout: float = REQUEST_TIMEOUT
+    ) -> list[list[float]]:
+        """Compute embedding vectors for texts in one request.
+
+        Args:
+            model_name: The embedding model to use
+            texts: The texts to embed
+            timeout: Seconds to wait for the server
+
+        Returns:
+            list[list[float]]: One vector per text, in the same order
+
+        Raises:
+            httpx.HTTPError: If the server cannot compute the embeddings
+            ValueError: If the response does not hold one vector per text
+        """
+        payload: dict[str, Any] = {"model": model_name, "input": texts}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        embeddings = self._call_pooled(payload, timeout, path="/api/embed").get("embeddings")
+        if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings from {model_name}")
+        return embeddings
+
+    def warm_async(self, model_name: str) -> threading.Thread:
+        """Start loading a model on every host in rotation in the background.
+
+        Any error is ignored: warming up is an optimisation that must never
+        take the real request down with it, and a server that is down is
+        reported by the request that actually needs it.
+
+        Args:
+            model_name: The model to load
+
+        Returns:
+            threading.Thread: The daemon thread doing the work
+        """
+
+        def warm_all() -> None:
+            for host in self.pool.available_hosts():
+                try:
+                    self.warm(model_name, host)
+                except Exception:
+                    pass
+
+        thread = threading.Thread(target=warm_all, daemon=True)
+        thread.start()
+        return thread
+
+    @traced("ollama.call_api")
+    def call_api(
+        self,
+        request_data: OllamaRequest,
+        deadline: Optional[Deadline] = None,
+        context: Optional[list[int]] = None,
+    ) -> dict[str, Any]:
         """Call the local Ollama API to generate a commit message.
 
+        Passing a context sends the request through the generate endpoint,
+        which returns the conversation as a context that a later request can
+        continue from: the server then skips processing the shared prefix
+        again. An empty context starts a new conversation.
+
         Args:
             request_data: The formatted request data
+            deadline: Optional latency budget the request has to fit in
+            context: Optional context returned by an earlier call to continue from
 
         Returns:
-            dict[str, Any]: The API response containing the generated message
+            dict[str, Any]: The API response containing the generated message,
+            and the new context when one was passed
 
         Raises:
+            DeadlineExceeded: If the request does not complete within the deadline
+            OllamaUnavailable: If there is no host to send the request to, or
+                none of them accepts the connection
             SystemExit: If the API call fails
         """
+        timeout = deadline.timeout(REQUEST_TIMEOUT) if deadline else REQUEST_TIMEOUT
         try:
             click.echo("Sending request to Ollama API...", err=True)
-            response = httpx.post(f"{self.host}/api/chat", json=request_data, timeout=120.0)
-            response.raise_for_status()
-            return response.json()  # type: ignore[no-any-return]
-        except httpx.HTTPError as e:
+            if context is not None:
+                response = self._call_generate(request_data, context, timeout)
+            elif self.hedge and len(self.pool.available_hosts()) > 1:
+                response = self._call_hedged(request_data, timeout)
+            else:
+                response = self._call_pooled(request_data, timeout)
+            current_span().set_attributes(
+                {
+                    "gen_ai.system": "ollama",
+                    "gen_ai.request.model": request_data["model"],
+                    "gen_ai.usage.input_tokens": response.get("prompt_eval_count"),
+                    "gen_ai.usage.output_tokens": response.get("eval_count"),
+                }
+            )
+            return response
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            # Every host refused the connection and is now recorded as down,
+            # overriding a reachability probe that succeeded a moment earlier
+            hosts = ", ".join(self.hosts)
+            raise OllamaUnavailable(f"Could not connect to Ollama at {hosts}") from e
+        except httpx.TimeoutException as e:
+            if deadline is not None and deadline.seconds is not None:
+                raise DeadlineExceeded(f"no response from Ollama within {timeout:.1f}s") from e
             click.echo(f"API error: {e}", err=True)
             click.echo("Make sure Ollama is running and accessible", err=True)
             sys.exit(1)
-        except httpx.ConnectError:
-            click.echo(f"Could not connect to Ollama at {self.host}", err=True)
-            click.echo("Make sure Ollama is running and the host/port is correct", err=True)
+        except httpx.HTTPError as e:
+            click.echo(f"API error: {e}", err=True)
+            click.echo("Make sure Ollama is running and accessible", err=True)
             sys.exit(1)
+
+    def _mark_down(self, host: str) -> None:
+        self.pool.release(host, ok=False)
+        if self.health_cache is not None:
+            self.health_cache.put(host, False)
+
+    def _call_generate(
+        self, request_data: OllamaRequest, context: list[int], timeout: float
+    ) -> dict[str, Any]:
+        """Send a chat-style request through the generate endpoint to carry a context."""
+        messages = request_data["messages"]
+        payload: dict[str, Any] = {
+            "model": request_data["model"],
+            "prompt": "\n\n".join(m["content"] for m in messages if m["role"] != "system"),
+            "stream": False,
+            "options": request_data["options"],
+        }
+        system = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+        if system:
+            payload["system"] = system
+        if context:
+            payload["context"] = context
+        if "keep_alive" in request_data:
+            payload["keep_alive"] = request_data["keep_alive"]
+
+        response = self._call_pooled(payload, timeout, path="/api/generate")
+        response["message"] = {"role": "assistant", "content": response.get("response", "")}
+        return response
+
+    def _call_pooled(
+        self, payload: Any, timeout: float, path: str = "/api/chat"
+    ) -> dict[str, Any]:
+        """Send the request to the least loaded host, failing over on connection errors."""
+        tried: list[str] = []
+        while True:
+            host = self.pool.acquire(exclude=tried)
+            if host is None:
+                raise httpx.ConnectError(f"Could not connect to {', '.join(tried)}")
+            tried.append(host)
+            try:
+                current_span().set_attributes({"server.address": host, "url.path": path})
+                response = httpx.post(f"{host}{path}", json=payload, timeout=timeout)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                self._mark_down(host)
+                if len(tried) == len(self.hosts):
+                    raise
+                continue
+            except httpx.HTTPError:
+                self.pool.release(host, ok=False)
+                raise
+            self.pool.release(host, ok=not response.is_server_error)
+            response.raise_for_status()
+            return response.json()  # type: ignore[no-any-return]
+
+    def _stream_chunks(
+        self,
+        host: str,
+        request_data: OllamaRequest,
+        timeout: float,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream the raw response chunks of a chat request to one host."""
+        payload = {**request_data, "stream": True}
+        with httpx.stream("POST", f"{host}/api/chat", json=payload, timeout=timeout) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if cancel is not None and cancel.is_set():
+                    return
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                yield chunk
+                if chunk.get("done"):
+                    return
+
+    def _call_hedged(self, request_data: OllamaRequest, timeout: float) -> dict[str, Any]:
+        """Stream from one host and, if it is slow to start, from a second one too.
+
+        Whichever host produces the first token wins; the other attempt is
+        cancelled. The hedging delay is a percentile of past times to first
+        token, so only the slowest few requests are duplicated. A host that
+        refuses the connection is replaced by the next one straight away,
+        without waiting for the hedging delay. The whole call, over all
+        hosts, takes at most `timeout` seconds.
+
+        Raises:
+            OllamaUnavailable: If there is no host to send the request to
+            httpx.HTTPError: If the request fails on every host tried, or
+                no answer completes within the timeout
+        """
+        events: queue.Queue[tuple[str, _Attempt]] = queue.Queue()
+        attempts: list[_Attempt] = []
+        end = time.monotonic() + timeout
+
+        def start(host: str) -> None:
+            attempt = _Attempt(host)
+            attempts.append(attempt)
+            threading.Thread(
+                target=self._run_attempt,
+                args=(attempt, request_data, max(0.0, end - time.monotonic()), events),
+                daemon=True,
+            ).start()
+
+        first = self.pool.acquire()
+        if first is None:
+            raise OllamaUnavailable(
+                f"No Ollama host to send the request to among {', '.join(self.hosts)}"
+            )
+        start(first)
+        delay = self.pool.hedge_delay()
+        hedge_at = None if delay is None else time.monotonic() + delay
+        winner: Optional[_Attempt] = None
+
+        while True:
+            now = time.monotonic()
+            if now >= end:
+                for attempt in attempts:
+                    attempt.cancel.set()
+                raise httpx.ReadTimeout(f"no response from Ollama within {timeout:.1f}s")
+            wait = end - now if hedge_at is None else max(0.0, min(hedge_at, end) - now)
+            try:
+                kind, attempt = events.get(timeout=wait)
+            except queue.Empty:
+                if hedge_at is not None and time.monotonic() < end:
+                    hedge_at = None
+                    second = self.pool.acquire(exclude=[a.host for a in attempts])
+                    if second is not None:
+                        start(second)
+                continue
+
+            if kind == "token" and winner is None:
+                winner = attempt
+                hedge_at = None
+                for other in attempts:
+                    if other is not attempt:
+                        other.cancel.set()
+            elif kind == "done" and (winner is None or attempt is winner):
+                if attempt.error is None:
+                    return attempt.result
+                if winner is None and isinstance(
+                    attempt.error, (httpx.ConnectError, httpx.ConnectTimeout)
+                ):
+                    # Fail over to the next host rather than waiting to hedge
+                    replacement = self.pool.acquire(exclude=[a.host for a in attempts])
+                    if replacement is not None:
+                        start(replacement)
+                        continue
+                if attempt is winner or all(a.finished for a in attempts):
+                    raise attempt.error
+
+    def _run_attempt(
+        self,
+        attempt: "_Attempt",
+        request_data: OllamaRequest,
+        timeout: float,
+        events: "queue.Queue[tuple[str, _Attempt]]",
+    ) -> None:
+        """Run one hedged attempt, reporting its first token and completion."""
+        started = time.monotonic()
+        first_token = None
+        parts: list[str] = []
+        try:
+            for chunk in self._stream_chunks(attempt.host, request_data, timeout, attempt.cancel):
+                content = chunk.get("message", {}).get("content", "")
+                if content and first_token is None:
+                    first_token = time.monotonic() - started
+                    events.put(("token", attempt))
+                parts.append(content)
+                if chunk.get("done"):
+                    attempt.result = {
+                        **chunk,
+                        "message": {"role": "assistant", "content": "".join(parts)},
+                    }
+        except httpx.HTTPError as e:
+            attempt.error = e
+        finally:
+            if isinstance(attempt.error, (httpx.ConnectError, httpx.ConnectTimeout)):
+                self._mark_down(attempt.host)
+            else:
+                self.pool.release(attempt.host, ok=attempt.error is None, first_token=first_token)
+            if attempt.error is None and not attempt.result and not attempt.cancel.is_set():
+                attempt.error = httpx.RemoteProtocolError("response ended before completion")
+            attempt.finished = True
+            events.put(("done", attempt))
+
+    def stream_api(
+        self, request_data: OllamaRequest, timeout: float = REQUEST_TIMEOUT
+    ) -> Iterator[str]:
+        """Stream a commit message from the local Ollama API as it is generated.
+
+        Args:
+            request_data: The formatted request data
+            timeout: Network timeout in seconds for each read
+
+        Yields:
+            str: Pieces of the generated message in order
+
+        Raises:
+            httpx.HTTPError: If the API call fails
+            OllamaUnavailable: If there is no host to send the request to
+        """
+        host = self.pool.acquire()
+        if host is None:
+            raise OllamaUnavailable(
+                f"No Ollama host to send the request to among {', '.join(self.hosts)}"
+            )
+        started = time.monotonic()
+        first_token = None
+        error: Optional[httpx.HTTPError] = None
+        try:
+            for chunk in self._stream_chunks(host, request_data, timeout):
+                content = chunk.get("message", {}).get("content", "")
+                if content:
+                    if first_token is None:
+                        first_token = time.monotonic() - started
+                    yield content
+        except httpx.HTTPError as e:
+            error = e
+            raise
+        finally:
+            if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+                self._mark_down(host)
+            else:
+                self.pool.release(host, ok=error is None, first_token=first_token)
+
+
+class _Attempt:
+    """State of one request in a hedged call."""
+
+    def __init__(self, host: str) -> None:
+        self.host = host
+        self.cancel = threading.Event()
+        self.result: dict[str, Any] = {}
+        self.error: Optional[httpx.HTTPError] = None
+        self.finished = False
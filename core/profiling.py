@@ -0,0 +1,150 @@
+"""Run profiling functionality."""
+
+import cProfile
+import io
+import os
+import platform
+import pstats
+import subprocess
+import sys
+import time
+import tracemalloc
+from types import TracebackType
+from typing import Any, Optional
+
+import click
+
+# Functions listed in the summary, by cumulative time
+PROFILE_TOP = 25
+
+# Allocation sites listed in the summary when memory is traced
+MEMORY_TOP = 10
+
+
+class Profiler:
+    """Profile a run for a bug report.
+
+    While active, the run executes under cProfile and, optionally,
+    tracemalloc, and the wall time of every git subprocess is recorded. On
+    exit the raw profile is written as a pstats file, next to a plain text
+    summary of the slowest functions, the git commands, and the largest
+    allocations.
+    """
+
+    def __init__(self, path: str, memory: bool = False, top: int = PROFILE_TOP) -> None:
+        """Initialize the profiler.
+
+        Args:
+            path: The pstats file to write; the summary goes to path + ".txt"
+            memory: Whether to trace memory allocations as well
+            top: The number of functions listed in the summary
+        """
+        self.path = path
+        self.memory = memory
+        self.top = top
+        self.profile = cProfile.Profile()
+        self.git_calls: list[tuple[str, float]] = []
+        self.started = 0.0
+        self.elapsed = 0.0
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.peak_memory = 0
+        self._run: Any = None
+
+    @property
+    def summary_path(self) -> str:
+        """Get the path of the text summary."""
+        return self.path + ".txt"
+
+    def _timed_run(self, *args: Any, **kwargs: Any) -> Any:
+        argv = args[0] if args else kwargs.get("args")
+        start = time.perf_counter()
+        try:
+            return self._run(*args, **kwargs)
+        finally:
+            if isinstance(argv, (list, tuple)) and argv and argv[0] == "git":
+                command = " ".join(str(arg) for arg in argv[:4])
+                self.git_calls.append((command, time.perf_counter() - start))
+
+    def __enter__(self) -> "Profiler":
+        """Start profiling."""
+        # check_output and friends all go through subprocess.run
+        self._run = subprocess.run
+        subprocess.run = self._timed_run  # type: ignore[assignment]
+        if self.memory:
+            tracemalloc.start()
+        self.started = time.perf_counter()
+        self.profile.enable()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Stop profiling and write the results, even if the run failed."""
+        self.profile.disable()
+        self.elapsed = time.perf_counter() - self.started
+        if self.memory:
+            self.snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__)]
+            )
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        subprocess.run = self._run  # type: ignore[assignment]
+
+        try:
+            self.save()
+            click.echo(f"Profile written to {self.path} and {self.summary_path}", err=True)
+        except OSError as e:
+            click.echo(f"git-camus: could not write the profile: {e}", err=True)
+
+    def summary(self) -> str:
+        """Render the profile as plain text.
+
+        Returns:
+            str: The environment, total time, git commands, slowest functions
+            and, when memory was traced, the largest allocation sites
+        """
+        lines = [
+            "git-camus profile",
+            f"Python {platform.python_version()} on {sys.platform}",
+            f"Total: {self.elapsed * 1000:.1f} ms",
+            "",
+            "Git commands:",
+        ]
+        for command, seconds in self.git_calls:
+            lines.append(f"  {seconds * 1000:9.1f} ms  {command}")
+        if self.git_calls:
+            git_total = sum(seconds for _, seconds in self.git_calls)
+            lines.append(f"  {git_total * 1000:9.1f} ms  in total")
+        else:
+            lines.append("  none")
+
+        if self.snapshot is not None:
+            lines += ["", f"Peak memory: {self.peak_memory / 1024:.1f} KiB", "Top allocations:"]
+            for stat in self.snapshot.statistics("lineno")[:MEMORY_TOP]:
+                frame = stat.traceback[0]
+                lines.append(
+                    f"  {stat.size / 1024:9.1f} KiB {stat.count:7d} blocks  "
+                    f"{frame.filename}:{frame.lineno}"
+                )
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        lines += ["", f"Top {self.top} functions by cumulative time:", stream.getvalue().strip()]
+        return "\n".join(lines) + "\n"
+
+    def save(self) -> None:
+        """Write the pstats file and the text summary.
+
+        Raises:
+            OSError: If the files cannot be written
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.profile.dump_stats(self.path)
+        with open(self.summary_path, "w", encoding="utf-8") as f:
+            f.write(self.summary())
@@ -0,0 +1,117 @@
+"""Interactive commit message refinement functionality."""
+
+from typing import Any, Optional
+
+import click
+
+from .ollama_client import OllamaClient, OllamaMessage, OllamaRequest, OllamaUnavailable
+
+REGENERATE_INSTRUCTION = "Write a different commit message for the same changes."
+SHORTER_INSTRUCTION = "Make the commit message shorter."
+MENTION_INSTRUCTION = "Rewrite the commit message so that it mentions {topic}."
+
+# Single-key choices offered after each message, with their descriptions
+CHOICES = {
+    "a": "accept",
+    "r": "regenerate",
+    "s": "shorter",
+    "m": "mention...",
+    "e": "edit",
+    "q": "quit",
+}
+
+
+class Conversation:
+    """A conversation with the model about one set of staged changes.
+
+    Each refinement only sends the new instruction. When the first response
+    carried an Ollama context, the instruction continues from that context, so
+    the server neither receives nor processes the diff again; otherwise the
+    message history is resent and the server reuses its cache of the shared
+    prefix.
+    """
+
+    def __init__(
+        self, client: OllamaClient, request_data: OllamaRequest, response: dict[str, Any]
+    ) -> None:
+        """Initialize the conversation.
+
+        Args:
+            client: The Ollama client to generate with
+            request_data: The request that produced the first message
+            response: The API response to that request
+        """
+        self.client = client
+        self.request_data = request_data
+        self.messages: list[OllamaMessage] = list(request_data["messages"])
+        self.context: Optional[list[int]] = None
+        self._record(response)
+
+    def _record(self, response: dict[str, Any]) -> str:
+        message = response.get("message", {}).get("content", "").strip()
+        self.messages.append({"role": "assistant", "content": message})
+        if isinstance(response.get("context"), list):
+            self.context = response["context"]
+        return message  # type: ignore[no-any-return]
+
+    def ask(self, instruction: str) -> str:
+        """Send a follow-up instruction and get the revised message.
+
+        Args:
+            instruction: What the model should change
+
+        Returns:
+            str: The revised commit message
+        """
+        message: OllamaMessage = {"role": "user", "content": instruction}
+        self.messages.append(message)
+        if self.context:
+            request_data: OllamaRequest = {**self.request_data, "messages": [message]}
+            response = self.client.call_api(request_data, context=self.context)
+        else:
+            request_data = {**self.request_data, "messages": list(self.messages)}
+            response = self.client.call_api(request_data)
+        return self._record(response)
+
+
+def refine_interactively(message: str, conversation: Optional[Conversation]) -> Optional[str]:
+    """Let the developer accept, refine or edit a generated commit message.
+
+    Args:
+        message: The generated commit message
+        conversation: The conversation that produced it, or None if the
+            message was not generated by the model and cannot be refined
+
+    Returns:
+        Optional[str]: The accepted message, or None if the developer quit
+    """
+    choices = CHOICES if conversation else {k: CHOICES[k] for k in "aeq"}
+    menu = ", ".join(f"[{key}] {label}" for key, label in choices.items())
+
+    while True:
+        click.echo(f"\n{message}\n", err=True)
+        choice = click.prompt(
+            menu, type=click.Choice(list(choices)), default="a", show_choices=False, err=True
+        )
+        if choice == "a":
+            return message
+        if choice == "q":
+            return None
+        if choice == "e":
+            edited = click.edit(message)
+            if edited is not None and edited.strip():
+                message = edited.strip()
+            continue
+
+        assert conversation is not None
+        if choice == "r":
+            instruction = REGENERATE_INSTRUCTION
+        elif choice == "s":
+            instruction = SHORTER_INSTRUCTION
+        else:
+            topic = click.prompt("Mention what", err=True)
+            instruction = MENTION_INSTRUCTION.format(topic=topic)
+        try:
+            message = conversation.ask(instruction) or message
+        except OllamaUnavailable as e:
+            click.echo(f"git-camus: {e}; keeping the current message", err=True)
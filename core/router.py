@@ -0,0 +1,97 @@
+"""Model routing functionality."""
+
+from typing import Optional
+
+from .config import LatencyProfile, RouteTier, settings
+from .fallback import summarize_diff
+from .ollama_client import CHARS_PER_TOKEN
+from .throughput import ThroughputStats
+
+
+class ModelRouter:
+    """Pick a model by the size of the staged changes.
+
+    The first tier large enough for the changes applies. Within it, the first
+    model expected to answer within the tier's budget is used, based on the
+    throughput measured on earlier runs; a model never measured is given the
+    benefit of the doubt. When no candidate fits the budget, the fastest one
+    is used.
+    """
+
+    def __init__(
+        self, tiers: list[RouteTier], throughput: Optional[ThroughputStats] = None
+    ) -> None:
+        """Initialize the router.
+
+        Args:
+            tiers: The size tiers, smallest first
+            throughput: Optional measured model speeds
+        """
+        self.tiers = tiers
+        self.throughput = throughput
+
+    def tier_for(self, lines: int, files: int) -> Optional[RouteTier]:
+        """Find the tier for staged changes of a given size.
+
+        Args:
+            lines: The number of added and removed lines
+            files: The number of changed files
+
+        Returns:
+            Optional[RouteTier]: The first tier admitting the changes, if any
+        """
+        for tier in self.tiers:
+            if tier.max_lines is not None and lines > tier.max_lines:
+                continue
+            if tier.max_files is not None and files > tier.max_files:
+                continue
+            return tier
+        return None
+
+    def route(self, diff: str, status: str, profile: LatencyProfile) -> Optional[str]:
+        """Pick the model for the staged changes.
+
+        Args:
+            diff: The git diff output
+            status: The git status output
+            profile: The latency profile the request will use
+
+        Returns:
+            Optional[str]: The model, or None if no tier admits the changes
+        """
+        files = summarize_diff(diff)
+        tier = self.tier_for(sum(a + r for _, a, r in files), len(files))
+        if tier is None or not tier.models:
+            return None
+        if self.throughput is None or tier.budget is None:
+            return tier.models[0]
+
+        prompt_length = len(status) + min(len(diff), profile.max_diff_length)
+        prompt_tokens = prompt_length // CHARS_PER_TOKEN
+        estimates: list[tuple[float, str]] = []
+        for model_name in tier.models:
+            estimate = self.throughput.estimate(model_name, prompt_tokens, profile.num_predict)
+            if estimate is None or estimate <= tier.budget:
+                return model_name
+            estimates.append((estimate, model_name))
+        return min(estimates)[1]
+
+
+def resolve_model(model_name: str, routed: Optional[str] = None) -> tuple[str, Optional[str]]:
+    """Pick the model to generate with and the system prompt it needs.
+
+    Args:
+        model_name: The configured model
+        routed: Optional model picked for the size of the staged changes
+
+    Returns:
+        tuple[str, Optional[str]]: The model, and the system prompt to send with
+        each request, which is None for a derived model that has it baked in
+    """
+    if routed:
+        model_name = routed
+    elif settings.run.derived_model:
+        model_name = settings.run.derived_model
+    if model_name == settings.run.derived_model:
+        return model_name, None
+    return model_name, settings.run.system_prompt
@@ -0,0 +1,132 @@
+"""Settings validation functionality."""
+
+from dataclasses import asdict
+from typing import Any, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+from pydantic.fields import FieldInfo
+from pydantic_settings import BaseSettings, PydanticBaseSettingsSource
+
+from .config import (
+    DEFAULT_PROFILES,
+    ApiPrefix,
+    LatencyProfile,
+    OllamaConfig,
+    RouteTier,
+    RunConfig,
+    config_files,
+    deep_merge,
+    default_profiles,
+    environment_settings,
+    read_toml,
+    resolve_values,
+)
+
+
+class LayeredSource(PydanticBaseSettingsSource):
+    """Settings from the configuration files and the environment, merged like the CLI does."""
+
+    def get_field_value(self, field: FieldInfo, field_name: str) -> tuple[Any, str, bool]:
+        return None, field_name, False
+
+    def __call__(self) -> dict[str, Any]:
+        return resolve_values()
+
+
+class SettingsModel(BaseModel):
+    """Application settings, validated.
+
+    The fields are the dataclasses the CLI reads its settings into, so both
+    share the same defaults. The dataclasses have no pydantic config of
+    their own, so this one applies to them too: unknown keys are errors
+    when checking, and typos do not go unnoticed.
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    ollama: OllamaConfig = Field(default_factory=OllamaConfig)
+    run: RunConfig = Field(default_factory=RunConfig)
+    api: ApiPrefix = Field(default_factory=ApiPrefix)
+    profiles: dict[str, LatencyProfile] = Field(default_factory=default_profiles)
+
+    @field_validator("profiles", mode="before")
+    @classmethod
+    def extend_default_profiles(cls, value: Any) -> Any:
+        """Merge configured profiles into the defaults, so a profile can change one option."""
+        if not isinstance(value, dict):
+            return value
+        profiles = {name: asdict(profile) for name, profile in DEFAULT_PROFILES.items()}
+        for name, profile in value.items():
+            if isinstance(profile, LatencyProfile):
+                profile = asdict(profile)
+            if isinstance(profile, dict):
+                profile = deep_merge(profiles.get(name, {}), profile)
+            profiles[name] = profile
+        return profiles
+
+
+class Settings(BaseSettings, SettingsModel):
+    """Application settings, validated and resolved.
+
+    Constructing the settings resolves the same layers as
+    core.config.load_settings, but checks every value on the way.
+    """
+
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls: type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> tuple[PydanticBaseSettingsSource, ...]:
+        return init_settings, LayeredSource(settings_cls)
+
+
+def validation_problems(source: str, values: dict[str, Any]) -> list[str]:
+    """Validate settings values.
+
+    Args:
+        source: Where the values come from, prefixed to the problems
+        values: The settings by section
+
+    Returns:
+        list[str]: One line per problem, empty if the values are valid
+    """
+    try:
+        SettingsModel.model_validate(values)
+    except ValidationError as e:
+        return [
+            f"{source}: {'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in e.errors()
+        ]
+    return []
+
+
+def check_settings(start: Optional[str] = None) -> tuple[list[str], list[str]]:
+    """Validate every configuration layer and the settings they resolve to.
+
+    Args:
+        start: The directory to look for the repository file from
+
+    Returns:
+        tuple[list[str], list[str]]: The files checked and the problems found
+    """
+    files = config_files(start)
+    problems: list[str] = []
+    for path in files:
+        try:
+            problems += validation_problems(path, read_toml(path))
+        except (OSError, ValueError) as e:
+            problems.append(f"{path}: {e}")
+    problems += validation_problems("environment", environment_settings())
+    if problems:
+        return files, problems
+
+    resolved = Settings()
+    if resolved.run.latency_profile not in resolved.profiles:
+        problems.append(
+            f"run.latency_profile: unknown profile '{resolved.run.latency_profile}', "
+            f"expected one of: {', '.join(resolved.profiles)}"
+        )
+    return files, problems
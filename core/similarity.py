@@ -0,0 +1,270 @@
+"""Message similarity functionality."""
+
+import math
+import os
+import random
+import re
+import subprocess
+import zlib
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, Optional
+
+from .git_operations import get_git_dir, get_head
+from .state import read_json, write_json
+
+if TYPE_CHECKING:
+    from .ollama_client import OllamaClient
+
+# Words per shingle; commit messages are short, so pairs of words
+SHINGLE_SIZE = 2
+
+# Hash functions in a MinHash signature; the similarity estimate is within about 0.1
+NUM_HASHES = 64
+
+# Messages remembered to compare new ones with
+RECENT_MESSAGES = 16
+
+# Prime modulus of the hash functions
+_PRIME = (1 << 61) - 1
+
+# Fixed seed, so signatures stored by one run stay comparable in the next
+_random = random.Random(0xCA3115)
+_HASHES = [(_random.randrange(1, _PRIME), _random.randrange(_PRIME)) for _ in range(NUM_HASHES)]
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[str]:
+    """Split a text into overlapping runs of words.
+
+    Args:
+        text: The text to split
+        size: Words per shingle
+
+    Returns:
+        set[str]: The shingles, ignoring case and punctuation
+    """
+    words = re.findall(r"[\w']+", text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(text: str) -> list[int]:
+    """Compute the MinHash signature of a text.
+
+    Args:
+        text: The text to sketch
+
+    Returns:
+        list[int]: NUM_HASHES minimum hash values, or an empty list for a text
+        without words
+    """
+    hashes = [zlib.crc32(shingle.encode()) for shingle in shingles(text)]
+    if not hashes:
+        return []
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _HASHES]
+
+
+def signature_similarity(first: Sequence[int], second: Sequence[int]) -> float:
+    """Estimate the Jaccard similarity of two texts from their signatures.
+
+    Args:
+        first: The signature of one text
+        second: The signature of the other
+
+    Returns:
+        float: The share of equal hash values, 0.0 if the signatures do not match up
+    """
+    if not first or len(first) != len(second):
+        return 0.0
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+
+def cosine_similarity(first: Sequence[float], second: Sequence[float]) -> float:
+    """Compute the cosine similarity of two vectors.
+
+    Args:
+        first: One vector
+        second: The other, of the same length
+
+    Returns:
+        float: The cosine of the angle between them, 0.0 if either is zero
+    """
+    norm = math.sqrt(sum(a * a for a in first)) * math.sqrt(sum(b * b for b in second))
+    if not norm or len(first) != len(second):
+        return 0.0
+    return sum(a * b for a, b in zip(first, second)) / norm
+
+
+def read_recent_messages(count: int = RECENT_MESSAGES) -> list[str]:
+    """Read the messages of the latest commits on HEAD.
+
+    Args:
+        count: Maximum number of messages to read
+
+    Returns:
+        list[str]: The messages, newest first; empty outside a repository or
+        before the first commit
+    """
+    try:
+        output = subprocess.check_output(
+            ["git", "log", f"--max-count={count}", "--no-merges", "--format=%B%x00"],
+            text=True,
+            stderr=subprocess.PIPE,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return []
+    return [message.strip() for message in output.split("\0") if message.strip()]
+
+
+class RecentMessages:
+    """Sketches of the latest commit messages, to spot a new one repeating them.
+
+    Every message is kept with its MinHash signature, and with its embedding
+    once one has been computed, so checking a candidate needs neither git
+    nor, for the signatures, the server. The store is seeded from the
+    history on first use and then follows the messages git-camus commits
+    and those found at HEAD.
+    """
+
+    def __init__(self, path: str, max_entries: int = RECENT_MESSAGES) -> None:
+        """Initialize the recent messages.
+
+        Args:
+            path: The JSON file backing the store
+            max_entries: Maximum number of messages to keep
+        """
+        self.path = path
+        self.max_entries = max_entries
+
+    @classmethod
+    def for_repository(cls) -> Optional["RecentMessages"]:
+        """Open the recent messages of the current repository.
+
+        Returns:
+            Optional[RecentMessages]: The store, or None outside a git repository
+        """
+        git_dir = get_git_dir()
+        if not git_dir:
+            return None
+        return cls(os.path.join(git_dir, "camus", "recent.json"))
+
+    def _load(self) -> dict[str, Any]:
+        data = read_json(self.path)
+        if not isinstance(data.get("messages"), list):
+            # First use in this repository: start from the history once
+            messages = list(reversed(read_recent_messages(self.max_entries)))
+            data = {"messages": [self._entry(message) for message in messages]}
+            write_json(self.path, data)
+        return data
+
+    @staticmethod
+    def _entry(message: str) -> dict[str, Any]:
+        return {"message": message, "signature": minhash(message)}
+
+    def messages(self) -> list[str]:
+        """Get the remembered messages, oldest first."""
+        return [entry["message"] for entry in self._load()["messages"]]
+
+    def add(self, message: str, head: Optional[str] = None) -> None:
+        """Remember a message, forgetting the oldest beyond the limit.
+
+        Args:
+            message: The commit message
+            head: Optional commit made with the message, which follow_head()
+                then knows about without reading it back from git
+        """
+        message = message.strip()
+        if not message:
+            return
+        data = self._load()
+        self._append(data, message)
+        if head:
+            data["head"] = head
+        write_json(self.path, data)
+
+    def follow_head(self) -> None:
+        """Remember the message of the commit HEAD points at, once per commit.
+
+        Messages committed through the prepare-commit-msg hook, where they can
+        still be edited, or without git-camus at all are picked up this way.
+        """
+        head = get_head()
+        if not head:
+            return
+        data = self._load()
+        if data.get("head") == head:
+            return
+        for message in read_recent_messages(1):
+            self._append(data, message)
+        data["head"] = head
+        write_json(self.path, data)
+
+    def _append(self, data: dict[str, Any], message: str) -> None:
+        entries = [entry for entry in data["messages"] if entry.get("message") != message]
+        entries.append(self._entry(message))
+        data["messages"] = entries[-self.max_entries :]
+
+    def closest(self, candidate: str) -> tuple[Optional[str], float]:
+        """Find the remembered message sharing the most wording with a candidate.
+
+        Args:
+            candidate: The generated message
+
+        Returns:
+            tuple[Optional[str], float]: The closest message, or None if there is
+            none, and its estimated Jaccard similarity to the candidate
+        """
+        signature = minhash(candidate)
+        best: tuple[Optional[str], float] = (None, 0.0)
+        for entry in self._load()["messages"]:
+            score = signature_similarity(signature, entry.get("signature") or [])
+            if score > best[1]:
+                best = (entry["message"], score)
+        return best
+
+    def closest_by_meaning(
+        self, candidate: str, client: "OllamaClient", model_name: str, timeout: float
+    ) -> tuple[Optional[str], float]:
+        """Find the remembered message closest in meaning to a candidate.
+
+        The candidate is embedded together with the remembered messages that
+        have no embedding from this model yet, in a single request, and the
+        new embeddings are stored for the next check.
+
+        Args:
+            candidate: The generated message
+            client: The Ollama client to embed with
+            model_name: The embedding model
+            timeout: Seconds to wait for the server
+
+        Returns:
+            tuple[Optional[str], float]: The closest message, or None if there is
+            none, and its cosine similarity to the candidate
+
+        Raises:
+            httpx.HTTPError: If the server cannot compute the embeddings
+            ValueError: If the server returns malformed embeddings
+        """
+        data = self._load()
+        entries = data["messages"]
+        if not entries:
+            return None, 0.0
+        if data.get("model") != model_name:
+            for entry in entries:
+                entry.pop("vector", None)
+        missing = [entry for entry in entries if not entry.get("vector")]
+        vectors = client.embed(
+            model_name, [candidate] + [entry["message"] for entry in missing], timeout=timeout
+        )
+        for entry, vector in zip(missing, vectors[1:]):
+            entry["vector"] = vector
+        if missing:
+            data["model"] = model_name
+            write_json(self.path, data)
+
+        best: tuple[Optional[str], float] = (None, 0.0)
+        for entry in entries:
+            score = cosine_similarity(vectors[0], entry["vector"])
+            if score > best[1]:
+                best = (entry["message"], score)
+        return best
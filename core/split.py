@@ -0,0 +1,342 @@
+"""Staged change splitting functionality."""
+
+import codecs
+import os
+import posixpath
+import subprocess
+import tempfile
+from collections import Counter
+from itertools import combinations
+from typing import Optional
+
+from .git_operations import get_head, get_index_tree
+from .similarity import minhash, signature_similarity
+
+# Commits read for files that tend to change together
+CO_CHANGE_WALK = 200
+
+# Commits two files must share before they are kept together
+CO_CHANGE_MIN = 2
+
+# MinHash similarity of two file diffs before they are kept together
+DIFF_SIMILARITY = 0.5
+
+# Commits a split makes at most; further groups are folded into the last one
+MAX_GROUPS = 8
+
+# Marker of a commit in the `git log` output, which cannot appear in a path
+_COMMIT = "\x01"
+
+
+class ChangeGroup:
+    """Staged files committed together, with their part of the diff."""
+
+    def __init__(self, paths: list[str], diff: str) -> None:
+        """Initialize the change group.
+
+        Args:
+            paths: The changed files, in diff order
+            diff: The staged diff of these files
+        """
+        self.paths = paths
+        self.diff = diff
+
+    def __repr__(self) -> str:
+        return f"ChangeGroup({self.paths!r})"
+
+    def status(self, status: str) -> str:
+        """Keep the lines of a `git status --porcelain` output about this group.
+
+        Args:
+            status: The status of all changes
+
+        Returns:
+            str: The lines naming one of the group's files
+        """
+        paths = set(self.paths)
+        lines = []
+        for line in status.splitlines():
+            names = line[3:].split(" -> ")
+            if any(unquote_path(name) in paths for name in names):
+                lines.append(line)
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def unquote_path(name: str) -> str:
+    """Undo the quoting git applies to unusual paths in its text output.
+
+    Args:
+        name: A path as printed by git, e.g. `"caf\\303\\251.txt"`
+
+    Returns:
+        str: The path itself
+    """
+    if len(name) < 2 or not name.startswith('"') or not name.endswith('"'):
+        return name
+    return codecs.escape_decode(name[1:-1].encode())[0].decode("utf-8", "replace")
+
+
+def read_staged_diff() -> str:
+    """Get the staged diff with renames as a deletion and an addition.
+
+    Every file then has its own part of the diff, which can be committed
+    on its own.
+    """
+    try:
+        return subprocess.check_output(
+            ["git", "diff", "--cached", "--no-renames", "--no-color", "--no-ext-diff"],
+            text=True,
+            stderr=subprocess.PIPE,
+        )
+    except subprocess.CalledProcessError:
+        return ""
+
+
+def read_staged_paths() -> list[str]:
+    """Get the staged files in the order of read_staged_diff.
+
+    The names are NUL-separated, so no path needs unquoting.
+    """
+    try:
+        output = subprocess.check_output(
+            ["git", "diff", "--cached", "--no-renames", "--name-only", "-z"],
+            text=True,
+            stderr=subprocess.PIPE,
+        )
+    except subprocess.CalledProcessError:
+        return []
+    return [path for path in output.split("\0") if path]
+
+
+def split_diff(diff: str, paths: list[str]) -> dict[str, str]:
+    """Cut a diff into the parts of each file.
+
+    The part boundaries are the `diff --git` lines; the file names are taken
+    from the list rather than from those lines, where git may quote them.
+
+    Args:
+        diff: A diff without renames
+        paths: The files of the diff, in diff order
+
+    Returns:
+        dict[str, str]: The part of the diff of each file, in diff order
+
+    Raises:
+        ValueError: If the diff does not have one part per path
+    """
+    parts: list[list[str]] = []
+    for line in diff.splitlines(keepends=True):
+        if line.startswith("diff --git ") or not parts:
+            parts.append([])
+        parts[-1].append(line)
+    if len(parts) != len(paths):
+        raise ValueError(f"Expected a diff of {len(paths)} files, got {len(parts)}")
+    return {path: "".join(part) for path, part in zip(paths, parts)}
+
+
+def read_co_changes(paths: list[str], limit: int = CO_CHANGE_WALK) -> Counter[tuple[str, str]]:
+    """Count how often pairs of files were changed by the same commit.
+
+    Args:
+        paths: The files of interest
+        limit: Maximum number of commits to read
+
+    Returns:
+        Counter[tuple[str, str]]: Commits per pair of the files, each pair sorted
+    """
+    try:
+        output = subprocess.check_output(
+            [
+                "git",
+                "log",
+                f"--max-count={limit}",
+                "--no-merges",
+                "--format=%x01",
+                "--name-only",
+                "-z",
+            ],
+            text=True,
+            stderr=subprocess.PIPE,
+        )
+    except subprocess.CalledProcessError:
+        return Counter()
+    wanted = set(paths)
+    pairs: Counter[tuple[str, str]] = Counter()
+    changed: list[str] = []
+    # Each commit is its marker, then its NUL-terminated names after a newline
+    for name in output.split("\0") + [_COMMIT]:
+        if name == _COMMIT:
+            pairs.update(combinations(sorted(wanted.intersection(changed)), 2))
+            changed = []
+        elif name:
+            changed.append(name[1:] if not changed and name.startswith("\n") else name)
+    return pairs
+
+
+def group_files(
+    parts: dict[str, str], co_changes: Optional[Counter[tuple[str, str]]] = None
+) -> list[list[str]]:
+    """Cluster changed files into groups of related changes.
+
+    Files are kept together when they are in the same directory, when
+    earlier commits often changed them together, or when their diffs are
+    alike, e.g. the same rename applied across the tree.
+
+    Args:
+        parts: The part of the diff of each file, in diff order
+        co_changes: Commits per pair of files, from read_co_changes
+
+    Returns:
+        list[list[str]]: The groups, each in diff order, ordered by their first file
+    """
+    paths = list(parts)
+    root = {path: path for path in paths}
+
+    def find(path: str) -> str:
+        while root[path] != path:
+            root[path] = root[root[path]]
+            path = root[path]
+        return path
+
+    def join(first: str, second: str) -> None:
+        root[find(second)] = find(first)
+
+    by_directory: dict[str, str] = {}
+    for path in paths:
+        directory = posixpath.dirname(path)
+        if directory in by_directory:
+            join(by_directory[directory], path)
+        else:
+            by_directory[directory] = path
+
+    for (first, second), count in (co_changes or Counter()).items():
+        if count >= CO_CHANGE_MIN and first in root and second in root:
+            join(first, second)
+
+    # Only the changed lines count; the headers differ for every file
+    signatures = {
+        path: minhash(
+            "\n".join(
+                line
+                for line in part.splitlines()
+                if line[:1] in "+-" and not line.startswith(("+++", "---"))
+            )
+        )
+        for path, part in parts.items()
+    }
+    for first, second in combinations(paths, 2):
+        if find(first) == find(second):
+            continue
+        if signature_similarity(signatures[first], signatures[second]) >= DIFF_SIMILARITY:
+            join(first, second)
+
+    groups: dict[str, list[str]] = {}
+    for path in paths:
+        groups.setdefault(find(path), []).append(path)
+    return list(groups.values())
+
+
+def split_staged_changes(max_groups: int = MAX_GROUPS) -> list[ChangeGroup]:
+    """Split the staged changes into groups of related files.
+
+    Args:
+        max_groups: Maximum number of groups; the rest joins the last one
+
+    Returns:
+        list[ChangeGroup]: The groups, an empty list if nothing is staged
+    """
+    diff, paths = read_staged_diff(), read_staged_paths()
+    try:
+        parts = split_diff(diff, paths)
+    except ValueError:
+        # Unexpected output, e.g. from a diff driver: keep everything together
+        return [ChangeGroup(paths, diff)] if paths else []
+    groups = group_files(parts, read_co_changes(paths))
+    if len(groups) > max_groups:
+        groups[max_groups - 1 :] = [sum(groups[max_groups - 1 :], [])]
+    return [ChangeGroup(paths, "".join(parts[path] for path in paths)) for paths in groups]
+
+
+def read_index_entries() -> dict[str, str]:
+    """Get the mode and object id of every file in the index.
+
+    Returns:
+        dict[str, str]: "mode oid" by path
+    """
+    output = subprocess.check_output(["git", "ls-files", "--stage", "-z"], text=True)
+    entries = {}
+    for record in output.split("\0"):
+        if record:
+            info, path = record.split("\t", 1)
+            mode, oid, _ = info.split()
+            entries[path] = f"{mode} {oid}"
+    return entries
+
+
+def commit_groups(groups: list[ChangeGroup], messages: list[str]) -> list[str]:
+    """Commit each group of staged changes on its own, in order.
+
+    The commits are built in a temporary index starting from HEAD, adding
+    the staged version of each group's files in turn, so neither the working
+    tree nor the real index is touched. HEAD is moved once, after the last
+    commit, and only if it did not move meanwhile. As commit-tree makes the
+    commits, no commit hooks run.
+
+    Args:
+        groups: The groups, covering all staged changes
+        messages: The commit message of each group
+
+    Returns:
+        list[str]: The object ids of the commits, in order
+
+    Raises:
+        subprocess.CalledProcessError: If git fails or the groups miss some
+        staged changes; HEAD is then unchanged
+    """
+    head = get_head()
+    entries = read_index_entries()
+    # Only files of HEAD can be removed, so its length is the one of the object ids
+    zero = "0" * (len(head) or 40)
+    commits: list[str] = []
+    tree = ""
+    with tempfile.TemporaryDirectory(prefix="git-camus-") as directory:
+        env = {**os.environ, "GIT_INDEX_FILE": os.path.join(directory, "index")}
+        subprocess.run(
+            ["git", "read-tree", head] if head else ["git", "read-tree", "--empty"],
+            env=env,
+            check=True,
+        )
+        parent = head
+        for group, message in zip(groups, messages):
+            # Mode 0 removes a file that is no longer in the real index
+            info = "".join(
+                f"{entries.get(path, f'0 {zero}')}\t{path}\0" for path in group.paths
+            )
+            subprocess.run(
+                ["git", "update-index", "-z", "--index-info"],
+                input=info,
+                env=env,
+                text=True,
+                check=True,
+            )
+            tree = subprocess.check_output(["git", "write-tree"], env=env, text=True).strip()
+            parent = subprocess.run(
+                ["git", "commit-tree", tree, *(["-p", parent] if parent else [])],
+                input=message,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+            commits.append(parent)
+
+    if commits:
+        if tree != get_index_tree():
+            raise subprocess.CalledProcessError(1, ["git", "write-tree"], "split misses changes")
+        subject = messages[-1].splitlines()[0] if messages[-1] else ""
+        subprocess.run(
+            ["git", "update-ref", "-m", f"commit (split): {subject}", "HEAD", parent, head],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    return commits
@@ -0,0 +1,54 @@
+"""Local state file functionality."""
+
+import json
+import os
+import tempfile
+from typing import Any
+
+
+def user_cache_dir() -> str:
+    """Get the per-user directory for git-camus state shared across repositories."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "git-camus")
+
+
+def read_json(path: str) -> dict[str, Any]:
+    """Read a JSON object from a state file.
+
+    Args:
+        path: The state file to read
+
+    Returns:
+        dict[str, Any]: The stored object, or an empty dict if it is missing or corrupt
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def write_json(path: str, data: dict[str, Any]) -> None:
+    """Atomically replace a state file with a JSON object.
+
+    State is best effort: failing to write it must never fail a commit, so
+    errors are swallowed.
+
+    Args:
+        path: The state file to write
+        data: The object to store
+    """
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".state-")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
@@ -0,0 +1,263 @@
+"""Run statistics functionality."""
+
+import json
+import math
+import os
+import time
+from collections.abc import Iterator
+from typing import Any, Optional
+
+from .state import user_cache_dir
+from .timings import Timings
+
+# Size after which the run log is rotated
+MAX_LOG_BYTES = 1_000_000
+
+# Rotated run logs kept besides the current one
+LOG_BACKUPS = 3
+
+# Relative width of the latency histogram buckets
+HISTOGRAM_PRECISION = 0.02
+
+# Smallest latency the histogram tells apart, in seconds
+HISTOGRAM_MIN = 0.001
+
+
+class RunLog:
+    """Append-only log of run records, one JSON object per line.
+
+    The log is rotated once it grows past a size limit, keeping a few older
+    files, so it never takes more than a bounded amount of disk space.
+    """
+
+    def __init__(
+        self, path: str, max_bytes: int = MAX_LOG_BYTES, backups: int = LOG_BACKUPS
+    ) -> None:
+        """Initialize the run log.
+
+        Args:
+            path: The current log file; rotated files get a numeric suffix
+            max_bytes: Size after which the log is rotated
+            backups: Rotated files to keep
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    @classmethod
+    def for_user(cls) -> "RunLog":
+        """Open the run log of the current user.
+
+        Returns:
+            RunLog: The log in the user's cache directory
+        """
+        return cls(os.path.join(user_cache_dir(), "runs.jsonl"))
+
+    def _rotate(self) -> None:
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.unlink(self.path)
+
+    def append(self, record: dict[str, Any]) -> None:
+        """Add a record to the log.
+
+        Statistics are best effort: failing to write them must never fail a
+        commit, so errors are swallowed.
+
+        Args:
+            record: The run record
+        """
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                self._rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            pass
+
+    def files(self) -> list[str]:
+        """Get the existing log files, oldest first."""
+        paths = [f"{self.path}.{i}" for i in range(self.backups, 0, -1)] + [self.path]
+        return [path for path in paths if os.path.exists(path)]
+
+    def records(self, since: Optional[float] = None) -> Iterator[dict[str, Any]]:
+        """Read the records one at a time, oldest first.
+
+        Args:
+            since: Only yield records started at or after this Unix time
+
+        Yields:
+            dict[str, Any]: The run records, skipping unreadable lines
+        """
+        for path in self.files():
+            try:
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue
+                        if not isinstance(record, dict):
+                            continue
+                        if since is not None and record.get("ts", 0) < since:
+                            continue
+                        yield record
+            except OSError:
+                continue
+
+
+def run_record(
+    timings: Timings,
+    command: str,
+    model_name: str,
+    diff: str,
+    message: str,
+    fallback: bool = False,
+    cache_hit: Optional[bool] = None,
+) -> dict[str, Any]:
+    """Build the record of a finished run.
+
+    Args:
+        timings: The timings of the run
+        command: What ran, e.g. "run" or "hook"
+        model_name: The model that generated, or would have generated, the message
+        diff: The diff sent to the model
+        message: The resulting commit message
+        fallback: Whether the message came from the local fallback
+        cache_hit: Whether a cached message was used, None if no cache was consulted
+
+    Returns:
+        dict[str, Any]: The record
+    """
+    data = timings.to_dict()
+    record: dict[str, Any] = {
+        "ts": round(time.time() - data["total"], 3),
+        "command": command,
+        "model": model_name,
+        "duration": data["total"],
+        "phases": data["phases"],
+        "diff_bytes": len(diff.encode()),
+        "message_bytes": len(message.encode()),
+        "fallback": fallback,
+        "cache_hit": cache_hit,
+    }
+    for key in ("prompt_eval_count", "eval_count"):
+        if key in timings.ollama:
+            record[key] = timings.ollama[key]
+    if "eval_duration" in timings.ollama:
+        record["eval_seconds"] = timings.ollama["eval_duration"] / 1e9
+    return record
+
+
+class Histogram:
+    """Streaming latency histogram with logarithmic buckets.
+
+    Memory grows with the spread of the values rather than their number, and
+    quantiles are exact to within the bucket precision.
+    """
+
+    def __init__(
+        self, precision: float = HISTOGRAM_PRECISION, minimum: float = HISTOGRAM_MIN
+    ) -> None:
+        """Initialize the histogram.
+
+        Args:
+            precision: Relative width of a bucket
+            minimum: Values below this all fall into the first bucket
+        """
+        self.precision = precision
+        self.minimum = minimum
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """Count a value."""
+        index = 0
+        if value > self.minimum:
+            index = math.ceil(math.log(value / self.minimum) / math.log1p(self.precision))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Get a quantile of the counted values.
+
+        Args:
+            fraction: The quantile as a fraction between 0 and 1
+
+        Returns:
+            Optional[float]: The upper bound of the bucket holding the
+            quantile, or None if nothing was counted
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return self.minimum * (1 + self.precision) ** index
+        return None
+
+
+class ModelStats:
+    """Aggregated run statistics of one model."""
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.runs = 0
+        self.latency = Histogram()
+        self.cache_lookups = 0
+        self.cache_hits = 0
+        self.fallbacks = 0
+        self.eval_count = 0
+        self.eval_seconds = 0.0
+
+    def add(self, record: dict[str, Any]) -> None:
+        """Count a run record."""
+        self.runs += 1
+        if isinstance(record.get("duration"), (int, float)):
+            self.latency.add(record["duration"])
+        if record.get("cache_hit") is not None:
+            self.cache_lookups += 1
+            self.cache_hits += bool(record["cache_hit"])
+        self.fallbacks += bool(record.get("fallback"))
+        if record.get("eval_count") and record.get("eval_seconds"):
+            self.eval_count += record["eval_count"]
+            self.eval_seconds += record["eval_seconds"]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get the statistics as plain data."""
+        return {
+            "runs": self.runs,
+            "p50": self.latency.quantile(0.50),
+            "p95": self.latency.quantile(0.95),
+            "p99": self.latency.quantile(0.99),
+            "cache_hit_rate": self.cache_hits / self.cache_lookups if self.cache_lookups else None,
+            "fallback_rate": self.fallbacks / self.runs if self.runs else None,
+            "tokens_per_second": (
+                self.eval_count / self.eval_seconds if self.eval_seconds else None
+            ),
+        }
+
+
+def summarize(records: Iterator[dict[str, Any]]) -> dict[str, ModelStats]:
+    """Aggregate run records per model in a single pass.
+
+    Args:
+        records: The run records
+
+    Returns:
+        dict[str, ModelStats]: The statistics by model name
+    """
+    models: dict[str, ModelStats] = {}
+    for record in records:
+        model_name = str(record.get("model", "unknown"))
+        models.setdefault(model_name, ModelStats()).add(record)
+    return models
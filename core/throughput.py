@@ -0,0 +1,114 @@
+"""Model throughput measurement functionality."""
+
+import os
+from typing import Any, Optional
+
+from .state import read_json, user_cache_dir, write_json
+
+# Weight of the newest measurement in the moving average
+SMOOTHING = 0.3
+
+
+class ThroughputStats:
+    """Measured prompt processing and generation speed per model.
+
+    Speeds are exponential moving averages of what Ollama reports after each
+    request, shared by every invocation of the current user so that model
+    choices can be based on how fast each model actually runs here.
+    """
+
+    def __init__(self, path: str, smoothing: float = SMOOTHING) -> None:
+        """Initialize the throughput statistics.
+
+        Args:
+            path: The JSON file backing the statistics
+            smoothing: Weight of the newest measurement, between 0 and 1
+        """
+        self.path = path
+        self.smoothing = smoothing
+
+    @classmethod
+    def for_user(cls) -> "ThroughputStats":
+        """Open the throughput statistics of the current user.
+
+        Returns:
+            ThroughputStats: The statistics in the user's cache directory
+        """
+        return cls(os.path.join(user_cache_dir(), "throughput.json"))
+
+    def get(self, model_name: str) -> dict[str, float]:
+        """Get the measured speeds of a model.
+
+        Args:
+            model_name: The model
+
+        Returns:
+            dict[str, float]: Tokens per second under "prompt" and "eval",
+            for whichever of the two has been measured
+        """
+        entry = read_json(self.path).get(model_name)
+        if not isinstance(entry, dict):
+            return {}
+        return {k: float(v) for k, v in entry.items() if k in ("prompt", "eval") and v}
+
+    def record(self, model_name: str, response: dict[str, Any]) -> None:
+        """Update the speeds of a model from an Ollama response.
+
+        Args:
+            model_name: The model that generated the response
+            response: The API response with Ollama's count and duration fields
+        """
+        rates = {
+            "prompt": tokens_per_second(
+                response.get("prompt_eval_count"), response.get("prompt_eval_duration")
+            ),
+            "eval": tokens_per_second(response.get("eval_count"), response.get("eval_duration")),
+        }
+        if not any(rates.values()):
+            return
+        data = read_json(self.path)
+        entry = data.get(model_name)
+        if not isinstance(entry, dict):
+            entry = {}
+        for key, rate in rates.items():
+            if rate is None:
+                continue
+            previous = entry.get(key)
+            if isinstance(previous, (int, float)) and previous > 0:
+                rate = self.smoothing * rate + (1 - self.smoothing) * previous
+            entry[key] = rate
+        data[model_name] = entry
+        write_json(self.path, data)
+
+    def estimate(self, model_name: str, prompt_tokens: int, predict_tokens: int) -> Optional[float]:
+        """Estimate how long a model takes for a request.
+
+        Args:
+            model_name: The model
+            prompt_tokens: Tokens in the prompt
+            predict_tokens: Tokens to generate at most
+
+        Returns:
+            Optional[float]: Expected seconds, or None if the model was never measured
+        """
+        rates = self.get(model_name)
+        if "prompt" not in rates or "eval" not in rates:
+            return None
+        return prompt_tokens / rates["prompt"] + predict_tokens / rates["eval"]
+
+
+def tokens_per_second(count: Any, duration: Any) -> Optional[float]:
+    """Compute a speed from an Ollama token count and nanosecond duration.
+
+    Args:
+        count: The number of tokens, if reported
+        duration: The time they took in nanoseconds, if reported
+
+    Returns:
+        Optional[float]: Tokens per second, or None if not measurable
+    """
+    if not isinstance(count, (int, float)) or not isinstance(duration, (int, float)):
+        return None
+    if count <= 0 or duration <= 0:
+        return None
+    return count / (duration / 1e9)
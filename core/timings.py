@@ -0,0 +1,142 @@
+"""Run phase timing functionality."""
+
+import json
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from .throughput import tokens_per_second
+from .tracing import span
+
+# Duration fields of an Ollama response, in nanoseconds
+OLLAMA_DURATIONS = ("total_duration", "load_duration", "prompt_eval_duration", "eval_duration")
+
+# Token count fields of an Ollama response
+OLLAMA_COUNTS = ("prompt_eval_count", "eval_count")
+
+
+class Timings:
+    """Wall-clock durations of the phases of a run.
+
+    Phases are timed in the order they run. The Ollama response adds the
+    server's own breakdown of the request: model load, prompt processing
+    (prefill) and generation (decode), plus whatever remains of the
+    request's wall time as network and queueing overhead.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the timings."""
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.ollama: dict[str, int] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a phase of the run, in a tracing span; repeated phases add up.
+
+        Args:
+            name: The phase name
+        """
+        start = time.perf_counter()
+        try:
+            with span(name):
+                yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def record_response(self, response: dict[str, Any]) -> None:
+        """Keep the timing fields of an Ollama response.
+
+        Args:
+            response: The API response
+        """
+        for key in OLLAMA_DURATIONS + OLLAMA_COUNTS:
+            value = response.get(key)
+            if isinstance(value, int):
+                self.ollama[key] = value
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get the timings as plain data.
+
+        Returns:
+            dict[str, Any]: Seconds per phase and in total, and Ollama's
+            breakdown in seconds, token counts and tokens per second
+        """
+        data: dict[str, Any] = {
+            "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "total": round(time.perf_counter() - self.started, 6),
+        }
+        if self.ollama:
+            ollama: dict[str, Any] = {}
+            for key in OLLAMA_DURATIONS:
+                if key in self.ollama:
+                    ollama[key.replace("_duration", "")] = round(self.ollama[key] / 1e9, 6)
+            for key in OLLAMA_COUNTS:
+                if key in self.ollama:
+                    ollama[key] = self.ollama[key]
+            prefill = tokens_per_second(
+                self.ollama.get("prompt_eval_count"), self.ollama.get("prompt_eval_duration")
+            )
+            decode = tokens_per_second(
+                self.ollama.get("eval_count"), self.ollama.get("eval_duration")
+            )
+            if prefill is not None:
+                ollama["prompt_tokens_per_second"] = round(prefill, 2)
+            if decode is not None:
+                ollama["eval_tokens_per_second"] = round(decode, 2)
+            overhead = self.overhead()
+            if overhead is not None:
+                ollama["overhead"] = round(overhead, 6)
+            data["ollama"] = ollama
+        return data
+
+    def overhead(self) -> Optional[float]:
+        """Get the part of the Ollama phase not spent in the server.
+
+        Returns:
+            Optional[float]: Seconds of network and client overhead, or None
+            without both measurements
+        """
+        if "ollama" not in self.phases or "total_duration" not in self.ollama:
+            return None
+        return max(0.0, self.phases["ollama"] - self.ollama["total_duration"] / 1e9)
+
+    def format(self, style: str = "text") -> str:
+        """Render the timings for display.
+
+        Args:
+            style: "text" for a table, "json" for a single JSON line
+
+        Returns:
+            str: The rendered timings
+        """
+        data = self.to_dict()
+        if style == "json":
+            return json.dumps(data)
+
+        lines = ["Timings:"]
+        for name, seconds in data["phases"].items():
+            lines.append(f"  {name:<12} {seconds * 1000:9.1f} ms")
+        lines.append(f"  {'total':<12} {data['total'] * 1000:9.1f} ms")
+        ollama = data.get("ollama", {})
+        if ollama:
+            lines.append("Ollama:")
+            for key, label in (
+                ("load", "load"),
+                ("prompt_eval", "prefill"),
+                ("eval", "decode"),
+                ("overhead", "overhead"),
+            ):
+                if key in ollama:
+                    lines.append(f"  {label:<12} {ollama[key] * 1000:9.1f} ms")
+            for count, rate, label in (
+                ("prompt_eval_count", "prompt_tokens_per_second", "prompt"),
+                ("eval_count", "eval_tokens_per_second", "generated"),
+            ):
+                if count in ollama:
+                    line = f"  {label:<12} {ollama[count]:6d} tokens"
+                    if rate in ollama:
+                        line += f" at {ollama[rate]:.1f} tokens/s"
+                    lines.append(line)
+        return "\n".join(lines)
@@ -0,0 +1,219 @@
+"""Span tracing functionality."""
+
+import contextvars
+import functools
+import json
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Name of the instrumentation scope in the exported traces
+SCOPE_NAME = "git-camus"
+
+
+class Span:
+    """A timed operation with attributes, nested in the operation that started it."""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str]) -> None:
+        """Initialize and start the span.
+
+        Args:
+            name: The operation name
+            trace_id: The hex id of the trace the span belongs to
+            parent_id: The hex id of the enclosing span, if any
+        """
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes: dict[str, Any] = {}
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute, ignoring None values."""
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        """Set several attributes, ignoring None values."""
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def to_otlp(self) -> dict[str, Any]:
+        """Get the span in the OTLP/JSON format."""
+        data: dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            data["parentSpanId"] = self.parent_id
+        return data
+
+
+class _NoopSpan:
+    """Stand-in for a span while tracing is off."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+# Reusable context manager handed out while tracing is off
+_NOOP_CONTEXT = nullcontext(_NOOP_SPAN)
+
+_trace_file: Optional[str] = None
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "git_camus_span", default=None
+)
+_finished: dict[str, list[Span]] = {}
+
+
+def configure(trace_file: Optional[str]) -> None:
+    """Turn tracing on or off.
+
+    Tracing is off by default. While it is off, spans are a shared no-op
+    object and traced functions are called directly, so the instrumentation
+    costs one global lookup per call. While it is on, each finished trace is
+    appended to the file as one line in the OTLP/JSON format (an
+    ExportTraceServiceRequest), which OpenTelemetry collectors read with
+    their file receiver.
+
+    Args:
+        trace_file: The JSONL file to append traces to, or None to turn tracing off
+    """
+    global _trace_file
+    _trace_file = trace_file
+    _finished.clear()
+
+
+def enabled() -> bool:
+    """Check whether tracing is on."""
+    return _trace_file is not None
+
+
+def current_span() -> Any:
+    """Get the innermost active span, or a no-op span if there is none."""
+    return _current.get() or _NOOP_SPAN
+
+
+@contextmanager
+def _span(name: str, attributes: dict[str, Any]) -> Iterator[Span]:
+    parent = _current.get()
+    trace_id = parent.trace_id if parent else os.urandom(16).hex()
+    span = Span(name, trace_id, parent.span_id if parent else None)
+    span.set_attributes(attributes)
+    token = _current.set(span)
+    try:
+        yield span
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            span.error = f"exit status {e.code}"
+        raise
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span.end_ns = time.time_ns()
+        _current.reset(token)
+        _finished.setdefault(span.trace_id, []).append(span)
+        if parent is None:
+            _export(_finished.pop(span.trace_id))
+
+
+def span(name: str, **attributes: Any) -> Any:
+    """Open a span around a block of code.
+
+    Args:
+        name: The operation name
+        **attributes: Attributes to set on the span
+
+    Returns:
+        A context manager yielding the span
+    """
+    if _trace_file is None:
+        return _NOOP_CONTEXT
+    return _span(name, attributes)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorate a function to run inside a span.
+
+    Args:
+        name: The operation name
+
+    Returns:
+        Callable[[F], F]: The decorator
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _trace_file is None:
+                return func(*args, **kwargs)
+            with _span(name, {"code.function": func.__qualname__}):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def otlp_attribute(key: str, value: Any) -> dict[str, Any]:
+    """Convert an attribute to its OTLP/JSON key-value form."""
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def _export(spans: list[Span]) -> None:
+    if _trace_file is None:
+        return
+    request = {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        otlp_attribute("service.name", "git-camus"),
+                        otlp_attribute("process.pid", os.getpid()),
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": SCOPE_NAME},
+                        "spans": [s.to_otlp() for s in spans],
+                    }
+                ],
+            }
+        ]
+    }
+    try:
+        directory = os.path.dirname(_trace_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(_trace_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(request, separators=(",", ":")) + "\n")
+    except OSError:
+        # Tracing is diagnostics only and must never fail a commit
+        pass
@@ -7,11 +7,19 @@ import sys
 from typing import Any, Optional, TypedDict
 
 import click
-import httpx
 
 # Maximum length for git diff to prevent overly long prompts
 MAX_DIFF_LENGTH = 8000
 
+# Generation options of the balanced latency profile, used when the package is not importable
+DEFAULT_OPTIONS: dict[str, Any] = {
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "num_predict": 64,
+    "num_ctx": 4096,
+    "stop": ["\n"],
+}
+
 
 class OllamaMessage(TypedDict):
     """Type for an Ollama API message."""
@@ -50,9 +58,13 @@ def get_git_status() -> str:
 
 
 def perform_git_commit(message: str) -> None:
-    """Perform the git commit with the given message."""
+    """Perform the git commit with the given message.
+
+    The message is passed on stdin rather than the command line, which keeps
+    long messages clear of argument length limits and out of process listings.
+    """
     try:
-        subprocess.run(["git", "commit", "-m", message], check=True, text=True)
+        subprocess.run(["git", "commit", "-F", "-"], input=message, check=True, text=True)
         click.echo(f"Committed with message: {message}")
     except subprocess.CalledProcessError as e:
         click.echo(f"Error committing: {e}", err=True)
@@ -98,12 +110,34 @@ def get_config_values() -> tuple[str, str, str]:
     return ollama_host, model_name, prompt_message
 
 
-def generate_commit_message(diff: str, status: str) -> OllamaRequest:
+def generation_options(prompt_length: int) -> dict[str, Any]:
+    """Get the Ollama generation options of the configured latency profile.
+
+    Args:
+        prompt_length: Characters in the prompt
+
+    Returns:
+        dict[str, Any]: The options of an Ollama request
+    """
+    try:
+        from core.config import settings
+        from core.ollama_client import generation_options as profile_options
+
+        profile = settings.profiles[settings.run.latency_profile]
+        return profile_options(profile, prompt_length)
+    except Exception:
+        return {**DEFAULT_OPTIONS, "stop": list(DEFAULT_OPTIONS["stop"])}
+
+
+def generate_commit_message(
+    diff: str, status: str, config: Optional[tuple[str, str, str]] = None
+) -> OllamaRequest:
     """Format the git diff and status data for the Ollama API.
 
     Args:
         diff: The git diff output
         status: The git status output
+        config: The resolved configuration values, read anew if None
 
     Returns:
         OllamaRequest: The formatted request for the Ollama API
@@ -113,7 +147,7 @@ def generate_commit_message(diff: str, status: str) -> OllamaRequest:
     if len(diff) > max_diff_length:
         diff = diff[:max_diff_length] + "\n... (truncated)"
 
-    ollama_host, model_name, prompt_message = get_config_values()
+    _, model_name, prompt_message = config or get_config_values()
 
     prompt = prompt_message.format(diff=diff, status=status)
 
@@ -121,15 +155,18 @@ def generate_commit_message(diff: str, status: str) -> OllamaRequest:
         "model": model_name,
         "messages": [{"role": "user", "content": prompt}],
         "stream": False,
-        "options": {"temperature": 0.7, "top_p": 0.9, "max_tokens": 150},
+        "options": generation_options(len(prompt)),
     }
 
 
-def call_ollama_api(request_data: OllamaRequest) -> dict[str, Any]:
+def call_ollama_api(
+    request_data: OllamaRequest, ollama_host: Optional[str] = None
+) -> dict[str, Any]:
     """Call the local Ollama API to generate a commit message.
 
     Args:
         request_data: The formatted request data
+        ollama_host: The Ollama host URL, read from the configuration if None
 
     Returns:
         dict[str, Any]: The API response containing the generated message
@@ -137,7 +174,11 @@ def call_ollama_api(request_data: OllamaRequest) -> dict[str, Any]:
     Raises:
         SystemExit: If the API call fails
     """
-    ollama_host, _, _ = get_config_values()
+    # Imported here, as loading httpx takes longer than the rest of the startup
+    import httpx
+
+    if ollama_host is None:
+        ollama_host = get_config_values()[0]
 
     try:
         click.echo("Sending request to Ollama API...", err=True)
@@ -179,8 +220,11 @@ def run_git_camus(show: bool = False, message: Optional[str] = None) -> None:
         click.echo("No staged changes to commit.", err=True)
         sys.exit(0)
 
+    # Resolve the configuration once for the whole run
+    config = get_config_values()
+
     # Generate the commit message
-    request_data = generate_commit_message(diff, status)
+    request_data = generate_commit_message(diff, status, config)
 
     # Add context message if provided
     if message:
@@ -188,7 +232,7 @@ def run_git_camus(show: bool = False, message: Optional[str] = None) -> None:
         request_data["messages"].append({"role": "user", "content": context_prompt})
 
     # Call the API
-    response = call_ollama_api(request_data)
+    response = call_ollama_api(request_data, config[0])
 
     # Extract the commit message from the response
     commit_message = response.get("message", {}).get("content", "").strip()
@@ -0,0 +1,250 @@
+"""End-to-end benchmark harness."""
+
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Optional
+
+import git_camus
+
+# Repetitions per scenario; the median latency is reported
+BENCH_REPEAT = int(os.environ.get("GIT_CAMUS_BENCH_REPEAT", "3"))
+
+# Factor applied to every threshold, e.g. 1.5 on a slow machine
+BENCH_SLACK = float(os.environ.get("GIT_CAMUS_BENCH_SLACK", "1.0"))
+
+# Run the scenarios staging a gigabyte of changes as well
+BENCH_HUGE = os.environ.get("GIT_CAMUS_BENCH_HUGE") == "1"
+
+# Seconds `git-camus --help` may spend importing the CLI
+STARTUP_BUDGET = 0.15
+
+# Line repeated to fill the generated files
+FILLER = "the struggle itself toward the heights is enough to fill a heart\n"
+
+
+class Scenario:
+    """Staged changes, a fake Ollama and the limits a run must stay within."""
+
+    def __init__(
+        self,
+        name: str,
+        files: int,
+        file_bytes: int,
+        max_seconds: float,
+        max_rss_mb: float,
+        command: str = "run",
+        load_delay: float = 0.0,
+        prefill_delay: float = 0.0,
+        token_delay: float = 0.0,
+        huge: bool = False,
+    ) -> None:
+        """Initialize the scenario.
+
+        Args:
+            name: The name the scenario is reported under
+            files: The number of staged files
+            file_bytes: The size of each staged file
+            max_seconds: Median wall time a run may take
+            max_rss_mb: Peak resident memory a run may use, in MiB
+            command: "run" for `git-camus --show`, "hook" for the prepare-commit-msg hook
+            load_delay: Seconds the fake Ollama takes to load the model
+            prefill_delay: Seconds the fake Ollama takes per prompt token
+            token_delay: Seconds the fake Ollama takes per generated token
+            huge: Whether the scenario only runs with GIT_CAMUS_BENCH_HUGE=1
+        """
+        self.name = name
+        self.files = files
+        self.file_bytes = file_bytes
+        self.max_seconds = max_seconds
+        self.max_rss_mb = max_rss_mb
+        self.command = command
+        self.load_delay = load_delay
+        self.prefill_delay = prefill_delay
+        self.token_delay = token_delay
+        self.huge = huge
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class Measurement:
+    """Resource usage of one run of the CLI."""
+
+    def __init__(self, seconds: float, rss_mb: float, cpu_seconds: float, returncode: int) -> None:
+        """Initialize the measurement.
+
+        Args:
+            seconds: Wall time of the run
+            rss_mb: Peak resident memory of the CLI process, in MiB
+            cpu_seconds: User and system CPU time of the CLI process
+            returncode: The exit status of the CLI
+        """
+        self.seconds = seconds
+        self.rss_mb = rss_mb
+        self.cpu_seconds = cpu_seconds
+        self.returncode = returncode
+
+
+def make_repository(path: str, files: int, file_bytes: int) -> None:
+    """Create a repository with the given changes staged.
+
+    Files are spread over subdirectories of at most a thousand files each.
+
+    Args:
+        path: The directory to create the repository in
+        files: The number of files to stage
+        file_bytes: The size of each file
+    """
+    subprocess.run(["git", "init", "-q", path], check=True)
+    block = FILLER * (1 + min(file_bytes, 1 << 20) // len(FILLER))
+    for index in range(files):
+        directory = os.path.join(path, f"dir{index // 1000}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"file{index}.txt"), "w", encoding="utf-8") as f:
+            remaining = file_bytes
+            while remaining > 0:
+                chunk = block[:remaining]
+                f.write(chunk)
+                remaining -= len(chunk)
+    subprocess.run(["git", "add", "-A"], cwd=path, check=True)
+
+
+def cli_environment(ollama_url: str) -> dict[str, str]:
+    """Get the environment a benchmarked CLI runs in.
+
+    Args:
+        ollama_url: The URL of the fake Ollama server
+
+    Returns:
+        dict[str, str]: The current environment pointed at the fake server
+    """
+    env = dict(os.environ)
+    env["OLLAMA_HOST"] = ollama_url
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(git_camus.__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_parent, env.get("PYTHONPATH")]))
+    return env
+
+
+def run_cli(repository: str, command: str, env: dict[str, str]) -> Measurement:
+    """Run the CLI once and measure it.
+
+    Args:
+        repository: The repository to run in
+        command: "run" or "hook", see Scenario
+        env: The environment to run with
+
+    Returns:
+        Measurement: The wall time, peak memory and CPU time of the run
+    """
+    if command == "hook":
+        # Start from an empty message cache, or repeated runs only measure the lookup
+        shutil.rmtree(os.path.join(repository, ".git", "camus"), ignore_errors=True)
+        args = ["hook", "run", os.path.join(repository, ".git", "COMMIT_EDITMSG")]
+    else:
+        args = ["--show"]
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "git_camus.main", *args],
+        cwd=repository,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    _, status, usage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    rss = usage.ru_maxrss / (1 << 20 if sys.platform == "darwin" else 1 << 10)
+    return Measurement(seconds, rss, usage.ru_utime + usage.ru_stime, process.returncode)
+
+
+def summarize(scenario: Scenario, measurements: list[Measurement]) -> dict[str, Any]:
+    """Reduce the runs of a scenario to one report row.
+
+    Args:
+        scenario: The scenario that ran
+        measurements: Its runs
+
+    Returns:
+        dict[str, Any]: Median latency, peak memory and mean CPU time
+    """
+    return {
+        "scenario": scenario.name,
+        "runs": len(measurements),
+        "seconds": statistics.median(m.seconds for m in measurements),
+        "rss_mb": max(m.rss_mb for m in measurements),
+        "cpu_seconds": statistics.mean(m.cpu_seconds for m in measurements),
+        "max_seconds": scenario.max_seconds * BENCH_SLACK,
+        "max_rss_mb": scenario.max_rss_mb * BENCH_SLACK,
+    }
+
+
+def format_report(rows: list[dict[str, Any]]) -> list[str]:
+    """Render benchmark results as a table.
+
+    Args:
+        rows: The summarized scenarios
+
+    Returns:
+        list[str]: The lines of the table
+    """
+    lines = [f"{'Scenario':<24} {'Runs':>4} {'Latency':>10} {'Peak RSS':>12} {'CPU':>9}"]
+    for row in rows:
+        lines.append(
+            f"{row['scenario']:<24} {row['runs']:>4} "
+            f"{row['seconds']:>9.2f}s {row['rss_mb']:>8.1f} MiB {row['cpu_seconds']:>8.2f}s"
+        )
+    return lines
+
+
+def check_thresholds(row: dict[str, Any]) -> Optional[str]:
+    """Compare a scenario's results with its limits.
+
+    Args:
+        row: The summarized scenario
+
+    Returns:
+        Optional[str]: What regressed, or None if the scenario is within its limits
+    """
+    problems = []
+    if row["seconds"] > row["max_seconds"]:
+        problems.append(f"latency {row['seconds']:.2f}s over {row['max_seconds']:.2f}s")
+    if row["rss_mb"] > row["max_rss_mb"]:
+        problems.append(f"peak RSS {row['rss_mb']:.1f} MiB over {row['max_rss_mb']:.1f} MiB")
+    return "; ".join(problems) or None
+
+
+def import_times(args: list[str], env: dict[str, str]) -> dict[str, float]:
+    """Run the CLI under -X importtime and collect what it imported.
+
+    Args:
+        args: The CLI arguments
+        env: The environment to run with
+
+    Returns:
+        dict[str, float]: Cumulative import seconds by module name
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "git_camus.main", *args],
+        # Not the source directory, where git_camus.py would shadow the package
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(git_camus.__file__))),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
@@ -0,0 +1,27 @@
+import json
+import os
+
+import pytest
+
+from git_camus.tests.e2e.bench import format_report
+
+_bench_rows = []
+
+
+@pytest.fixture
+def bench_report():
+    """Collect the result of a benchmark scenario for the session report."""
+    return _bench_rows
+
+
+def pytest_terminal_summary(terminalreporter) -> None:
+    """Print the benchmark results, and write them to GIT_CAMUS_BENCH_JSON if set."""
+    if not _bench_rows:
+        return
+    terminalreporter.section("benchmarks")
+    for line in format_report(_bench_rows):
+        terminalreporter.write_line(line)
+    path = os.environ.get("GIT_CAMUS_BENCH_JSON")
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(_bench_rows, f, indent=2)
@@ -0,0 +1,73 @@
+"""End-to-end benchmarks of the CLI against a fake Ollama server."""
+
+import sys
+
+import pytest
+
+from git_camus.tests.e2e.bench import (
+    BENCH_HUGE,
+    BENCH_REPEAT,
+    Scenario,
+    check_thresholds,
+    cli_environment,
+    make_repository,
+    run_cli,
+    summarize,
+)
+from git_camus.tests.fake_ollama import FakeOllama
+
+SCENARIOS = [
+    Scenario("one-file-1kb", files=1, file_bytes=1_000, max_seconds=3.0, max_rss_mb=150),
+    Scenario("100-files-10kb", files=100, file_bytes=10_000, max_seconds=3.0, max_rss_mb=150),
+    Scenario("10k-files-200b", files=10_000, file_bytes=200, max_seconds=10.0, max_rss_mb=250),
+    Scenario("one-file-50mb", files=1, file_bytes=50_000_000, max_seconds=15.0, max_rss_mb=600),
+    Scenario(
+        "one-file-1gb", files=1, file_bytes=1_000_000_000, max_seconds=180.0, max_rss_mb=8192,
+        huge=True,
+    ),
+    Scenario(
+        "slow-model",
+        files=10,
+        file_bytes=5_000,
+        max_seconds=6.0,
+        max_rss_mb=150,
+        load_delay=1.0,
+        prefill_delay=0.0005,
+        token_delay=0.02,
+    ),
+    Scenario(
+        "hook-streaming",
+        files=10,
+        file_bytes=5_000,
+        max_seconds=6.0,
+        max_rss_mb=150,
+        command="hook",
+        prefill_delay=0.0005,
+        token_delay=0.02,
+    ),
+]
+
+
+@pytest.mark.bench
+@pytest.mark.skipif(sys.platform == "win32", reason="measures child processes with os.wait4")
+@pytest.mark.parametrize("scenario", SCENARIOS, ids=repr)
+def test_scenario(scenario, tmp_path, bench_report):
+    """Run the CLI on a scenario and hold it to its latency and memory limits."""
+    if scenario.huge and not BENCH_HUGE:
+        pytest.skip("set GIT_CAMUS_BENCH_HUGE=1 to stage a gigabyte of changes")
+    repository = str(tmp_path / "repo")
+    make_repository(repository, scenario.files, scenario.file_bytes)
+
+    with FakeOllama(
+        load_delay=scenario.load_delay,
+        prefill_delay=scenario.prefill_delay,
+        token_delay=scenario.token_delay,
+    ) as fake:
+        env = cli_environment(fake.url)
+        measurements = [run_cli(repository, scenario.command, env) for _ in range(BENCH_REPEAT)]
+
+    assert [m.returncode for m in measurements] == [0] * len(measurements)
+    row = summarize(scenario, measurements)
+    bench_report.append(row)
+    regression = check_thresholds(row)
+    assert regression is None, f"{scenario.name}: {regression}"
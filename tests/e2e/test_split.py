@@ -0,0 +1,59 @@
+"""End-to-end checks of --split against a fake Ollama server."""
+
+import os
+import subprocess
+import sys
+
+from git_camus.tests.e2e.bench import cli_environment
+from git_camus.tests.fake_ollama import FakeOllama
+
+
+def git(repository, *args):
+    """Run git in the test repository and return its output."""
+    return subprocess.check_output(["git", *args], cwd=repository, text=True).strip()
+
+
+def test_split_commits_groups_in_parallel(tmp_path):
+    """Test a cold CLI generates the groups' messages on threads and commits each group."""
+    repository = tmp_path / "repo"
+    subprocess.run(["git", "init", "-q", str(repository)], check=True)
+    for name, text in {
+        "hill/boulder.txt": "The boulder rolls down the hill\n",
+        "sea side/beach café.txt": "A man walks on the beach at noon\n",
+        "sea side/sun.txt": "The sun strikes like a cymbal\n",
+    }.items():
+        path = repository / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    git(repository, "add", ".")
+
+    with FakeOllama(first_token_delay=0.2) as fake:
+        env = cli_environment(fake.url)
+        env["HOME"] = str(tmp_path)
+        env.pop("XDG_CONFIG_HOME", None)
+        env.pop("XDG_STATE_HOME", None)
+        for variable in ("AUTHOR", "COMMITTER"):
+            env[f"GIT_{variable}_NAME"] = "Sisyphus"
+            env[f"GIT_{variable}_EMAIL"] = "sisyphus@example.com"
+        # The preview leaves the server's health cached, so the second run only
+        # touches httpx from the threads generating the messages
+        for args in (["--split", "--show"], ["--split"]):
+            result = subprocess.run(
+                [sys.executable, "-m", "git_camus.main", *args],
+                cwd=repository,
+                env=env,
+                capture_output=True,
+                text=True,
+                timeout=60,
+            )
+            assert result.returncode == 0, result.stderr
+
+    assert len([path for path, _ in fake.requests if path == "/api/chat"]) == 4
+    assert git(repository, "rev-list", "--count", "HEAD") == "2"
+    changed = [
+        git(repository, "-c", "core.quotePath=false", "show", "--name-only", "--format=", rev)
+        for rev in ("HEAD~1", "HEAD")
+    ]
+    assert changed == ["hill/boulder.txt", "sea side/beach café.txt\nsea side/sun.txt"]
+    assert git(repository, "status", "--porcelain") == ""
+    assert os.path.exists(repository / "sea side" / "beach café.txt")
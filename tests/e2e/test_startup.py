@@ -0,0 +1,54 @@
+"""Startup cost checks of the CLI."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import git_camus
+from git_camus.tests.e2e.bench import BENCH_SLACK, STARTUP_BUDGET, cli_environment, import_times
+
+# Modules only the paths talking to Ollama or reading settings may load
+HEAVY_MODULES = ("httpx", "pydantic", "pydantic_settings", "cProfile", "tracemalloc")
+
+
+def test_help_skips_heavy_modules():
+    """Test --help loads neither the HTTP client, pydantic nor the profilers."""
+    times = import_times(["--help"], cli_environment("http://127.0.0.1:9"))
+
+    assert "git_camus.cli.commands" in times
+    assert [name for name in HEAVY_MODULES if name in times] == []
+
+
+@pytest.mark.bench
+def test_help_import_budget():
+    """Test importing the CLI for --help stays within the startup budget."""
+    env = cli_environment("http://127.0.0.1:9")
+    # The best of a few runs, to leave out a cold file system cache
+    seconds = min(import_times(["--help"], env)["git_camus.cli.commands"] for _ in range(5))
+
+    assert seconds <= STARTUP_BUDGET * BENCH_SLACK, (
+        f"importing git-camus took {seconds * 1000:.1f} ms, "
+        f"over the {STARTUP_BUDGET * BENCH_SLACK * 1000:.0f} ms budget"
+    )
+
+
+def test_settings_skip_pydantic():
+    """Test reading the settings on the hot path does not load pydantic."""
+    code = (
+        "import sys\n"
+        "from git_camus.core.config import settings\n"
+        "assert settings.run.model_name\n"
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in ('pydantic', 'pydantic_core')))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(git_camus.__file__))),
+        env=cli_environment("http://127.0.0.1:9"),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,193 @@
+"""Local fake Ollama server for tests."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+
+class FakeOllama:
+    """A minimal Ollama API served from a background thread.
+
+    Latencies are configurable per phase so tests can make one server slow
+    to start and another fast, or make a server fail outright.
+    """
+
+    def __init__(
+        self,
+        reply: str = "One must imagine Sisyphus committing",
+        first_token_delay: float = 0.0,
+        token_delay: float = 0.0,
+        status: int = 200,
+        load_delay: float = 0.0,
+        prefill_delay: float = 0.0,
+    ) -> None:
+        """Initialize the fake server.
+
+        Args:
+            reply: The message generated for every chat request
+            first_token_delay: Seconds before the first token of every request
+            token_delay: Seconds between generated tokens
+            status: HTTP status returned for every POST request
+            load_delay: Seconds to load a model on its first request
+            prefill_delay: Seconds per prompt token, where every word stands for a token
+        """
+        self.reply = reply
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.load_delay = load_delay
+        self.prefill_delay = prefill_delay
+        self.status = status
+        self.requests: list[tuple[str, dict[str, Any]]] = []
+        self.loaded: set[str] = set()
+        self.created: dict[str, dict[str, Any]] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        """Get the base URL of the running server."""
+        assert self._server is not None
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeOllama":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _send_json(self, status: int, body: dict[str, Any]) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:
+                if self.path == "/api/version":
+                    self._send_json(200, {"version": "0.0.0-fake"})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                fake.requests.append((self.path, payload))
+                if fake.status != 200:
+                    self._send_json(fake.status, {"error": "fake failure"})
+                elif self.path == "/api/chat":
+                    fake.chat(self, payload)
+                elif self.path == "/api/generate" and not payload.get("prompt"):
+                    # An empty prompt only loads the model
+                    fake.loaded.add(payload.get("model", ""))
+                    self._send_json(200, {"model": payload.get("model"), "done": True})
+                elif self.path == "/api/generate":
+                    fake.generate(self, payload)
+                elif self.path == "/api/embed":
+                    inputs = payload.get("input", [])
+                    texts = [inputs] if isinstance(inputs, str) else inputs
+                    self._send_json(200, {"embeddings": [fake.embed(text) for text in texts]})
+                elif self.path == "/api/create":
+                    fake.created[payload["model"]] = payload
+                    self._send_json(200, {"status": "success"})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        assert self._server is not None
+        self._server.shutdown()
+        self._server.server_close()
+
+    def process_prompt(self, model: str, prompt_tokens: int) -> dict[str, Any]:
+        """Wait as long as loading the model and processing the prompt take.
+
+        Returns:
+            dict[str, Any]: Ollama's load and prompt statistics for the response
+        """
+        load = 0.0
+        if model not in self.loaded:
+            load = self.load_delay
+            self.loaded.add(model)
+        prefill = self.first_token_delay + self.prefill_delay * prompt_tokens
+        time.sleep(load + prefill)
+        return {
+            "model": model,
+            "done": True,
+            "load_duration": int(load * 1e9),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prefill * 1e9),
+        }
+
+    def chat(self, handler: Any, payload: dict[str, Any]) -> None:
+        """Answer a chat request, streamed or not."""
+        started = time.monotonic()
+        tokens = [word + " " for word in self.reply.split()]
+        tokens[-1] = tokens[-1].rstrip()
+        prompt_tokens = sum(
+            len(str(message.get("content", "")).split()) for message in payload.get("messages", [])
+        )
+        stats = self.process_prompt(payload.get("model", ""), prompt_tokens)
+        stats["eval_count"] = len(tokens)
+        stats["eval_duration"] = int(self.token_delay * len(tokens) * 1e9)
+
+        if not payload.get("stream", True):
+            time.sleep(self.token_delay * len(tokens))
+            stats["total_duration"] = int((time.monotonic() - started) * 1e9)
+            handler._send_json(200, {**stats, "message": {"role": "assistant", "content": self.reply}})
+            return
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/x-ndjson")
+        handler.end_headers()
+        try:
+            for token in tokens:
+                chunk = {"message": {"role": "assistant", "content": token}, "done": False}
+                handler.wfile.write(json.dumps(chunk).encode() + b"\n")
+                handler.wfile.flush()
+                time.sleep(self.token_delay)
+            stats["total_duration"] = int((time.monotonic() - started) * 1e9)
+            final = {**stats, "message": {"role": "assistant", "content": ""}}
+            handler.wfile.write(json.dumps(final).encode() + b"\n")
+            handler.wfile.flush()
+        except OSError:
+            # The client gave up on this stream, e.g. a cancelled hedged request
+            pass
+
+    @staticmethod
+    def embed(text: str, dimensions: int = 16) -> list[float]:
+        """Embed a text as counts of its words hashed into a few buckets."""
+        vector = [0.0] * dimensions
+        for word in text.lower().split():
+            vector[sum(word.encode()) % dimensions] += 1.0
+        return vector
+
+    def generate(self, handler: Any, payload: dict[str, Any]) -> None:
+        """Answer a non-streamed generate request, returning a context.
+
+        Every word stands for a token; words already in the passed context
+        are not counted in prompt_eval_count, like a server reusing its cache.
+        """
+        prompt_tokens = f"{payload.get('system', '')} {payload['prompt']}".split()
+        self.process_prompt(payload.get("model", ""), len(prompt_tokens))
+        reply_tokens = self.reply.split()
+        context = list(payload.get("context", []))
+        context += range(len(context), len(context) + len(prompt_tokens) + len(reply_tokens))
+        handler._send_json(
+            200,
+            {
+                "model": payload.get("model", ""),
+                "response": self.reply,
+                "done": True,
+                "context": context,
+                "prompt_eval_count": len(prompt_tokens),
+                "eval_count": len(reply_tokens),
+            },
+        )
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Test suite for git-camus."""
 
+import contextlib
 import os
 import subprocess
 from unittest import mock
@@ -14,7 +15,31 @@ from git_camus.core.git_operations import (
     get_git_status,
     perform_git_commit,
 )
-from git_camus.core.ollama_client import OllamaClient
+from git_camus.core.ollama_client import OllamaClient, OllamaUnavailable
+
+
+@pytest.fixture(autouse=True)
+def ollama_reachable():
+    """Let the Ollama reachability probe succeed."""
+    with mock.patch("httpx.get") as mock_get:
+        mock_get.return_value.raise_for_status.return_value = None
+        yield mock_get
+
+
+@pytest.fixture(autouse=True)
+def no_recent_messages():
+    """Keep the check for repeated messages out of the repository the tests run in."""
+    with mock.patch(
+        "git_camus.cli.commands.RecentMessages.for_repository", return_value=None
+    ) as mock_for_repo:
+        yield mock_for_repo
+
+
+@pytest.fixture(autouse=True)
+def no_revision():
+    """Keep the lookup of previewed messages out of the repository the tests run in."""
+    with mock.patch("git_camus.cli.commands.find_revision", return_value=None) as mock_find:
+        yield mock_find
 
 
 @pytest.fixture
@@ -29,10 +54,9 @@ def mock_ollama_env():
 @pytest.fixture
 def mock_git_commands():
     """Mock all git subprocess commands."""
-    with (
-        mock.patch("subprocess.check_output") as mock_check_output,
-        mock.patch("subprocess.run") as mock_run,
-    ):
+    with mock.patch("subprocess.check_output") as mock_check_output, mock.patch(
+        "subprocess.run"
+    ) as mock_run:
         # Set up git diff return value
         mock_check_output.side_effect = lambda cmd, **kwargs: {
             ("git", "diff", "--cached"): "diff --git a/test.py b/test.py\n+def test(): pass",
@@ -82,7 +106,7 @@ class TestGitOperations:
         # Verify the result
         assert "diff --git" in result
         mock_check_output.assert_called_with(
-            ["git", "diff", "--cached"], text=True, stderr=subprocess.PIPE
+            ["git", "diff", "--cached"], text=True, stderr=subprocess.PIPE, timeout=None
         )
 
     def test_get_git_diff_error(self):
@@ -105,7 +129,7 @@ class TestGitOperations:
         # Verify the result
         assert "M test.py" in result
         mock_check_output.assert_called_with(
-            ["git", "status", "--porcelain"], text=True, stderr=subprocess.PIPE
+            ["git", "status", "--porcelain"], text=True, stderr=subprocess.PIPE, timeout=None
         )
 
     def test_get_git_status_error(self):
@@ -126,7 +150,7 @@ class TestGitOperations:
 
         # Verify the subprocess call
         mock_run.assert_called_with(
-            ["git", "commit", "-m", "Test commit message"], check=True, text=True
+            ["git", "commit", "-F", "-"], input="Test commit message", check=True, text=True
         )
 
     def test_perform_git_commit_error(self):
@@ -161,7 +185,7 @@ class TestAPIInteractions:
         assert "Git Status:" in request["messages"][0]["content"]
         assert request["stream"] is False
         assert "temperature" in request["options"]
-        assert "max_tokens" in request["options"]
+        assert "num_predict" in request["options"]
 
     def test_call_ollama_api(self, mock_ollama_env, mock_ollama_api):
         """Test successful API call."""
@@ -170,7 +194,7 @@ class TestAPIInteractions:
             "model": "llama3.2",
             "messages": [{"role": "user", "content": "Test message"}],
             "stream": False,
-            "options": {"temperature": 0.7, "max_tokens": 150},
+            "options": {"temperature": 0.7, "num_predict": 64},
         }
 
         # Call the function
@@ -195,7 +219,7 @@ class TestAPIInteractions:
         with mock.patch("httpx.post") as mock_post:
             mock_post.side_effect = httpx.ConnectError("Connection failed")
 
-            with pytest.raises(SystemExit):
+            with pytest.raises(OllamaUnavailable):
                 client = OllamaClient(host="http://localhost:11434")
                 client.call_api({})
 
@@ -287,7 +311,7 @@ class TestAPIInteractions:
             perform_git_commit("Test commit message")
 
             mock_run.assert_called_with(
-                ["git", "commit", "-m", "Test commit message"], check=True, text=True
+                ["git", "commit", "-F", "-"], input="Test commit message", check=True, text=True
             )
             mock_echo.assert_called_with("Committed with message: Test commit message")
 
@@ -362,7 +386,11 @@ class TestMainFunction:
             "diff --git a/test.py b/test.py\n+def new_function():\n    pass\n",  # git diff
         ]
 
-        with mock.patch("click.echo") as mock_echo:
+        with contextlib.ExitStack() as stack:
+            mock_echo = stack.enter_context(mock.patch("click.echo"))
+            stack.enter_context(mock.patch("git_camus.cli.commands.MessageCache"))
+            stack.enter_context(mock.patch("git_camus.cli.commands.get_index_tree"))
+            stack.enter_context(mock.patch("git_camus.cli.commands.get_head"))
             # Call the function in show mode
             run_git_camus(show=True, message=None)
 
@@ -388,8 +416,9 @@ class TestMainFunction:
         # Verify the API request contained the context
         args, kwargs = mock_ollama_api.call_args
         messages = kwargs["json"]["messages"]
-        assert len(messages) == 2
-        assert "Fix bug in authentication" in messages[1]["content"]
+        assert len(messages) == 3
+        assert messages[0]["role"] == "system"
+        assert "Fix bug in authentication" in messages[2]["content"]
 
     def test_run_git_camus_commit_mode(self, mock_ollama_env, mock_git_commands, mock_ollama_api):
         """Test run_git_camus function in commit mode."""
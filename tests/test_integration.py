@@ -13,6 +13,14 @@ import pytest
 from git_camus.cli.commands import run_git_camus
 
 
+@pytest.fixture(autouse=True)
+def ollama_reachable():
+    """Let the Ollama reachability probe succeed."""
+    with mock.patch("httpx.get") as mock_get:
+        mock_get.return_value.raise_for_status.return_value = None
+        yield mock_get
+
+
 class TestGitCamusIntegration:
     """Integration tests for the complete git-camus workflow."""
 
@@ -151,8 +159,9 @@ class TestGitCamusIntegration:
             # Verify the API request contained the context
             args, kwargs = mock_ollama_api.call_args
             messages = kwargs["json"]["messages"]
-            assert len(messages) == 2
-            assert "Add new function" in messages[1]["content"]
+            assert len(messages) == 3
+            assert messages[0]["role"] == "system"
+            assert "Add new function" in messages[2]["content"]
 
         finally:
             os.chdir(original_cwd)
@@ -209,7 +218,7 @@ class TestGitCamusIntegration:
                 os.chdir(original_cwd)
 
     def test_workflow_ollama_connection_error(self, temp_git_repo, mock_ollama_env):
-        """Test workflow when Ollama is not available."""
+        """Test workflow falls back to a local message when Ollama is not available."""
         # Create a test file
         test_file = temp_git_repo / "test.py"
         test_file.write_text("def new_function():\n    pass\n")
@@ -225,12 +234,20 @@ class TestGitCamusIntegration:
             try:
                 os.chdir(temp_git_repo)
 
-                with pytest.raises(SystemExit):
-                    run_git_camus(show=False, message=None)
+                run_git_camus(show=False, message=None)
 
             finally:
                 os.chdir(original_cwd)
 
+        subject = subprocess.run(
+            ["git", "log", "-1", "--format=%s"],
+            cwd=temp_git_repo,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        assert subject.startswith("Roll the boulder through test.py")
+
     def test_workflow_custom_ollama_host(self, temp_git_repo, mock_ollama_api):
         """Test workflow with custom Ollama host."""
         # Create a test file
@@ -1,11 +1,47 @@
 """Tests for CLI commands module."""
 
-from unittest.mock import Mock, patch
+import json
+import subprocess
+import time
+from dataclasses import replace
+from unittest.mock import ANY, Mock, patch
 
+import httpx
 import pytest
 from click.testing import CliRunner
 
-from git_camus.cli.commands import main, run_git_camus
+from git_camus.cli.commands import (
+    call_with_context,
+    find_examples,
+    find_revision,
+    main,
+    read_history,
+    regenerate_if_repeated,
+    run_git_camus,
+    run_split,
+)
+from git_camus.core import tracing
+from git_camus.core.config import RouteTier, RunConfig, get_config_values, settings
+from git_camus.core.deadline import Deadline, DeadlineExceeded
+from git_camus.core.health import HealthCache
+from git_camus.core.similarity import RecentMessages
+from git_camus.core.split import ChangeGroup
+from git_camus.core.stats import RunLog
+from git_camus.core.throughput import ThroughputStats
+
+
+@pytest.fixture(autouse=True)
+def recent_messages():
+    """Keep the check for repeated messages out of the repository the tests run in."""
+    with patch("git_camus.cli.commands.RecentMessages.for_repository", return_value=None) as mock:
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def revision():
+    """Generate from the full diff unless a test revises a preview."""
+    with patch("git_camus.cli.commands.find_revision", return_value=None) as mock:
+        yield mock
 
 
 class TestRunGitCamus:
@@ -75,10 +111,14 @@ class TestRunGitCamus:
     @patch("git_camus.cli.commands.has_staged_changes")
     @patch("git_camus.cli.commands.get_config_values")
     @patch("git_camus.cli.commands.OllamaClient")
+    @patch("git_camus.cli.commands.MessageCache")
+    @patch("git_camus.cli.commands.get_index_tree")
     @patch("click.echo")
     def test_run_git_camus_show_message(
         self,
         mock_echo,
+        mock_index_tree,
+        mock_cache,
         mock_ollama_client,
         mock_config,
         mock_has_changes,
@@ -106,6 +146,17 @@ class TestRunGitCamus:
         # Verify message is displayed, not committed
         mock_echo.assert_called_once_with("Philosophical commit message")
 
+        # Verify the preview is remembered for the prepare-commit-msg hook
+        mock_cache.for_repository.return_value.put.assert_called_once_with(
+            mock_index_tree.return_value,
+            "llama3.2",
+            "Philosophical commit message",
+            fallback=False,
+        )
+        mock_cache.for_repository.return_value.put_preview.assert_called_once_with(
+            ANY, mock_index_tree.return_value, "llama3.2", "Philosophical commit message"
+        )
+
     @patch("git_camus.cli.commands.check_git_repository")
     @patch("git_camus.cli.commands.get_git_status")
     @patch("git_camus.cli.commands.get_git_diff")
@@ -140,6 +191,895 @@ class TestRunGitCamus:
 
         mock_echo.assert_called_once_with("Error: No commit message generated", err=True)
 
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status")
+    @patch("git_camus.cli.commands.get_git_diff")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.OllamaClient")
+    @patch("git_camus.cli.commands.perform_git_commit")
+    @patch("click.echo")
+    def test_run_git_camus_deadline_fallback(
+        self,
+        mock_echo,
+        mock_commit,
+        mock_ollama_client,
+        mock_config,
+        mock_diff,
+        mock_status,
+        mock_check_repo
+    ):
+        """Test a local message is committed when Ollama misses the deadline."""
+        mock_status.return_value = "M  core/app.py"
+        mock_diff.return_value = (
+            "diff --git a/core/app.py b/core/app.py\n--- a/core/app.py\n+++ b/core/app.py\n"
+            "+added\n-removed\n"
+        )
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+
+        mock_client_instance = Mock()
+        mock_ollama_client.return_value = mock_client_instance
+        mock_client_instance.generate_commit_message_request.return_value = {"messages": []}
+        mock_client_instance.call_api.side_effect = DeadlineExceeded("deadline of 1s exceeded")
+
+        run_git_camus(show=False, message=None, deadline=1.0)
+
+        mock_commit.assert_called_once_with(
+            "Roll the boulder through app.py (+1/-1); one must imagine Sisyphus happy"
+        )
+        deadline = mock_client_instance.call_api.call_args.kwargs["deadline"]
+        assert deadline.seconds == 1.0
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status", return_value="M  README.md")
+    @patch("git_camus.cli.commands.get_git_diff")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.make_client")
+    @patch("git_camus.cli.commands.perform_git_commit")
+    @patch("click.echo")
+    def test_run_git_camus_git_outside_deadline(
+        self, mock_echo, mock_commit, mock_make_client, mock_config, mock_diff, mock_status,
+        mock_check_repo
+    ):
+        """Test git is waited for however long it takes, the deadline only bounds Ollama."""
+        mock_diff.side_effect = lambda: time.sleep(0.1) or "diff --git a/README.md\n+Sisyphus\n"
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        mock_make_client.return_value.call_api.return_value = {
+            "message": {"content": "Roll on"}
+        }
+
+        run_git_camus(show=False, message=None, deadline=0.05)
+
+        mock_status.assert_called_once_with()
+        mock_commit.assert_called_once_with(
+            "Roll the boulder through README.md (+1/-0); one must imagine Sisyphus happy"
+        )
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status", return_value=" M README.md\n?? notes.txt\n")
+    @patch("git_camus.cli.commands.get_git_diff", return_value="")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.perform_git_commit")
+    @patch("click.echo")
+    def test_run_git_camus_only_unstaged_changes(
+        self, mock_echo, mock_commit, mock_config, mock_diff, mock_status, mock_check_repo
+    ):
+        """Test unstaged and untracked files alone count as nothing to commit."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+
+        with pytest.raises(SystemExit) as exc_info:
+            run_git_camus(show=False, message=None)
+
+        assert exc_info.value.code == 0
+        mock_echo.assert_called_once_with("No staged changes to commit.", err=True)
+        mock_commit.assert_not_called()
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status", return_value="M  README.md")
+    @patch("git_camus.cli.commands.get_git_diff", return_value="")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.perform_git_commit")
+    @patch("click.echo")
+    def test_run_git_camus_unreadable_diff_aborts(
+        self, mock_echo, mock_commit, mock_config, mock_diff, mock_status, mock_check_repo
+    ):
+        """Test nothing is committed when git fails to give the diff of staged changes."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+
+        with pytest.raises(SystemExit) as exc_info:
+            run_git_camus(show=False, message=None)
+
+        assert exc_info.value.code == 1
+        mock_commit.assert_not_called()
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status")
+    @patch("git_camus.cli.commands.get_git_diff")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.OllamaClient")
+    @patch("git_camus.cli.commands.perform_git_commit")
+    @patch("click.echo")
+    def test_run_git_camus_unreachable_fallback(
+        self,
+        mock_echo,
+        mock_commit,
+        mock_ollama_client,
+        mock_config,
+        mock_diff,
+        mock_status,
+        mock_check_repo
+    ):
+        """Test an unreachable server fails over to a local message without a request."""
+        mock_status.return_value = "M  README.md"
+        mock_diff.return_value = "diff --git a/README.md b/README.md\n+Sisyphus\n"
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        mock_ollama_client.return_value.is_available.return_value = False
+
+        run_git_camus(show=False, message=None)
+
+        mock_ollama_client.return_value.call_api.assert_not_called()
+        mock_commit.assert_called_once_with(
+            "Roll the boulder through README.md (+1/-0); one must imagine Sisyphus happy"
+        )
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status", return_value="M  README.md")
+    @patch("git_camus.cli.commands.get_git_diff")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.perform_git_commit")
+    @patch("httpx.post", side_effect=httpx.ConnectError("Connection refused"))
+    @patch("click.echo")
+    def test_run_git_camus_refused_after_probe_fallback(
+        self, mock_echo, mock_post, mock_commit, mock_config, mock_diff, mock_status,
+        mock_check_repo, tmp_path
+    ):
+        """Test a server that went down since its cached probe fails over to a local message."""
+        mock_diff.return_value = "diff --git a/README.md b/README.md\n+Sisyphus\n"
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        health_cache = HealthCache(str(tmp_path / "health.json"))
+        health_cache.put("http://localhost:11434", True)
+
+        with patch("git_camus.cli.commands.HealthCache.for_user", return_value=health_cache):
+            run_git_camus(show=False, message=None)
+
+        mock_commit.assert_called_once_with(
+            "Roll the boulder through README.md (+1/-0); one must imagine Sisyphus happy"
+        )
+        assert health_cache.get("http://localhost:11434") is False
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.make_client")
+    @patch("click.echo")
+    def test_run_git_camus_auto_warm(
+        self, mock_echo, mock_make_client, mock_config, mock_status, mock_check_repo
+    ):
+        """Test the model is warmed up before git data is collected."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        mock_status.side_effect = lambda: (
+            mock_make_client.return_value.warm_async.assert_called_once_with("llama3.2") or ""
+        )
+
+        run = replace(settings.run, auto_warm=True)
+        with patch.object(settings, "run", run), pytest.raises(SystemExit):
+            run_git_camus()
+
+        mock_status.assert_called_once()
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status", return_value="M  file.txt")
+    @patch("git_camus.cli.commands.get_git_diff", return_value="diff content")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.make_client")
+    @patch("git_camus.cli.commands.call_with_context")
+    @patch("git_camus.cli.commands.refine_interactively")
+    @patch("git_camus.cli.commands.MessageCache")
+    @patch("git_camus.cli.commands.perform_git_commit")
+    def test_run_git_camus_interactive(
+        self,
+        mock_commit,
+        mock_cache,
+        mock_refine,
+        mock_call,
+        mock_make_client,
+        mock_config,
+        mock_diff,
+        mock_status,
+        mock_check_repo,
+    ):
+        """Test the refined message is committed and its context kept."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        mock_make_client.return_value.generate_commit_message_request.return_value = {
+            "messages": []
+        }
+        mock_call.return_value = {"message": {"content": "First draft"}, "context": [1, 2]}
+        mock_refine.return_value = "Refined"
+
+        run_git_camus(interactive=True)
+
+        conversation = mock_refine.call_args.args[1]
+        assert mock_refine.call_args.args[0] == "First draft"
+        assert conversation.context == [1, 2]
+        mock_commit.assert_called_once_with("Refined")
+        mock_cache.for_repository.return_value.put_context.assert_called_once()
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status", return_value="M  file.txt")
+    @patch("git_camus.cli.commands.get_git_diff", return_value="diff content")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.make_client")
+    @patch("git_camus.cli.commands.call_with_context")
+    @patch("git_camus.cli.commands.refine_interactively", return_value=None)
+    @patch("git_camus.cli.commands.perform_git_commit")
+    @patch("click.echo")
+    def test_run_git_camus_interactive_quit(
+        self,
+        mock_echo,
+        mock_commit,
+        mock_refine,
+        mock_call,
+        mock_make_client,
+        mock_config,
+        mock_diff,
+        mock_status,
+        mock_check_repo,
+    ):
+        """Test quitting the refinement commits nothing."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        mock_make_client.return_value.generate_commit_message_request.return_value = {
+            "messages": []
+        }
+        mock_call.return_value = {"message": {"content": "First draft"}}
+
+        with pytest.raises(SystemExit) as exc_info:
+            run_git_camus(interactive=True)
+
+        assert exc_info.value.code == 1
+        mock_commit.assert_not_called()
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status", return_value="M  file.txt")
+    @patch("git_camus.cli.commands.get_git_diff", return_value="diff content")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.make_client")
+    @patch("git_camus.cli.commands.perform_git_commit")
+    def test_run_git_camus_derived_model(
+        self,
+        mock_commit,
+        mock_make_client,
+        mock_config,
+        mock_diff,
+        mock_status,
+        mock_check_repo,
+    ):
+        """Test a derived model is used without sending the system prompt."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        client = mock_make_client.return_value
+        client.generate_commit_message_request.return_value = {"messages": []}
+        client.call_api.return_value = {"message": {"content": "Baked in"}}
+
+        with patch.object(settings, "run", replace(settings.run, derived_model="git-camus")):
+            run_git_camus()
+
+        client.generate_commit_message_request.assert_called_once_with(
+            "diff content",
+            "M  file.txt",
+            "git-camus",
+            "prompt",
+            system_prompt=None,
+            profile=settings.profiles["balanced"],
+            examples=None,
+            history=None,
+            body_min_files=None,
+            revision=None,
+        )
+        mock_commit.assert_called_once_with("Baked in")
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status", return_value="M  file.txt")
+    @patch("git_camus.cli.commands.get_git_diff", return_value="diff content")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.make_client")
+    @patch("git_camus.cli.commands.get_head", return_value="def456")
+    @patch("git_camus.cli.commands.perform_git_commit")
+    def test_run_git_camus_remembers_commit(
+        self,
+        mock_commit,
+        mock_head,
+        mock_make_client,
+        mock_config,
+        mock_diff,
+        mock_status,
+        mock_check_repo,
+        recent_messages,
+    ):
+        """Test the message is remembered with the commit made, for the next check."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        client = mock_make_client.return_value
+        client.generate_commit_message_request.return_value = {"messages": []}
+        client.call_api.return_value = {"message": {"content": "Swift"}}
+        recent = recent_messages.return_value = Mock()
+        recent.closest.return_value = (None, 0.0)
+
+        with patch.object(settings, "run", replace(settings.run, repeat_threshold=0.5)):
+            run_git_camus()
+
+        recent.add.assert_called_once_with("Swift", head="def456")
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status", return_value="M  file.txt")
+    @patch("git_camus.cli.commands.get_git_diff", return_value="diff content")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.make_client")
+    @patch("git_camus.cli.commands.commit_with_plumbing")
+    @patch("git_camus.cli.commands.perform_git_commit")
+    def test_run_git_camus_fast_commit(
+        self,
+        mock_commit,
+        mock_plumbing,
+        mock_make_client,
+        mock_config,
+        mock_diff,
+        mock_status,
+        mock_check_repo,
+    ):
+        """Test the plumbing commit is tried first when enabled, and git commit otherwise."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        client = mock_make_client.return_value
+        client.generate_commit_message_request.return_value = {"messages": []}
+        client.call_api.return_value = {"message": {"content": "Swift"}}
+
+        run_git_camus()
+        mock_plumbing.assert_not_called()
+        mock_commit.assert_called_once_with("Swift")
+
+        mock_commit.reset_mock()
+        mock_plumbing.return_value = True
+        with patch.object(settings, "run", replace(settings.run, fast_commit=True)):
+            run_git_camus()
+        mock_plumbing.assert_called_once_with("Swift")
+        mock_commit.assert_not_called()
+
+        mock_plumbing.return_value = False
+        with patch.object(settings, "run", replace(settings.run, fast_commit=True)):
+            run_git_camus()
+        mock_commit.assert_called_once_with("Swift")
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status", return_value="M  file.txt")
+    @patch("git_camus.cli.commands.get_git_diff", return_value="diff content")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.make_client")
+    @patch("git_camus.cli.commands.perform_git_commit")
+    def test_run_git_camus_revises_preview(
+        self,
+        mock_commit,
+        mock_make_client,
+        mock_config,
+        mock_diff,
+        mock_status,
+        mock_check_repo,
+        revision,
+    ):
+        """Test a preview extended by more staged files is revised instead of regenerated."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        revision.return_value = ("Roll the boulder", "+hill")
+        client = mock_make_client.return_value
+        client.generate_commit_message_request.return_value = {"messages": []}
+        client.call_api.return_value = {"message": {"content": "Roll the boulder up the hill"}}
+
+        run_git_camus()
+
+        revision.assert_called_once_with("diff content", "llama3.2")
+        client.generate_commit_message_request.assert_called_once_with(
+            "diff content",
+            "M  file.txt",
+            "llama3.2",
+            "prompt",
+            system_prompt=settings.run.system_prompt,
+            profile=ANY,
+            examples=None,
+            history=None,
+            body_min_files=settings.run.body_min_files,
+            revision=("Roll the boulder", "+hill"),
+        )
+        mock_commit.assert_called_once_with("Roll the boulder up the hill")
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("click.echo")
+    def test_run_git_camus_unknown_latency_profile(self, mock_echo, mock_config, mock_check_repo):
+        """Test an unknown latency profile is rejected before any work."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+
+        with pytest.raises(SystemExit) as exc_info:
+            run_git_camus(latency="instant")
+
+        assert exc_info.value.code == 1
+        assert "fast, balanced, quality" in mock_echo.call_args.args[0]
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status", return_value="M  file.txt")
+    @patch("git_camus.cli.commands.get_git_diff", return_value="diff content")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.make_client")
+    @patch("git_camus.cli.commands.ModelRouter")
+    @patch("git_camus.cli.commands.perform_git_commit")
+    def test_run_git_camus_routes_model(
+        self,
+        mock_commit,
+        mock_router,
+        mock_make_client,
+        mock_config,
+        mock_diff,
+        mock_status,
+        mock_check_repo,
+    ):
+        """Test the routed model generates and has its throughput recorded."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        mock_router.return_value.route.return_value = "llama3.2:1b"
+        client = mock_make_client.return_value
+        client.generate_commit_message_request.return_value = {"messages": []}
+        client.call_api.return_value = {
+            "message": {"content": "Small and fast"},
+            "eval_count": 10,
+            "eval_duration": 500_000_000,
+        }
+        tiers = [RouteTier(max_lines=20, models=["llama3.2:1b"])]
+
+        with patch.object(settings, "run", replace(settings.run, routes=tiers)):
+            run_git_camus()
+
+        assert client.generate_commit_message_request.call_args.args[2] == "llama3.2:1b"
+        assert ThroughputStats.for_user().get("llama3.2:1b") == {"eval": 20.0}
+        mock_commit.assert_called_once_with("Small and fast")
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status", return_value="M  file.txt")
+    @patch("git_camus.cli.commands.get_git_diff", return_value="diff content")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.make_client")
+    @patch("git_camus.cli.commands.perform_git_commit")
+    @patch("click.echo")
+    def test_run_git_camus_timings(
+        self,
+        mock_echo,
+        mock_commit,
+        mock_make_client,
+        mock_config,
+        mock_diff,
+        mock_status,
+        mock_check_repo,
+    ):
+        """Test the JSON timings cover every phase and Ollama's breakdown."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        client = mock_make_client.return_value
+        client.generate_commit_message_request.return_value = {"messages": []}
+        client.call_api.return_value = {
+            "message": {"content": "Timed"},
+            "total_duration": 1_000_000,
+            "eval_count": 10,
+            "eval_duration": 500_000,
+        }
+
+        run_git_camus(timings="json")
+
+        report = json.loads(mock_echo.call_args.args[0])
+        assert list(report["phases"]) == ["git", "health", "prompt", "ollama", "commit"]
+        assert report["ollama"]["eval_count"] == 10
+        assert mock_echo.call_args.kwargs == {"err": True}
+        record, = RunLog.for_user().records()
+        assert record["model"] == "llama3.2"
+        assert record["eval_count"] == 10
+        assert record["message_bytes"] == len("Timed")
+
+
+class TestCallWithContext:
+    """Test call_with_context function."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.client = Mock()
+        self.client.call_api.return_value = {"message": {"content": "msg"}, "context": [7, 8]}
+        self.request_data = {
+            "model": "llama3.2",
+            "messages": [
+                {"role": "system", "content": "instructions"},
+                {"role": "user", "content": "diff"},
+            ],
+            "stream": False,
+            "options": {},
+        }
+        self.deadline = Deadline()
+
+    @patch("git_camus.cli.commands.get_index_tree", return_value="tree1")
+    @patch("git_camus.cli.commands.MessageCache.for_repository")
+    def test_first_call_starts_conversation(self, mock_for_repo, mock_tree):
+        """Test a tree without stored context sends the full request."""
+        cache = mock_for_repo.return_value
+        cache.get_context.return_value = None
+
+        call_with_context(self.client, self.request_data, "llama3.2", None, self.deadline)
+
+        self.client.call_api.assert_called_once_with(
+            self.request_data, deadline=self.deadline, context=[]
+        )
+        cache.put_context.assert_called_once_with("tree1", "llama3.2", [7, 8])
+
+    @patch("git_camus.cli.commands.get_index_tree", return_value="tree1")
+    @patch("git_camus.cli.commands.MessageCache.for_repository")
+    def test_follow_up_sends_only_instruction(self, mock_for_repo, mock_tree):
+        """Test a stored context replaces the diff with the follow-up."""
+        mock_for_repo.return_value.get_context.return_value = [1, 2]
+
+        call_with_context(self.client, self.request_data, "llama3.2", "Be brief", self.deadline)
+
+        request, = self.client.call_api.call_args.args
+        assert request["messages"] == [{"role": "user", "content": "Be brief"}]
+        assert self.client.call_api.call_args.kwargs["context"] == [1, 2]
+
+
+class TestFindExamples:
+    """Test find_examples function."""
+
+    @patch("git_camus.core.examples.ExampleIndex.for_repository")
+    def test_off_by_default(self, mock_for_repo):
+        """Test no index is opened unless few-shot examples are configured."""
+        assert find_examples(Mock(), "diff", Deadline()) is None
+        mock_for_repo.assert_not_called()
+
+    @patch("git_camus.core.examples.ExampleIndex.for_repository")
+    def test_examples_found(self, mock_for_repo):
+        """Test the configured number of examples is searched with the embedding model."""
+        mock_for_repo.return_value.search.return_value = ["Roll the boulder"]
+        client, deadline = Mock(), Deadline()
+
+        with patch.object(settings, "run", replace(settings.run, few_shot=3)):
+            examples = find_examples(client, "diff", deadline)
+
+        assert examples == ["Roll the boulder"]
+        mock_for_repo.assert_called_once_with(settings.run.embedding_model)
+        mock_for_repo.return_value.search.assert_called_once_with(client, "diff", 3, deadline)
+
+    @patch("click.echo")
+    @patch("git_camus.core.examples.ExampleIndex.for_repository")
+    def test_embedding_error_skips_examples(self, mock_for_repo, mock_echo):
+        """Test a server without the embedding model still gets a request."""
+        mock_for_repo.return_value.search.side_effect = httpx.HTTPError("model not found")
+
+        with patch.object(settings, "run", replace(settings.run, few_shot=3)):
+            assert find_examples(Mock(), "diff", Deadline()) is None
+
+        mock_echo.assert_called_once_with(
+            "git-camus: no commit examples: model not found", err=True
+        )
+
+    @patch("click.echo")
+    @patch("git_camus.core.examples.ExampleIndex.for_repository")
+    def test_deadline_skips_examples(self, mock_for_repo, mock_echo):
+        """Test running out of time looking for examples still gets a request."""
+        mock_for_repo.return_value.search.side_effect = DeadlineExceeded(
+            "deadline of 1s exceeded"
+        )
+
+        with patch.object(settings, "run", replace(settings.run, few_shot=3)):
+            assert find_examples(Mock(), "diff", Deadline(1.0)) is None
+
+        mock_echo.assert_called_once_with(
+            "git-camus: no commit examples: deadline of 1s exceeded", err=True
+        )
+
+
+@patch("git_camus.cli.commands.get_tree_diff", return_value="+hill")
+@patch("git_camus.cli.commands.get_index_tree", return_value="tree2")
+@patch("git_camus.cli.commands.get_head", return_value="head")
+@patch("git_camus.cli.commands.MessageCache.for_repository")
+class TestFindRevision:
+    """Test find_revision function."""
+
+    @pytest.fixture(autouse=True)
+    def revise_preview(self):
+        """Turn revising previews on."""
+        with patch.object(settings, "run", replace(settings.run, revise_preview=True)):
+            yield
+
+    def test_revises_preview(self, mock_for_repo, mock_head, mock_tree, mock_tree_diff):
+        """Test the previewed message is revised with the diff staged since."""
+        mock_for_repo.return_value.get_preview.return_value = ("tree1", "Roll the boulder")
+
+        assert find_revision("+boulder\n+hill", "llama3.2") == ("Roll the boulder", "+hill")
+
+        mock_for_repo.return_value.get_preview.assert_called_once_with("head", "llama3.2")
+        mock_tree_diff.assert_called_once_with("tree1", "tree2")
+
+    def test_no_preview(self, mock_for_repo, mock_head, mock_tree, mock_tree_diff):
+        """Test there is nothing to revise without a preview on the current commit."""
+        mock_for_repo.return_value.get_preview.return_value = None
+
+        assert find_revision("+boulder\n+hill", "llama3.2") is None
+        mock_tree.assert_not_called()
+
+    def test_same_tree(self, mock_for_repo, mock_head, mock_tree, mock_tree_diff):
+        """Test nothing is revised when nothing was staged since the preview."""
+        mock_for_repo.return_value.get_preview.return_value = ("tree2", "Roll the boulder")
+
+        assert find_revision("+boulder\n+hill", "llama3.2") is None
+        mock_tree_diff.assert_not_called()
+
+    def test_delta_not_smaller(self, mock_for_repo, mock_head, mock_tree, mock_tree_diff):
+        """Test the full diff is used when the changes since the preview are no smaller."""
+        mock_for_repo.return_value.get_preview.return_value = ("tree1", "Roll the boulder")
+
+        assert find_revision("+hill", "llama3.2") is None
+
+    def test_off(self, mock_for_repo, *_):
+        """Test previews are not revised unless turned on."""
+        run = replace(settings.run, revise_preview=RunConfig().revise_preview)
+        with patch.object(settings, "run", run):
+            assert find_revision("+boulder\n+hill", "llama3.2") is None
+
+        mock_for_repo.assert_not_called()
+
+
+class TestReadHistory:
+    """Test read_history function."""
+
+    @patch("git_camus.cli.commands.HistoryCache.for_repository")
+    def test_off_by_default(self, mock_for_repo):
+        """Test the history is not read unless configured."""
+        assert read_history() is None
+        mock_for_repo.assert_not_called()
+
+    @patch("git_camus.cli.commands.HistoryCache.for_repository")
+    def test_configured_subjects(self, mock_for_repo):
+        """Test the configured number of subjects is read from the cache."""
+        mock_for_repo.return_value.subjects.return_value = ["Roll the boulder"]
+
+        with patch.object(settings, "run", replace(settings.run, history=10)):
+            assert read_history() == ["Roll the boulder"]
+
+        mock_for_repo.return_value.subjects.assert_called_once_with(10)
+
+
+class TestRegenerateIfRepeated:
+    """Test regenerate_if_repeated function."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.client = Mock()
+        self.request_data = {
+            "model": "llama3.2",
+            "messages": [{"role": "user", "content": "diff"}],
+            "stream": False,
+            "options": {},
+        }
+        self.deadline = Deadline()
+
+    @pytest.fixture(autouse=True)
+    def repeat_threshold(self):
+        """Turn the check for repeated wording on."""
+        with patch.object(settings, "run", replace(settings.run, repeat_threshold=0.5)):
+            yield
+
+    @pytest.fixture
+    def recent(self, tmp_path):
+        """Remember one message."""
+        recent = RecentMessages(str(tmp_path / "recent.json"))
+        with patch("git_camus.core.similarity.read_recent_messages", return_value=[]):
+            recent.add("Sisyphus pushes the boulder up the hill once more")
+        return recent
+
+    def test_new_message_kept(self, recent):
+        """Test a message unlike the recent ones is used as is."""
+        response = {"message": {"content": "Meursault shoots a man on the beach"}}
+
+        assert regenerate_if_repeated(
+            self.client, self.request_data, response, recent, self.deadline
+        ) is response
+        self.client.call_api.assert_not_called()
+
+    def test_repeated_message_regenerated(self, recent):
+        """Test a repeat is generated again with the repeated message quoted."""
+        response = {"message": {"content": "Sisyphus pushes the boulder up the hill once again"}}
+        self.client.call_api.return_value = {"message": {"content": "The rock is his thing"}}
+
+        result = regenerate_if_repeated(
+            self.client, self.request_data, response, recent, self.deadline
+        )
+
+        assert result == {"message": {"content": "The rock is his thing"}}
+        retry, = self.client.call_api.call_args.args
+        assert retry["messages"][1] == {
+            "role": "assistant",
+            "content": "Sisyphus pushes the boulder up the hill once again",
+        }
+        assert "Sisyphus pushes the boulder up the hill once more" in retry["messages"][2]["content"]
+        assert self.request_data["messages"] == [{"role": "user", "content": "diff"}]
+
+    def test_off_by_default(self, recent):
+        """Test a repeat is kept as is unless a threshold is configured."""
+        response = {"message": {"content": "Sisyphus pushes the boulder up the hill once again"}}
+
+        run = replace(settings.run, repeat_threshold=RunConfig().repeat_threshold)
+        with patch.object(settings, "run", run):
+            assert regenerate_if_repeated(
+                self.client, self.request_data, response, recent, self.deadline
+            ) is response
+        self.client.call_api.assert_not_called()
+
+    def test_repeat_by_meaning(self, recent):
+        """Test embeddings catch a repeat in other words when configured."""
+        response = {"message": {"content": "Up goes the stone, forever"}}
+        self.client.embed.return_value = [[1.0, 0.0], [0.9, 0.1]]
+        self.client.call_api.return_value = {"message": {"content": "Fresh"}}
+
+        with patch.object(settings, "run", replace(settings.run, repeat_embedding_threshold=0.9)):
+            result = regenerate_if_repeated(
+                self.client, self.request_data, response, recent, self.deadline
+            )
+
+        assert result["message"]["content"] == "Fresh"
+        assert self.client.embed.call_args.args[0] == settings.run.embedding_model
+
+    @patch("git_camus.cli.commands.check_git_repository")
+    @patch("git_camus.cli.commands.get_git_status", return_value="M  file.txt")
+    @patch("git_camus.cli.commands.get_git_diff", return_value="diff content")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.OllamaClient")
+    @patch("git_camus.cli.commands.perform_git_commit")
+    def test_committed_message_remembered(
+        self,
+        mock_commit,
+        mock_ollama_client,
+        mock_config,
+        mock_diff,
+        mock_status,
+        mock_check_repo,
+        recent,
+        recent_messages,
+    ):
+        """Test the committed message is remembered for the next check."""
+        recent_messages.return_value = recent
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        client = mock_ollama_client.return_value
+        client.generate_commit_message_request.return_value = {"messages": []}
+        client.call_api.return_value = {"message": {"content": "Meursault on the beach"}}
+
+        run_git_camus()
+
+        mock_commit.assert_called_once_with("Meursault on the beach")
+        assert recent.messages()[-1] == "Meursault on the beach"
+
+
+@patch("git_camus.cli.commands.check_git_repository")
+@patch(
+    "git_camus.cli.commands.get_git_status",
+    return_value="M  hill/boulder.txt\nM  sea/beach.txt\n",
+)
+@patch("git_camus.cli.commands.get_config_values")
+@patch("git_camus.cli.commands.split_staged_changes")
+@patch("git_camus.cli.commands.make_client")
+class TestRunSplit:
+    """Test run_split function."""
+
+    groups = [
+        ChangeGroup(["hill/boulder.txt"], "+the boulder rolls"),
+        ChangeGroup(["sea/beach.txt"], "+the sun burns"),
+    ]
+
+    def generate(self, client):
+        """Make the client answer each group with a message naming its diff."""
+        client.generate_commit_message_request.side_effect = (
+            lambda diff, status, *args, **kwargs: {"messages": [], "diff": diff, "status": status}
+        )
+        client.call_api.side_effect = lambda request, deadline: {
+            "message": {"content": f"Of {request['diff']} ({request['status'].strip()})"}
+        }
+
+    @patch("git_camus.cli.commands.can_commit_with_plumbing", return_value=True)
+    @patch("git_camus.cli.commands.commit_groups")
+    def test_commits_every_group(
+        self, mock_commit_groups, mock_plumbing, mock_make_client, mock_split, mock_config, *_
+    ):
+        """Test each group gets a message from its own diff and status, then its commit."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        mock_split.return_value = self.groups
+        self.generate(mock_make_client.return_value)
+        mock_commit_groups.return_value = ["a" * 40, "b" * 40]
+
+        run_split()
+
+        mock_commit_groups.assert_called_once_with(
+            self.groups,
+            [
+                "Of +the boulder rolls (M  hill/boulder.txt)",
+                "Of +the sun burns (M  sea/beach.txt)",
+            ],
+        )
+
+    @patch("git_camus.cli.commands.commit_groups")
+    def test_show(self, mock_commit_groups, mock_make_client, mock_split, mock_config, *_):
+        """Test the groups and their messages are shown without committing."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        mock_split.return_value = self.groups
+        self.generate(mock_make_client.return_value)
+
+        with patch("click.echo") as mock_echo:
+            run_split(show=True)
+
+        mock_commit_groups.assert_not_called()
+        mock_echo.assert_any_call("# sea/beach.txt\nOf +the sun burns (M  sea/beach.txt)\n")
+
+    @patch("git_camus.cli.commands.commit_groups")
+    def test_unavailable_uses_local_messages(
+        self, mock_commit_groups, mock_make_client, mock_split, mock_config, *_
+    ):
+        """Test every group gets a local message when Ollama is down."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        mock_split.return_value = self.groups
+        mock_make_client.return_value.is_available.return_value = False
+
+        run_split(show=True)
+
+        mock_make_client.return_value.call_api.assert_not_called()
+
+    @patch("git_camus.cli.commands.run_git_camus")
+    def test_single_group_commits_together(
+        self, mock_run, mock_make_client, mock_split, mock_config, *_
+    ):
+        """Test related changes are committed as usual."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        mock_split.return_value = self.groups[:1]
+
+        run_split(deadline=2.0)
+
+        mock_run.assert_called_once_with(
+            show=False, message=None, deadline=2.0, latency=None, timings=None
+        )
+        mock_make_client.assert_not_called()
+
+    @patch("git_camus.cli.commands.run_git_camus")
+    def test_single_group_show_message(
+        self, mock_run, mock_make_client, mock_split, mock_config, *_
+    ):
+        """Test a preview of related changes does not claim to commit them."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        mock_split.return_value = self.groups[:1]
+
+        with patch("click.echo") as mock_echo:
+            run_split(show=True)
+
+        mock_echo.assert_called_once_with(
+            "The staged changes are all related; showing one message for them.", err=True
+        )
+
+    @patch("git_camus.cli.commands.commit_groups")
+    def test_timings(self, mock_commit_groups, mock_make_client, mock_split, mock_config, *_):
+        """Test the phases of a split are timed when asked for."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        mock_split.return_value = self.groups
+        self.generate(mock_make_client.return_value)
+
+        with patch("click.echo") as mock_echo:
+            run_split(show=True, timings="json")
+
+        timings = json.loads(mock_echo.call_args.args[0])
+        assert set(timings["phases"]) == {"git", "health", "ollama", "commit"}
+
+    @patch("git_camus.cli.commands.can_commit_with_plumbing", return_value=False)
+    @patch("git_camus.cli.commands.run_git_camus")
+    def test_hooks_commit_together(
+        self, mock_run, mock_plumbing, mock_make_client, mock_split, mock_config, *_
+    ):
+        """Test the changes are committed together, with the hooks, when hooks are installed."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        mock_split.return_value = self.groups
+
+        run_split()
+
+        mock_run.assert_called_once()
+        mock_make_client.assert_not_called()
+
 
 class TestCliCommands:
     """Test CLI command interface."""
@@ -154,7 +1094,14 @@ class TestCliCommands:
         result = self.runner.invoke(main, [])
 
         assert result.exit_code == 0
-        mock_run.assert_called_once_with(show=False, message=None)
+        mock_run.assert_called_once_with(
+            show=False,
+            message=None,
+            deadline=None,
+            interactive=False,
+            latency=None,
+            timings=None,
+        )
 
     @patch("git_camus.cli.commands.run_git_camus")
     def test_main_command_with_show(self, mock_run):
@@ -162,7 +1109,31 @@ class TestCliCommands:
         result = self.runner.invoke(main, ["--show"])
 
         assert result.exit_code == 0
-        mock_run.assert_called_once_with(show=True, message=None)
+        mock_run.assert_called_once_with(
+            show=True,
+            message=None,
+            deadline=None,
+            interactive=False,
+            latency=None,
+            timings=None,
+        )
+
+    @patch("git_camus.cli.commands.run_git_camus")
+    def test_main_command_with_message_file(self, mock_run):
+        """Test the original message can be read from stdin instead of argv."""
+        result = self.runner.invoke(main, ["-F", "-"], input="Subject\n\n- long body\n")
+
+        assert result.exit_code == 0
+        assert mock_run.call_args.kwargs["message"] == "Subject\n\n- long body\n"
+
+    @patch("git_camus.cli.commands.run_git_camus")
+    def test_main_command_with_message_and_message_file(self, mock_run):
+        """Test the original message is taken from one place only."""
+        result = self.runner.invoke(main, ["-m", "inline", "-F", "-"], input="piped")
+
+        assert result.exit_code == 2
+        assert "cannot be used together" in result.output
+        mock_run.assert_not_called()
 
     @patch("git_camus.cli.commands.run_git_camus")
     def test_main_command_with_message(self, mock_run):
@@ -170,7 +1141,14 @@ class TestCliCommands:
         result = self.runner.invoke(main, ["--message", "test message"])
 
         assert result.exit_code == 0
-        mock_run.assert_called_once_with(show=False, message="test message")
+        mock_run.assert_called_once_with(
+            show=False,
+            message="test message",
+            deadline=None,
+            interactive=False,
+            latency=None,
+            timings=None,
+        )
 
     @patch("git_camus.cli.commands.run_git_camus")
     def test_main_command_with_both_options(self, mock_run):
@@ -178,4 +1156,305 @@ class TestCliCommands:
         result = self.runner.invoke(main, ["-s", "-m", "test message"])
 
         assert result.exit_code == 0
-        mock_run.assert_called_once_with(show=True, message="test message")
+        mock_run.assert_called_once_with(
+            show=True,
+            message="test message",
+            deadline=None,
+            interactive=False,
+            latency=None,
+            timings=None,
+        )
+
+    @patch("git_camus.cli.commands.run_git_camus")
+    def test_main_command_with_deadline(self, mock_run):
+        """Test main command with a deadline."""
+        result = self.runner.invoke(main, ["--deadline", "1.5"])
+
+        assert result.exit_code == 0
+        mock_run.assert_called_once_with(
+            show=False,
+            message=None,
+            deadline=1.5,
+            interactive=False,
+            latency=None,
+            timings=None,
+        )
+
+    def test_main_command_flags_override_settings(self, monkeypatch):
+        """Test --model, --host and --latency beat the environment for the whole run."""
+        monkeypatch.setenv("OLLAMA_HOST", "http://env:11434")
+        monkeypatch.setenv("OLLAMA_MODEL", "env-model")
+        seen = {}
+
+        def run(**kwargs):
+            seen["config"] = get_config_values()
+            seen["profile"] = settings.run.latency_profile
+            seen["deadline"] = settings.run.deadline
+
+        with patch("git_camus.cli.commands.run_git_camus", side_effect=run):
+            result = self.runner.invoke(
+                main,
+                [
+                    "--model", "qwen2.5:0.5b",
+                    "--host", "http://gpu-a:11434",
+                    "--latency", "fast",
+                    "--deadline", "2",
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        assert seen["config"][:2] == ("http://gpu-a:11434", "qwen2.5:0.5b")
+        assert seen["profile"] == "fast"
+        assert seen["deadline"] == 2.0
+        assert settings.overrides == {}
+        assert get_config_values()[:2] == ("http://env:11434", "env-model")
+
+    @patch("git_camus.cli.commands.run_git_camus")
+    def test_main_command_with_latency(self, mock_run):
+        """Test main command with a latency profile."""
+        result = self.runner.invoke(main, ["--latency", "fast"])
+
+        assert result.exit_code == 0
+        mock_run.assert_called_once_with(
+            show=False,
+            message=None,
+            deadline=None,
+            interactive=False,
+            latency="fast",
+            timings=None,
+        )
+
+    @patch("git_camus.cli.commands.run_git_camus")
+    def test_main_command_with_timings(self, mock_run):
+        """Test the timings flag defaults to text and accepts json."""
+        self.runner.invoke(main, ["--timings"])
+        self.runner.invoke(main, ["--timings", "json"])
+
+        assert [c.kwargs["timings"] for c in mock_run.call_args_list] == ["text", "json"]
+
+    @patch("git_camus.cli.commands.run_git_camus")
+    def test_main_command_interactive(self, mock_run):
+        """Test main command with the interactive flag."""
+        result = self.runner.invoke(main, ["-s", "-i"])
+
+        assert result.exit_code == 0
+        mock_run.assert_called_once_with(
+            show=True,
+            message=None,
+            deadline=None,
+            interactive=True,
+            latency=None,
+            timings=None,
+        )
+
+    @patch("git_camus.cli.commands.run_split")
+    @patch("git_camus.cli.commands.run_git_camus")
+    def test_main_command_split(self, mock_run, mock_split):
+        """Test the split flag runs a split instead of a single commit."""
+        result = self.runner.invoke(main, ["--split", "-s", "--latency", "fast"])
+
+        assert result.exit_code == 0
+        mock_split.assert_called_once_with(
+            show=True, message=None, deadline=None, latency="fast", timings=None
+        )
+        mock_run.assert_not_called()
+
+    @patch("git_camus.cli.commands.run_split")
+    def test_main_command_split_interactive(self, mock_split):
+        """Test splitting cannot be combined with interactive refinement."""
+        result = self.runner.invoke(main, ["--split", "-i"])
+
+        assert result.exit_code == 2
+        mock_split.assert_not_called()
+
+    @patch("git_camus.cli.commands.run_git_camus")
+    def test_main_command_with_profile(self, mock_run, tmp_path):
+        """Test the profile option writes a pstats file and a summary."""
+        profile_file = tmp_path / "run.prof"
+
+        result = self.runner.invoke(main, ["--profile", str(profile_file), "--profile-memory"])
+
+        assert result.exit_code == 0
+        mock_run.assert_called_once()
+        assert profile_file.exists()
+        assert "Peak memory" in (tmp_path / "run.prof.txt").read_text()
+
+    @patch("git_camus.cli.commands.make_client")
+    @patch("git_camus.cli.commands.get_config_values")
+    def test_warm_command(self, mock_config, mock_make_client):
+        """Test the warm command loads the model on every host."""
+        mock_config.return_value = ("http://a:11434,http://b:11434", "llama3.2", "prompt")
+        client = mock_make_client.return_value
+        client.hosts = ["http://a:11434", "http://b:11434"]
+
+        result = self.runner.invoke(main, ["warm", "--model", "qwen2.5:0.5b"])
+
+        assert result.exit_code == 0
+        client.warm.assert_any_call("qwen2.5:0.5b", "http://a:11434")
+        client.warm.assert_any_call("qwen2.5:0.5b", "http://b:11434")
+        assert "Loaded qwen2.5:0.5b on http://b:11434" in result.output
+
+    @patch("git_camus.cli.commands.make_client")
+    @patch("git_camus.cli.commands.get_config_values")
+    def test_warm_command_failure(self, mock_config, mock_make_client):
+        """Test the warm command fails when no host could load the model."""
+        mock_config.return_value = ("http://a:11434", "llama3.2", "prompt")
+        client = mock_make_client.return_value
+        client.hosts = ["http://a:11434"]
+        client.warm.side_effect = httpx.ConnectError("Connection refused")
+
+        result = self.runner.invoke(main, ["warm"])
+
+        assert result.exit_code == 1
+
+    def test_stats_command(self):
+        """Test the stats command reports recorded runs per model."""
+        log = RunLog.for_user()
+        for duration in (1.0, 2.0, 3.0):
+            log.append(
+                {
+                    "ts": time.time(),
+                    "model": "llama3.2",
+                    "duration": duration,
+                    "cache_hit": duration > 1.0,
+                    "eval_count": 20,
+                    "eval_seconds": 1.0,
+                }
+            )
+
+        result = self.runner.invoke(main, ["stats"])
+        report = json.loads(self.runner.invoke(main, ["stats", "--json"]).output)
+
+        assert result.exit_code == 0
+        assert result.output.splitlines()[1].startswith("llama3.2")
+        assert report["llama3.2"]["runs"] == 3
+        assert report["llama3.2"]["cache_hit_rate"] == 2 / 3
+        assert report["llama3.2"]["tokens_per_second"] == 20.0
+        assert report["llama3.2"]["p50"] == pytest.approx(2.0, rel=0.02)
+
+    def test_stats_command_window(self):
+        """Test runs outside the window are left out."""
+        RunLog.for_user().append({"ts": time.time() - 10 * 86400, "model": "llama3.2"})
+
+        result = self.runner.invoke(main, ["stats", "--days", "7"])
+
+        assert "No runs recorded" in result.output
+
+    def test_trace_option(self, tmp_path):
+        """Test --trace exports a root span for the command."""
+        trace_file = tmp_path / "trace.jsonl"
+        try:
+            result = self.runner.invoke(main, ["--trace", str(trace_file), "stats"])
+        finally:
+            tracing.configure(None)
+
+        assert result.exit_code == 0
+        request = json.loads(trace_file.read_text().splitlines()[0])
+        spans = request["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert [span["name"] for span in spans] == ["git-camus stats"]
+
+    def test_config_check(self, tmp_path, monkeypatch):
+        """Test config check lists the files and fails on problems."""
+        (tmp_path / "git-camus").mkdir()
+        user_file = tmp_path / "git-camus" / "config.toml"
+        user_file.write_text('[run]\nmodel_name = "llama3.2:1b"\n')
+        monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+
+        result = self.runner.invoke(main, ["config", "check"])
+
+        assert result.exit_code == 0
+        assert f"Checked {user_file}" in result.output
+        assert "Configuration OK" in result.output
+
+        user_file.write_text("[run]\nmodel = 1\n")
+        result = self.runner.invoke(main, ["config", "check"])
+
+        assert result.exit_code == 1
+        assert "run.model" in result.output
+
+    @patch("git_camus.cli.commands.make_client")
+    @patch("git_camus.cli.commands.get_config_values")
+    def test_model_build(self, mock_config, mock_make_client):
+        """Test building the derived model on every host."""
+        mock_config.return_value = ("http://a:11434,http://b:11434", "llama3.2", "prompt")
+        client = mock_make_client.return_value
+        client.hosts = ["http://a:11434", "http://b:11434"]
+
+        result = self.runner.invoke(main, ["model", "build", "--from", "qwen2.5:0.5b"])
+
+        assert result.exit_code == 0
+        for host in client.hosts:
+            client.create_model.assert_any_call(
+                "git-camus",
+                "qwen2.5:0.5b",
+                settings.run.system_prompt,
+                settings.run.derived_parameters,
+                host,
+            )
+        assert "Set run.derived_model to git-camus" in result.output
+
+    @patch("git_camus.cli.commands.make_client")
+    @patch("git_camus.cli.commands.get_config_values")
+    def test_model_build_failure(self, mock_config, mock_make_client):
+        """Test the build fails when no host could create the model."""
+        mock_config.return_value = ("http://a:11434", "llama3.2", "prompt")
+        client = mock_make_client.return_value
+        client.hosts = ["http://a:11434"]
+        client.create_model.side_effect = httpx.HTTPStatusError(
+            "Not found", request=Mock(), response=Mock()
+        )
+
+        result = self.runner.invoke(main, ["model", "build"])
+
+        assert result.exit_code == 1
+
+    @patch("git_camus.cli.commands.install_hook")
+    def test_hook_install(self, mock_install):
+        """Test installing the prepare-commit-msg hook."""
+        mock_install.return_value = "/repo/.git/hooks/prepare-commit-msg"
+
+        result = self.runner.invoke(main, ["hook", "install", "--force"])
+
+        assert result.exit_code == 0
+        mock_install.assert_called_once_with(force=True)
+        assert "/repo/.git/hooks/prepare-commit-msg" in result.output
+
+    @patch("git_camus.cli.commands.run_git_camus")
+    @patch("git_camus.cli.commands.make_client")
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.prepare_commit_msg")
+    def test_hook_run(self, mock_prepare, mock_config, mock_make_client, mock_run):
+        """Test running as the prepare-commit-msg hook."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+
+        result = self.runner.invoke(
+            main, ["hook", "run", "COMMIT_EDITMSG", "template", "--deadline", "2.5"]
+        )
+
+        assert result.exit_code == 0
+        mock_run.assert_not_called()
+        mock_make_client.assert_called_once_with("http://localhost:11434")
+        mock_prepare.assert_called_once_with(
+            "COMMIT_EDITMSG",
+            "template",
+            mock_make_client.return_value,
+            "llama3.2",
+            "prompt",
+            2.5,
+            system_prompt=settings.run.system_prompt,
+            profile=settings.profiles["balanced"],
+            router=None,
+            run_log=ANY,
+            body_min_files=None,
+        )
+
+    @patch("git_camus.cli.commands.get_config_values")
+    @patch("git_camus.cli.commands.prepare_commit_msg")
+    def test_hook_run_never_fails_the_commit(self, mock_prepare, mock_config):
+        """Test hook errors are reported without a failing exit code."""
+        mock_config.return_value = ("http://localhost:11434", "llama3.2", "prompt")
+        mock_prepare.side_effect = RuntimeError("boom")
+
+        result = self.runner.invoke(main, ["hook", "run", "COMMIT_EDITMSG"])
+
+        assert result.exit_code == 0
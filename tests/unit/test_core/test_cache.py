@@ -0,0 +1,110 @@
+"""Tests for message cache module."""
+
+from unittest.mock import patch
+
+from git_camus.core.cache import MessageCache
+
+
+class TestMessageCache:
+    """Test MessageCache class."""
+
+    def test_get_miss(self, tmp_path):
+        """Test lookups in an empty cache miss."""
+        cache = MessageCache(str(tmp_path / "messages.json"))
+
+        assert cache.get("abc123", "llama3.2") is None
+
+    def test_put_and_get(self, tmp_path):
+        """Test a stored message is returned for the same tree and model."""
+        cache = MessageCache(str(tmp_path / "camus" / "messages.json"))
+
+        cache.put("abc123", "llama3.2", "One must imagine Sisyphus happy")
+
+        assert cache.get("abc123", "llama3.2") == "One must imagine Sisyphus happy"
+        assert cache.get("abc123", "other-model") is None
+        assert cache.get("def456", "llama3.2") is None
+
+    def test_fallback_messages_not_served(self, tmp_path):
+        """Test messages from the local fallback are recorded but not reused."""
+        cache = MessageCache(str(tmp_path / "messages.json"))
+
+        cache.put("abc123", "llama3.2", "Roll the boulder", fallback=True)
+
+        assert cache.get("abc123", "llama3.2") is None
+        assert '"fallback": true' in (tmp_path / "messages.json").read_text()
+
+    def test_put_ignores_empty_tree(self, tmp_path):
+        """Test nothing is cached without a tree id."""
+        cache = MessageCache(str(tmp_path / "messages.json"))
+
+        cache.put("", "llama3.2", "message")
+
+        assert not (tmp_path / "messages.json").exists()
+
+    def test_oldest_entries_evicted(self, tmp_path):
+        """Test the cache keeps only the most recent entries."""
+        cache = MessageCache(str(tmp_path / "messages.json"), max_entries=2)
+
+        cache.put("tree1", "llama3.2", "first")
+        cache.put("tree2", "llama3.2", "second")
+        cache.put("tree3", "llama3.2", "third")
+
+        assert cache.get("tree1", "llama3.2") is None
+        assert cache.get("tree2", "llama3.2") == "second"
+        assert cache.get("tree3", "llama3.2") == "third"
+
+    def test_context_round_trip(self, tmp_path):
+        """Test the latest context is kept for its tree and model only."""
+        cache = MessageCache(str(tmp_path / "messages.json"))
+
+        cache.put_context("abc123", "llama3.2", [1, 2, 3])
+
+        assert cache.get_context("abc123", "llama3.2") == [1, 2, 3]
+        assert cache.get_context("def456", "llama3.2") is None
+        assert cache.get_context("abc123", "mistral") is None
+
+    def test_context_only_latest_kept(self, tmp_path):
+        """Test storing a context replaces the previous one."""
+        cache = MessageCache(str(tmp_path / "messages.json"))
+
+        cache.put_context("abc123", "llama3.2", [1, 2, 3])
+        cache.put_context("def456", "llama3.2", [4, 5])
+
+        assert cache.get_context("abc123", "llama3.2") is None
+        assert cache.get_context("def456", "llama3.2") == [4, 5]
+
+    def test_corrupt_file_is_a_miss(self, tmp_path):
+        """Test a corrupt cache file is treated as empty."""
+        path = tmp_path / "messages.json"
+        path.write_text("{not json")
+        cache = MessageCache(str(path))
+
+        assert cache.get("abc123", "llama3.2") is None
+
+    def test_preview_round_trip(self, tmp_path):
+        """Test only the latest preview is kept, for its commit and model."""
+        cache = MessageCache(str(tmp_path / "messages.json"))
+
+        cache.put_preview("head1", "tree1", "llama3.2", "Roll the boulder")
+        cache.put_preview("head1", "tree2", "llama3.2", "Climb the hill")
+
+        assert cache.get_preview("head1", "llama3.2") == ("tree2", "Climb the hill")
+        assert cache.get_preview("head2", "llama3.2") is None
+        assert cache.get_preview("head1", "other-model") is None
+
+    @patch("git_camus.core.cache.get_git_dir")
+    def test_for_repository(self, mock_git_dir):
+        """Test the cache lives in the git directory."""
+        mock_git_dir.return_value = "/repo/.git"
+
+        cache = MessageCache.for_repository()
+
+        assert cache is not None
+        assert cache.path == "/repo/.git/camus/messages.json"
+
+    @patch("git_camus.core.cache.get_git_dir")
+    def test_for_repository_outside_repo(self, mock_git_dir):
+        """Test no cache is available outside a repository."""
+        mock_git_dir.return_value = ""
+
+        assert MessageCache.for_repository() is None
@@ -1,9 +1,22 @@
 """Tests for configuration module."""
 
+import dataclasses
 import os
 from unittest.mock import patch
 
-from git_camus.core.config import get_config_values, settings
+import pytest
+
+from git_camus.core import config
+from git_camus.core.config import (
+    LazySettings,
+    deep_merge,
+    find_repo_config,
+    get_config_values,
+    load_settings,
+    read_config_files,
+    read_toml,
+    settings,
+)
 
 
 class TestGetConfigValues:
@@ -16,7 +29,7 @@ class TestGetConfigValues:
 
             assert host == "http://localhost:11434"
             assert model == "llama3.2"
-            assert "Albert Camus" in prompt
+            assert prompt.endswith("{diff}")
 
     def test_get_config_values_with_env_vars(self):
         """Test configuration with environment variables."""
@@ -30,7 +43,7 @@ class TestGetConfigValues:
 
             assert host == "http://test:8080"
             assert model == "test-model"
-            assert "Albert Camus" in prompt
+            assert prompt.endswith("{diff}")
 
     def test_get_config_values_with_settings(self):
         """Test configuration with settings override."""
@@ -75,7 +88,7 @@ class TestGetConfigValues:
 
                 assert host == "http://localhost:11434"
                 assert model == "llama3.2"
-                assert "Albert Camus" in prompt
+                assert prompt.endswith("{diff}")
 
 
 class TestSettings:
@@ -85,5 +98,126 @@ class TestSettings:
         """Test default settings values."""
         assert settings.ollama.host == "http://localhost:11434"
         assert settings.run.model_name == "llama3.2"
-        assert "Albert Camus" in settings.run.prompt_message
+        assert "Albert Camus" in settings.run.system_prompt
+        assert "Albert Camus" not in settings.run.prompt_message
+        assert settings.run.prompt_message.endswith("{diff}")
         assert settings.api.prefix == "/api"
+
+    def test_settings_built_on_first_use(self):
+        """Test the settings are only built when a value is read."""
+        lazy = LazySettings()
+        assert lazy._settings is None
+
+        with patch.dict(os.environ, {"OLLAMA": '{"host": "http://env:1234"}'}):
+            assert lazy.ollama.host == "http://env:1234"
+        assert lazy._settings is not None
+
+    def test_settings_are_frozen(self):
+        """Test the shared settings cannot be changed in place."""
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            settings.run.deadline = 0.1
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            settings.profiles["fast"].num_predict = 1
+
+    def test_schema_names(self):
+        """Test the schema classes are served from the config module."""
+        assert config.LatencyProfile().num_predict == 64
+        assert "balanced" in config.DEFAULT_PROFILES
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    """Work in a repository subdirectory with a user configuration directory."""
+    (tmp_path / "repo" / ".git").mkdir(parents=True)
+    (tmp_path / "repo" / "src").mkdir()
+    (tmp_path / "config" / "git-camus").mkdir(parents=True)
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.chdir(tmp_path / "repo" / "src")
+    return tmp_path
+
+
+class TestConfigFiles:
+    """Test the layered configuration files."""
+
+    def test_find_repo_config(self, repository):
+        """Test the repository file is found from a subdirectory."""
+        assert find_repo_config() is None
+
+        (repository / "repo" / ".git-camus.toml").write_text("")
+
+        assert find_repo_config() == str(repository / "repo" / ".git-camus.toml")
+
+    def test_search_stops_at_repository(self, repository):
+        """Test a file above the repository does not apply."""
+        (repository / ".git-camus.toml").write_text("")
+
+        assert find_repo_config() is None
+
+    def test_layers(self, repository, monkeypatch):
+        """Test the repository file beats the user file and the environment beats both."""
+        (repository / "config" / "git-camus" / "config.toml").write_text(
+            '[run]\nmodel_name = "user-model"\nlatency_profile = "quality"\n'
+            '[ollama]\nhost = "http://user:11434"\n'
+        )
+        (repository / "repo" / ".git-camus.toml").write_text(
+            '[run]\nmodel_name = "repo-model"\n[profiles.fast]\nnum_predict = 32\n'
+        )
+        monkeypatch.setenv("OLLAMA", '{"host": "http://env:11434"}')
+
+        resolved = load_settings()
+
+        assert resolved.run.model_name == "repo-model"
+        assert resolved.run.latency_profile == "quality"
+        assert resolved.ollama.host == "http://env:11434"
+        assert resolved.profiles["fast"].num_predict == 32
+        assert resolved.profiles["fast"].max_ctx == 2048
+        assert "quality" in resolved.profiles
+
+    def test_overrides_win(self, repository):
+        """Test overrides take precedence over the files."""
+        (repository / "repo" / ".git-camus.toml").write_text('[run]\ndeadline = 5.0\n')
+
+        assert load_settings(run={"deadline": 1.5}).run.deadline == 1.5
+
+    def test_values_converted_to_field_types(self, repository, capsys):
+        """Test values are read as their fields' types, and bad ones keep the default."""
+        (repository / "repo" / ".git-camus.toml").write_text(
+            '[run]\ndeadline = "5"\nhistory = "3"\nrecord_stats = "false"\n'
+            'few_shot = "several"\n[ollama]\nhedge = 1\n'
+        )
+
+        resolved = load_settings()
+
+        assert resolved.run.deadline == 5.0
+        assert resolved.run.history == 3
+        assert resolved.run.record_stats is False
+        assert resolved.run.few_shot == 0
+        assert resolved.ollama.hedge is True
+        assert "ignoring run.few_shot: expected int" in capsys.readouterr().err
+
+    def test_invalid_file_is_skipped(self, repository, capsys):
+        """Test a broken file only warns."""
+        (repository / "repo" / ".git-camus.toml").write_text("[run\n")
+
+        assert read_config_files() == {}
+        assert "ignoring" in capsys.readouterr().err
+
+    def test_parsed_once_while_unchanged(self, repository):
+        """Test a file is only parsed again after it changed."""
+        path = repository / "repo" / ".git-camus.toml"
+        path.write_text('[run]\nmodel_name = "first"\n')
+
+        with patch("tomllib.load", wraps=__import__("tomllib").load) as mock_load:
+            assert read_toml(str(path)) is read_toml(str(path))
+            assert mock_load.call_count == 1
+
+            path.write_text('[run]\nmodel_name = "second one"\n')
+            assert read_toml(str(path))["run"]["model_name"] == "second one"
+            assert mock_load.call_count == 2
+
+    def test_deep_merge(self):
+        """Test nested values are merged rather than replaced."""
+        base = {"run": {"a": 1, "b": 2}, "x": 1}
+
+        assert deep_merge(base, {"run": {"b": 3}}) == {"run": {"a": 1, "b": 3}, "x": 1}
+        assert base == {"run": {"a": 1, "b": 2}, "x": 1}
@@ -0,0 +1,47 @@
+"""Tests for deadline module."""
+
+from unittest.mock import patch
+
+import pytest
+
+from git_camus.core.deadline import Deadline, DeadlineExceeded
+
+
+class TestDeadline:
+    """Test Deadline class."""
+
+    def test_unlimited(self):
+        """Test a deadline without a budget never expires."""
+        deadline = Deadline()
+
+        assert deadline.remaining() is None
+        assert not deadline.expired()
+        assert deadline.timeout(120.0) == 120.0
+        deadline.check()
+
+    @patch("git_camus.core.deadline.time.monotonic")
+    def test_remaining(self, mock_monotonic):
+        """Test the remaining budget shrinks with time."""
+        mock_monotonic.return_value = 100.0
+        deadline = Deadline(5.0)
+
+        mock_monotonic.return_value = 102.0
+
+        assert deadline.remaining() == 3.0
+        assert deadline.timeout(120.0) == 3.0
+        assert deadline.timeout(1.0) == 1.0
+
+    @patch("git_camus.core.deadline.time.monotonic")
+    def test_expired(self, mock_monotonic):
+        """Test an exhausted budget stops the run."""
+        mock_monotonic.return_value = 100.0
+        deadline = Deadline(5.0)
+
+        mock_monotonic.return_value = 106.0
+
+        assert deadline.remaining() == 0.0
+        assert deadline.expired()
+        with pytest.raises(DeadlineExceeded):
+            deadline.check()
+        with pytest.raises(DeadlineExceeded):
+            deadline.timeout(120.0)
@@ -0,0 +1,161 @@
+"""Tests for commit example index module."""
+
+import subprocess
+
+import numpy as np
+import pytest
+
+from git_camus.core.examples import ExampleIndex, normalize, read_commits
+from git_camus.core.ollama_client import OllamaClient
+from git_camus.tests.fake_ollama import FakeOllama
+
+
+def commit(path, name, content, message):
+    """Commit a file to the test repository."""
+    (path / name).write_text(content)
+    subprocess.run(["git", "add", name], cwd=path, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", message], cwd=path, check=True)
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    """Work in an empty git repository."""
+    for variable in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{variable}_NAME", "Sisyphus")
+        monkeypatch.setenv(f"GIT_{variable}_EMAIL", "sisyphus@example.com")
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestReadCommits:
+    """Test reading the history."""
+
+    def test_read_commits(self, repository):
+        """Test messages and diffs are read newest first."""
+        commit(repository, "stone.txt", "boulder\n", "Add the stone\n\nIt is heavy.")
+        commit(repository, "hill.txt", "slope\n", "Add the hill")
+
+        commits = read_commits()
+
+        assert [message for _, message, _ in commits] == [
+            "Add the hill",
+            "Add the stone\n\nIt is heavy.",
+        ]
+        assert "+slope" in commits[0][2]
+        assert "+boulder" in commits[1][2]
+
+    def test_read_commits_since(self, repository):
+        """Test only commits after the given one are read, with diffs cut short."""
+        commit(repository, "stone.txt", "boulder\n", "Add the stone")
+        first = subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()
+        commit(repository, "hill.txt", "slope\n" * 1000, "Add the hill")
+
+        commits = read_commits(first, diff_length=100)
+
+        assert [message for _, message, _ in commits] == ["Add the hill"]
+        assert len(commits[0][2]) == 100
+
+    def test_read_commits_unknown_since(self, repository):
+        """Test an unknown starting commit is an error."""
+        commit(repository, "stone.txt", "boulder\n", "Add the stone")
+
+        with pytest.raises(subprocess.CalledProcessError):
+            read_commits("0" * 40)
+
+
+class TestNormalize:
+    """Test vector normalization."""
+
+    def test_normalize(self):
+        """Test rows are scaled to unit length and zero rows left alone."""
+        np.testing.assert_allclose(normalize([[3, 4], [0, 0]]), [[0.6, 0.8], [0, 0]])
+
+
+class TestExampleIndex:
+    """Test ExampleIndex class."""
+
+    def test_nearest(self, tmp_path):
+        """Test the most similar messages come first."""
+        index = ExampleIndex(str(tmp_path), "embed")
+        index.add(["a", "b", "c"], ["east", "north", "north-east"], [[1, 0], [0, 2], [1, 1]])
+
+        assert index.nearest([0, 1], 2) == ["north", "north-east"]
+        assert index.nearest([1, 0], 5) == ["east", "north-east", "north"]
+        assert index.nearest([1, 0, 0], 1) == []
+
+    def test_add_keeps_newest(self, tmp_path):
+        """Test the oldest commits are dropped beyond the limit."""
+        index = ExampleIndex(str(tmp_path), "embed", max_examples=2)
+
+        index.add(["a", "b", "c"], ["first", "second", "third"], np.eye(3))
+
+        assert index.oids == ["b", "c"]
+        assert index.vectors.shape == (2, 3)
+
+    def test_save_and_load(self, tmp_path):
+        """Test the index survives a round trip, but not a change of model."""
+        index = ExampleIndex(str(tmp_path), "embed")
+        index.add(["a"], ["first"], [[3, 4]])
+        index.head = "a"
+        index.save()
+
+        loaded = ExampleIndex(str(tmp_path), "embed")
+        loaded.load()
+        other = ExampleIndex(str(tmp_path), "other-embed")
+        other.load()
+
+        assert loaded.oids == ["a"] and loaded.head == "a"
+        np.testing.assert_allclose(loaded.vectors, [[0.6, 0.8]])
+        assert len(other) == 0 and other.head == ""
+
+    def test_update_is_incremental(self, repository):
+        """Test each update only embeds the commits made since the last one."""
+        commit(repository, "stone.txt", "boulder\n", "Add the stone")
+        commit(repository, "hill.txt", "slope\n", "Add the hill")
+
+        with FakeOllama() as fake:
+            index = ExampleIndex.for_repository("embed")
+            assert index.update(OllamaClient(fake.url)) == 2
+            commit(repository, "summit.txt", "top\n", "Reach the summit")
+            reloaded = ExampleIndex.for_repository("embed")
+            assert reloaded.update(OllamaClient(fake.url)) == 1
+            assert reloaded.update(OllamaClient(fake.url)) == 0
+
+        assert reloaded.messages == ["Add the stone", "Add the hill", "Reach the summit"]
+        assert [len(payload["input"]) for _, payload in fake.requests] == [2, 1]
+
+    def test_search(self, repository):
+        """Test the staged changes find the commit touching the same lines."""
+        commit(repository, "stone.txt", "boulder boulder boulder\n", "Roll the boulder")
+        commit(repository, "hill.txt", "slope\n", "Climb the hill")
+
+        with FakeOllama() as fake:
+            index = ExampleIndex.for_repository("embed")
+            examples = index.search(OllamaClient(fake.url), "+boulder boulder boulder", 1)
+
+        assert examples == ["Roll the boulder"]
+
+    def test_search_outruns_update(self, repository, monkeypatch):
+        """Test a search whose update runs out of time uses the commits indexed so far."""
+        commit(repository, "stone.txt", "boulder boulder boulder\n", "Roll the boulder")
+        with FakeOllama() as fake:
+            ExampleIndex.for_repository("embed").update(OllamaClient(fake.url))
+            commit(repository, "hill.txt", "slope\n", "Climb the hill")
+            monkeypatch.setattr("git_camus.core.examples.UPDATE_BUDGET", 0.0)
+
+            index = ExampleIndex.for_repository("embed")
+            examples = index.search(OllamaClient(fake.url), "+boulder boulder boulder", 2)
+
+        assert examples == ["Roll the boulder"]
+        assert index.messages == ["Roll the boulder"]
+
+    def test_search_empty_repository(self, repository):
+        """Test a repository without commits has no examples."""
+        with FakeOllama() as fake:
+            index = ExampleIndex.for_repository("embed")
+
+            assert index.search(OllamaClient(fake.url), "+boulder", 3) == []
+
+        assert fake.requests == []
+
@@ -0,0 +1,67 @@
+"""Tests for fallback module."""
+
+from git_camus.core.fallback import (
+    MAX_FALLBACK_LENGTH,
+    fallback_commit_message,
+    summarize_diff,
+)
+
+DIFF = (
+    "diff --git a/core/app.py b/core/app.py\n"
+    "--- a/core/app.py\n"
+    "+++ b/core/app.py\n"
+    "@@ -1,2 +1,3 @@\n"
+    " context\n"
+    "+added one\n"
+    "+added two\n"
+    "-removed\n"
+    "diff --git a/tests/test_app.py b/tests/test_app.py\n"
+    "--- /dev/null\n"
+    "+++ b/tests/test_app.py\n"
+    "+new test\n"
+)
+
+
+class TestSummarizeDiff:
+    """Test summarize_diff function."""
+
+    def test_summarize_diff(self):
+        """Test lines are counted per file."""
+        assert summarize_diff(DIFF) == [("core/app.py", 2, 1), ("tests/test_app.py", 1, 0)]
+
+    def test_summarize_empty_diff(self):
+        """Test an empty diff has no files."""
+        assert summarize_diff("") == []
+
+
+class TestFallbackCommitMessage:
+    """Test fallback_commit_message function."""
+
+    def test_from_diff(self):
+        """Test the message reflects the diff statistics."""
+        message = fallback_commit_message(DIFF, "M  core/app.py\nA  tests/test_app.py")
+
+        assert message == (
+            "Roll the boulder through 2 files in core, tests (+3/-1); "
+            "one must imagine Sisyphus happy"
+        )
+
+    def test_deterministic(self):
+        """Test the same changes always produce the same message."""
+        assert fallback_commit_message(DIFF, "") == fallback_commit_message(DIFF, "")
+
+    def test_from_status_only(self):
+        """Test the status is used when no diff is available."""
+        message = fallback_commit_message("", "M  docs/index.md\n")
+
+        assert message == "Roll the boulder through index.md; one must imagine Sisyphus happy"
+
+    def test_without_changes(self):
+        """Test a message is produced even without any details."""
+        assert "the staged changes" in fallback_commit_message("", "")
+
+    def test_length_limit(self):
+        """Test long file lists are cut to the length limit."""
+        status = "\n".join(f"M  {'d' * 60}{i}/file.py" for i in range(5))
+
+        assert len(fallback_commit_message("", status)) <= MAX_FALLBACK_LENGTH
@@ -6,9 +6,16 @@ from unittest.mock import patch
 import pytest
 
 from git_camus.core.git_operations import (
+    can_commit_with_plumbing,
     check_git_repository,
+    commit_with_plumbing,
     get_git_diff,
+    get_git_dir,
+    get_git_path,
     get_git_status,
+    get_head,
+    get_index_tree,
+    get_tree_diff,
     has_staged_changes,
     perform_git_commit,
 )
@@ -27,7 +34,7 @@ class TestGetGitDiff:
 
         assert result == expected_diff
         mock_check_output.assert_called_once_with(
-            ["git", "diff", "--cached"], text=True, stderr=subprocess.PIPE
+            ["git", "diff", "--cached"], text=True, stderr=subprocess.PIPE, timeout=None
         )
 
     @patch("subprocess.check_output")
@@ -53,7 +60,7 @@ class TestGetGitStatus:
 
         assert result == expected_status
         mock_check_output.assert_called_once_with(
-            ["git", "status", "--porcelain"], text=True, stderr=subprocess.PIPE
+            ["git", "status", "--porcelain"], text=True, stderr=subprocess.PIPE, timeout=None
         )
 
     @patch("subprocess.check_output")
@@ -78,7 +85,7 @@ class TestPerformGitCommit:
         perform_git_commit(message)
 
         mock_run.assert_called_once_with(
-            ["git", "commit", "-m", message], check=True, text=True
+            ["git", "commit", "-F", "-"], input=message, check=True, text=True
         )
         mock_echo.assert_called_once_with(f"Committed with message: {message}")
 
@@ -96,6 +103,96 @@ class TestPerformGitCommit:
         mock_echo.assert_called_once_with(f"Error committing: {error}", err=True)
 
 
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    """Work in an empty git repository with a file staged."""
+    for variable in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{variable}_NAME", "Sisyphus")
+        monkeypatch.setenv(f"GIT_{variable}_EMAIL", "sisyphus@example.com")
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "stone.txt").write_text("boulder\n")
+    subprocess.run(["git", "add", "stone.txt"], check=True)
+    return tmp_path
+
+
+def git(*args):
+    """Run git in the test repository and return its output."""
+    return subprocess.check_output(["git", *args], text=True).strip()
+
+
+class TestCommitWithPlumbing:
+    """Test commit_with_plumbing function."""
+
+    @patch("click.echo")
+    def test_commits_index(self, mock_echo, repository):
+        """Test the index is committed on top of HEAD with the full message."""
+        assert commit_with_plumbing("Roll the boulder\n\nAgain.")
+        first = get_head()
+        (repository / "stone.txt").write_text("boulder\nhill\n")
+        git("add", "stone.txt")
+
+        assert commit_with_plumbing("Climb the hill")
+
+        assert git("log", "--format=%s|%b|%P").splitlines() == [
+            f"Climb the hill||{first}",
+            "Roll the boulder|Again.|",
+        ]
+        assert git("status", "--porcelain") == ""
+        assert git("reflog", "--format=%gs") == (
+            "commit: Climb the hill\ncommit (initial): Roll the boulder"
+        )
+        mock_echo.assert_called_with("Committed with message: Climb the hill")
+
+    def test_hook_needs_porcelain(self, repository):
+        """Test an installed commit hook rules out the plumbing commit."""
+        hook = repository / ".git" / "hooks" / "commit-msg"
+        hook.write_text("#!/bin/sh\n")
+        hook.chmod(0o755)
+
+        assert not can_commit_with_plumbing()
+        assert not commit_with_plumbing("Roll the boulder")
+        assert get_head() == ""
+
+    def test_merge_needs_porcelain(self, repository):
+        """Test a merge in progress rules out the plumbing commit."""
+        (repository / ".git" / "MERGE_HEAD").write_text("0" * 40 + "\n")
+
+        assert not can_commit_with_plumbing()
+
+    def test_signing_needs_porcelain(self, repository):
+        """Test signed commits rule out the plumbing commit."""
+        git("config", "commit.gpgSign", "true")
+
+        assert not can_commit_with_plumbing()
+
+    @patch("click.echo")
+    def test_head_moved_concurrently(self, mock_echo, repository):
+        """Test HEAD is not moved if it changed since it was read."""
+        with patch("git_camus.core.git_operations.get_head", return_value="1" * 40):
+            assert not commit_with_plumbing("Roll the boulder")
+
+        assert get_head() == ""
+        mock_echo.assert_not_called()
+
+
+class TestGetTreeDiff:
+    """Test get_tree_diff function."""
+
+    def test_diff_between_index_states(self, repository):
+        """Test only the changes staged between two index trees are shown."""
+        before = get_index_tree()
+        (repository / "hill.txt").write_text("summit\n")
+        git("add", "hill.txt")
+
+        diff = get_tree_diff(before, get_index_tree())
+
+        assert "+summit" in diff
+        assert "stone.txt" not in diff
+        assert get_tree_diff(before, before) == ""
+        assert get_tree_diff("0" * 40, before) == ""
+
+
 class TestCheckGitRepository:
     """Test check_git_repository function."""
 
@@ -133,7 +230,61 @@ class TestHasStagedChanges:
         status = ""
         assert has_staged_changes(status) is False
 
+    def test_has_staged_changes_false_unstaged(self):
+        """Test returns False when only the working tree has changes."""
+        status = " M file.txt\n?? new_file.txt\n!! build/"
+        assert has_staged_changes(status) is False
+
+    def test_has_staged_changes_partly_staged(self):
+        """Test returns True for a file with staged and unstaged changes."""
+        status = "?? new_file.txt\nMM file.txt"
+        assert has_staged_changes(status) is True
+
     def test_has_staged_changes_false_whitespace(self):
         """Test returns False for whitespace-only status."""
         status = "   \n  \t  "
         assert has_staged_changes(status) is False
+
+
+class TestGitPaths:
+    """Test git directory helpers."""
+
+    @patch("subprocess.check_output")
+    def test_get_git_dir(self, mock_check_output):
+        """Test the git directory is returned without the newline."""
+        mock_check_output.return_value = "/repo/.git\n"
+
+        assert get_git_dir() == "/repo/.git"
+
+    @patch("subprocess.check_output")
+    def test_get_git_dir_failure(self, mock_check_output):
+        """Test an empty path is returned outside a repository."""
+        mock_check_output.side_effect = subprocess.CalledProcessError(128, "git")
+
+        assert get_git_dir() == ""
+
+    @patch("subprocess.check_output")
+    def test_get_git_path(self, mock_check_output):
+        """Test paths inside the git directory are made absolute."""
+        mock_check_output.return_value = "/repo/.git/hooks/prepare-commit-msg\n"
+
+        assert get_git_path("hooks/prepare-commit-msg") == "/repo/.git/hooks/prepare-commit-msg"
+        mock_check_output.assert_called_once_with(
+            ["git", "rev-parse", "--git-path", "hooks/prepare-commit-msg"],
+            text=True,
+            stderr=subprocess.PIPE,
+        )
+
+    @patch("subprocess.check_output")
+    def test_get_index_tree(self, mock_check_output):
+        """Test the staged tree id is returned."""
+        mock_check_output.return_value = "4b825dc642cb6eb9a060e54bf8d69288fbee4904\n"
+
+        assert get_index_tree() == "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
+    @patch("subprocess.check_output")
+    def test_get_index_tree_unmerged(self, mock_check_output):
+        """Test an empty id is returned when the index cannot be written."""
+        mock_check_output.side_effect = subprocess.CalledProcessError(128, "git")
+
+        assert get_index_tree() == ""
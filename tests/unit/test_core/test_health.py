@@ -0,0 +1,48 @@
+"""Tests for health cache module."""
+
+from unittest.mock import patch
+
+from git_camus.core.health import HealthCache
+
+
+class TestHealthCache:
+    """Test HealthCache class."""
+
+    def test_unknown_host(self, tmp_path):
+        """Test hosts without a recorded result are unknown."""
+        cache = HealthCache(str(tmp_path / "health.json"))
+
+        assert cache.get("http://localhost:11434") is None
+
+    @patch("git_camus.core.health.time.time")
+    def test_put_and_get(self, mock_time, tmp_path):
+        """Test recorded results are returned while fresh."""
+        mock_time.return_value = 1000.0
+        cache = HealthCache(str(tmp_path / "health.json"), ttl=15.0)
+
+        cache.put("http://localhost:11434", False)
+        cache.put("http://gpu-box:11434", True)
+
+        mock_time.return_value = 1010.0
+        assert cache.get("http://localhost:11434") is False
+        assert cache.get("http://gpu-box:11434") is True
+
+    @patch("git_camus.core.health.time.time")
+    def test_stale_result(self, mock_time, tmp_path):
+        """Test results older than the TTL are ignored."""
+        mock_time.return_value = 1000.0
+        cache = HealthCache(str(tmp_path / "health.json"), ttl=15.0)
+        cache.put("http://localhost:11434", False)
+
+        mock_time.return_value = 1016.0
+
+        assert cache.get("http://localhost:11434") is None
+
+    def test_for_user(self, tmp_path, monkeypatch):
+        """Test the cache lives in the user's cache directory."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+        cache = HealthCache.for_user(ttl=5.0)
+
+        assert cache.path == str(tmp_path / "git-camus" / "health.json")
+        assert cache.ttl == 5.0
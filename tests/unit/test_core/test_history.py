@@ -0,0 +1,102 @@
+"""Tests for commit history context module."""
+
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from git_camus.core import history
+from git_camus.core.history import HistoryCache, read_log
+
+
+def commit(path, subject):
+    """Make an empty commit in the test repository."""
+    subprocess.run(
+        ["git", "commit", "-q", "--allow-empty", "-m", subject], cwd=path, check=True
+    )
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    """Work in an empty git repository."""
+    for variable in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{variable}_NAME", "Sisyphus")
+        monkeypatch.setenv(f"GIT_{variable}_EMAIL", "sisyphus@example.com")
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestReadLog:
+    """Test read_log function."""
+
+    def test_read_log(self, repository):
+        """Test subjects and parents are read newest first."""
+        commit(repository, "First stone")
+        commit(repository, "Second stone")
+
+        (second, parents, subject), (first, no_parents, _) = read_log("HEAD")
+
+        assert subject == "Second stone"
+        assert parents == [first]
+        assert no_parents == []
+
+    def test_read_log_unknown_revision(self, repository):
+        """Test walking from a missing commit is an error."""
+        commit(repository, "First stone")
+
+        with pytest.raises(subprocess.CalledProcessError):
+            read_log(f"{'0' * 40}..HEAD")
+
+
+class TestHistoryCache:
+    """Test HistoryCache class."""
+
+    def test_empty_repository(self, repository):
+        """Test there are no subjects before the first commit."""
+        assert HistoryCache.for_repository().subjects(5) == []
+
+    def test_cached_while_head_stays(self, repository):
+        """Test the history is only walked when HEAD moves."""
+        commit(repository, "First stone")
+        commit(repository, "Second stone")
+        cache = HistoryCache.for_repository()
+
+        assert cache.subjects(5) == ["Second stone", "First stone"]
+        with patch.object(history, "read_log") as mock_read_log:
+            assert cache.subjects(1) == ["Second stone"]
+        mock_read_log.assert_not_called()
+
+    def test_forward_move_reads_new_commits_only(self, repository):
+        """Test only the commits made since the cached HEAD are read."""
+        commit(repository, "First stone")
+        cache = HistoryCache.for_repository()
+        cache.subjects(5)
+        old_head = read_log("HEAD")[0][0]
+        commit(repository, "Second stone")
+        commit(repository, "Third stone")
+
+        with patch.object(history, "read_log", wraps=read_log) as mock_read_log:
+            assert cache.subjects(5) == ["Third stone", "Second stone", "First stone"]
+        mock_read_log.assert_called_once_with(f"{old_head}..{read_log('HEAD')[0][0]}", 50)
+
+    def test_rewrite_reads_history_again(self, repository):
+        """Test a reset to another commit reads the newest commits afresh."""
+        commit(repository, "First stone")
+        commit(repository, "Second stone")
+        cache = HistoryCache.for_repository()
+        cache.subjects(5)
+        subprocess.run(["git", "reset", "-q", "--hard", "HEAD~1"], check=True)
+        commit(repository, "Another second stone")
+
+        assert cache.subjects(5) == ["Another second stone", "First stone"]
+
+    def test_keeps_at_most_max_subjects(self, repository):
+        """Test the cache is bounded however far HEAD moves."""
+        commit(repository, "First stone")
+        cache = HistoryCache(str(repository / ".git" / "camus" / "history.json"), max_subjects=2)
+        cache.subjects(5)
+        for subject in ("Second stone", "Third stone", "Fourth stone"):
+            commit(repository, subject)
+
+        assert cache.subjects(5) == ["Fourth stone", "Third stone"]
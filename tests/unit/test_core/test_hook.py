@@ -0,0 +1,344 @@
+"""Tests for prepare-commit-msg hook module."""
+
+import os
+import subprocess
+import threading
+import time
+from dataclasses import replace
+from unittest.mock import ANY, Mock, patch
+
+import click
+import pytest
+
+from git_camus.core.hook import (
+    HOOK_MARKER,
+    generate_with_deadline,
+    install_hook,
+    prepare_commit_msg,
+)
+from git_camus.core.config import settings
+from git_camus.core.stats import RunLog
+
+
+class TestInstallHook:
+    """Test install_hook function."""
+
+    @patch("git_camus.core.hook.get_git_path")
+    def test_install_hook(self, mock_git_path, tmp_path):
+        """Test the hook script is written and made executable."""
+        hook_path = tmp_path / "hooks" / "prepare-commit-msg"
+        mock_git_path.return_value = str(hook_path)
+
+        assert install_hook() == str(hook_path)
+
+        assert HOOK_MARKER in hook_path.read_text()
+        assert os.access(hook_path, os.X_OK)
+
+    @patch("git_camus.core.hook.get_git_path")
+    def test_install_hook_keeps_foreign_hook(self, mock_git_path, tmp_path):
+        """Test an existing hook is not replaced without force."""
+        hook_path = tmp_path / "prepare-commit-msg"
+        hook_path.write_text("#!/bin/sh\nexit 0\n")
+        mock_git_path.return_value = str(hook_path)
+
+        with pytest.raises(click.ClickException):
+            install_hook()
+
+        install_hook(force=True)
+        assert HOOK_MARKER in hook_path.read_text()
+
+    @patch("git_camus.core.hook.get_git_path")
+    def test_hook_without_git_camus_allows_commit(self, mock_git_path, tmp_path):
+        """Test the hook lets the commit through when git-camus cannot be found."""
+        hook_path = tmp_path / "prepare-commit-msg"
+        mock_git_path.return_value = str(hook_path)
+        install_hook()
+        (tmp_path / "empty").mkdir()
+
+        result = subprocess.run(
+            ["/bin/sh", str(hook_path), str(tmp_path / "COMMIT_EDITMSG")],
+            env={"PATH": str(tmp_path / "empty")},
+            capture_output=True,
+        )
+
+        assert result.returncode == 0
+
+    @patch("git_camus.core.hook.get_git_path")
+    def test_install_hook_outside_repo(self, mock_git_path):
+        """Test installation fails outside a repository."""
+        mock_git_path.return_value = ""
+
+        with pytest.raises(click.ClickException):
+            install_hook()
+
+
+class TestGenerateWithDeadline:
+    """Test generate_with_deadline function."""
+
+    def test_generate_with_deadline_success(self):
+        """Test streamed pieces are joined into the message."""
+        client = Mock()
+        client.stream_api.return_value = iter(["The struggle ", "itself", "\n"])
+
+        assert generate_with_deadline(client, {}, 1.0) == "The struggle itself"
+
+    @patch("click.echo")
+    def test_generate_with_deadline_expired(self, mock_echo):
+        """Test a generation that outlives the deadline is abandoned."""
+        release = threading.Event()
+
+        def slow_stream(request_data, timeout):
+            release.wait(5)
+            yield "too late"
+
+        client = Mock()
+        client.stream_api.side_effect = slow_stream
+
+        try:
+            assert generate_with_deadline(client, {}, 0.05) is None
+        finally:
+            release.set()
+
+    @patch("click.echo")
+    def test_generate_with_deadline_error(self, mock_echo):
+        """Test API errors produce no message."""
+        client = Mock()
+        client.stream_api.side_effect = RuntimeError("connection refused")
+
+        assert generate_with_deadline(client, {}, 1.0) is None
+        mock_echo.assert_called_once_with("git-camus: connection refused", err=True)
+
+
+class TestPrepareCommitMsg:
+    """Test prepare_commit_msg function."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.client = Mock()
+        self.config = (self.client, "llama3.2", "{diff}{status}", 1.0)
+
+    @patch("git_camus.core.hook.get_git_status")
+    def test_preserves_explicit_message(self, mock_status, tmp_path):
+        """Test messages given with -m are left alone."""
+        message_file = tmp_path / "COMMIT_EDITMSG"
+        message_file.write_text("Explicit message\n")
+
+        assert not prepare_commit_msg(str(message_file), "message", *self.config)
+
+        assert message_file.read_text() == "Explicit message\n"
+        mock_status.assert_not_called()
+
+    @patch("git_camus.core.hook.MessageCache")
+    @patch("git_camus.core.hook.get_index_tree")
+    @patch("git_camus.core.hook.get_git_status")
+    def test_uses_warm_cache(self, mock_status, mock_index_tree, mock_cache, tmp_path):
+        """Test a previewed message is reused without calling Ollama."""
+        message_file = tmp_path / "COMMIT_EDITMSG"
+        message_file.write_text("# Please enter the commit message\n")
+        mock_status.return_value = "M  file.txt"
+        mock_index_tree.return_value = "abc123"
+        mock_cache.for_repository.return_value.get.return_value = "Cached reflection"
+
+        assert prepare_commit_msg(str(message_file), None, *self.config)
+
+        assert message_file.read_text() == (
+            "Cached reflection\n# Please enter the commit message\n"
+        )
+        mock_cache.for_repository.return_value.get.assert_called_once_with(
+            "abc123", "llama3.2"
+        )
+        self.client.generate_commit_message_request.assert_not_called()
+
+    @patch("click.echo")
+    @patch("git_camus.core.hook.get_git_status")
+    def test_slow_git_counts_against_deadline(self, mock_status, mock_echo, tmp_path):
+        """Test the deadline starts at hook entry and bounds reading the changes."""
+        message_file = tmp_path / "COMMIT_EDITMSG"
+        message_file.write_text("# template\n")
+        mock_status.side_effect = subprocess.TimeoutExpired(["git", "status"], 1.0)
+
+        assert not prepare_commit_msg(str(message_file), None, *self.config)
+
+        assert 0.0 < mock_status.call_args.kwargs["timeout"] <= 1.0
+        assert message_file.read_text() == "# template\n"
+        self.client.is_available.assert_not_called()
+
+    @patch("git_camus.core.hook.MessageCache")
+    @patch("git_camus.core.hook.get_index_tree")
+    @patch("git_camus.core.hook.get_git_diff")
+    @patch("git_camus.core.hook.get_git_status")
+    @patch("git_camus.core.hook.generate_with_deadline")
+    def test_generation_gets_remaining_budget(
+        self,
+        mock_generate,
+        mock_status,
+        mock_diff,
+        mock_index_tree,
+        mock_cache,
+        tmp_path,
+    ):
+        """Test the time spent before generating is taken off its deadline."""
+        message_file = tmp_path / "COMMIT_EDITMSG"
+        mock_status.return_value = "M  file.txt"
+        mock_diff.side_effect = lambda timeout: time.sleep(0.3) or "diff content"
+        mock_cache.for_repository.return_value.get.return_value = None
+        mock_generate.return_value = "Late reflection"
+
+        assert prepare_commit_msg(str(message_file), None, *self.config)
+
+        assert self.client.is_available.call_args.kwargs["timeout"] <= 0.5
+        assert mock_generate.call_args.args[2] <= 0.7
+
+    @patch("git_camus.core.hook.MessageCache")
+    @patch("git_camus.core.hook.get_index_tree")
+    @patch("git_camus.core.hook.get_git_diff")
+    @patch("git_camus.core.hook.get_git_status")
+    @patch("git_camus.core.hook.generate_with_deadline")
+    def test_generates_on_cache_miss(
+        self,
+        mock_generate,
+        mock_status,
+        mock_diff,
+        mock_index_tree,
+        mock_cache,
+        tmp_path,
+    ):
+        """Test a message is generated and cached on a miss."""
+        message_file = tmp_path / "COMMIT_EDITMSG"
+        message_file.write_text("")
+        mock_status.return_value = "M  file.txt"
+        mock_diff.return_value = "diff content"
+        mock_index_tree.return_value = "abc123"
+        cache = mock_cache.for_repository.return_value
+        cache.get.return_value = None
+        mock_generate.return_value = "Fresh reflection"
+
+        assert prepare_commit_msg(str(message_file), "template", *self.config)
+
+        assert message_file.read_text() == "Fresh reflection\n"
+        cache.put.assert_called_once_with("abc123", "llama3.2", "Fresh reflection")
+        mock_generate.assert_called_once_with(
+            self.client, self.client.generate_commit_message_request.return_value, ANY
+        )
+        assert 0.0 < mock_generate.call_args.args[2] <= 1.0
+
+    @patch("git_camus.core.hook.MessageCache")
+    @patch("git_camus.core.hook.get_index_tree")
+    @patch("git_camus.core.hook.get_git_diff")
+    @patch("git_camus.core.hook.get_git_status")
+    @patch("git_camus.core.hook.generate_with_deadline")
+    def test_leaves_file_untouched_after_deadline(
+        self,
+        mock_generate,
+        mock_status,
+        mock_diff,
+        mock_index_tree,
+        mock_cache,
+        tmp_path,
+    ):
+        """Test the message file is untouched when generation times out."""
+        message_file = tmp_path / "COMMIT_EDITMSG"
+        message_file.write_text("# template\n")
+        mock_status.return_value = "M  file.txt"
+        mock_cache.for_repository.return_value.get.return_value = None
+        mock_generate.return_value = None
+
+        assert not prepare_commit_msg(str(message_file), None, *self.config)
+
+        assert message_file.read_text() == "# template\n"
+        mock_cache.for_repository.return_value.put.assert_not_called()
+
+    @patch("click.echo")
+    @patch("git_camus.core.hook.MessageCache")
+    @patch("git_camus.core.hook.get_index_tree")
+    @patch("git_camus.core.hook.get_git_status")
+    def test_leaves_file_untouched_when_unreachable(
+        self, mock_status, mock_index_tree, mock_cache, mock_echo, tmp_path
+    ):
+        """Test an unreachable server is not waited for."""
+        message_file = tmp_path / "COMMIT_EDITMSG"
+        message_file.write_text("# template\n")
+        mock_status.return_value = "M  file.txt"
+        mock_cache.for_repository.return_value.get.return_value = None
+        self.client.is_available.return_value = False
+
+        assert not prepare_commit_msg(str(message_file), None, *self.config)
+
+        assert message_file.read_text() == "# template\n"
+        self.client.generate_commit_message_request.assert_not_called()
+
+    @patch("git_camus.core.hook.MessageCache")
+    @patch("git_camus.core.hook.get_index_tree")
+    @patch("git_camus.core.hook.get_git_diff")
+    @patch("git_camus.core.hook.get_git_status")
+    def test_routes_before_cache_lookup(
+        self, mock_status, mock_diff, mock_index_tree, mock_cache, tmp_path
+    ):
+        """Test the cache is looked up for the model routed to."""
+        message_file = tmp_path / "COMMIT_EDITMSG"
+        message_file.write_text("")
+        mock_status.return_value = "M  file.txt"
+        mock_index_tree.return_value = "abc123"
+        mock_cache.for_repository.return_value.get.return_value = "Cached reflection"
+        router = Mock()
+        router.route.return_value = "llama3.2:1b"
+
+        assert prepare_commit_msg(str(message_file), None, *self.config, router=router)
+
+        mock_cache.for_repository.return_value.get.assert_called_once_with(
+            "abc123", "llama3.2:1b"
+        )
+
+    @patch("git_camus.core.hook.MessageCache")
+    @patch("git_camus.core.hook.get_index_tree")
+    @patch("git_camus.core.hook.get_git_diff", return_value="diff content")
+    @patch("git_camus.core.hook.get_git_status", return_value="M  file.txt")
+    @patch("git_camus.core.hook.generate_with_deadline", return_value="Routed reflection")
+    def test_routed_model_gets_system_prompt(
+        self, mock_generate, mock_status, mock_diff, mock_index_tree, mock_cache, tmp_path
+    ):
+        """Test a model routed to instead of the derived one is sent the system prompt."""
+        message_file = tmp_path / "COMMIT_EDITMSG"
+        message_file.write_text("")
+        mock_cache.for_repository.return_value = None
+        router = Mock()
+        router.route.return_value = "llama3.2:1b"
+
+        with patch.object(settings, "run", replace(settings.run, derived_model="git-camus")):
+            assert prepare_commit_msg(
+                str(message_file),
+                None,
+                self.client,
+                "git-camus",
+                "{diff}{status}",
+                1.0,
+                system_prompt=None,
+                router=router,
+            )
+
+        self.client.generate_commit_message_request.assert_called_once_with(
+            "diff content",
+            "M  file.txt",
+            "llama3.2:1b",
+            "{diff}{status}",
+            system_prompt=settings.run.system_prompt,
+            profile=None,
+            body_min_files=None,
+        )
+
+    @patch("git_camus.core.hook.MessageCache")
+    @patch("git_camus.core.hook.get_index_tree")
+    @patch("git_camus.core.hook.get_git_status")
+    def test_records_cache_hit(self, mock_status, mock_index_tree, mock_cache, tmp_path):
+        """Test the run is logged with its cache outcome."""
+        message_file = tmp_path / "COMMIT_EDITMSG"
+        message_file.write_text("")
+        mock_status.return_value = "M  file.txt"
+        mock_cache.for_repository.return_value.get.return_value = "Cached reflection"
+        run_log = RunLog(str(tmp_path / "runs.jsonl"))
+
+        prepare_commit_msg(str(message_file), None, *self.config, run_log=run_log)
+
+        record, = run_log.records()
+        assert record["command"] == "hook"
+        assert record["cache_hit"] is True
@@ -0,0 +1,167 @@
+"""Tests for host pool module."""
+
+import json
+from unittest.mock import patch
+
+from git_camus.core.host_pool import HostPool, percentile, split_hosts
+
+HOSTS = ["http://gpu-a:11434", "http://gpu-b:11434", "http://gpu-c:11434"]
+
+
+class TestSplitHosts:
+    """Test split_hosts function."""
+
+    def test_single_host(self):
+        """Test a single URL is kept as is."""
+        assert split_hosts("http://localhost:11434") == ["http://localhost:11434"]
+
+    def test_several_hosts(self):
+        """Test comma separated URLs are split and trimmed."""
+        assert split_hosts(" http://gpu-a:11434/, http://gpu-b:11434 ,") == [
+            "http://gpu-a:11434",
+            "http://gpu-b:11434",
+        ]
+
+
+class TestPercentile:
+    """Test percentile function."""
+
+    def test_percentile(self):
+        """Test the nearest-rank percentile."""
+        samples = [0.5, 0.1, 0.4, 0.2, 0.3]
+
+        assert percentile(samples, 0.5) == 0.3
+        assert percentile(samples, 0.95) == 0.5
+        assert percentile(samples, 0.0) == 0.1
+
+
+class TestHostPool:
+    """Test HostPool class."""
+
+    def test_least_outstanding_routing(self):
+        """Test requests go to the host with the fewest in flight."""
+        pool = HostPool(HOSTS)
+
+        assert pool.acquire() == HOSTS[0]
+        assert pool.acquire() == HOSTS[1]
+        assert pool.acquire() == HOSTS[2]
+
+        pool.release(HOSTS[1], ok=True)
+
+        assert pool.acquire() == HOSTS[1]
+
+    def test_acquire_excludes_hosts(self):
+        """Test excluded hosts are skipped."""
+        pool = HostPool(HOSTS)
+
+        assert pool.acquire(exclude=HOSTS[:2]) == HOSTS[2]
+        assert pool.acquire(exclude=HOSTS) is None
+
+    @patch("git_camus.core.host_pool.time.time")
+    def test_ejection_and_readmission(self, mock_time):
+        """Test failing hosts leave the rotation and come back on probation."""
+        mock_time.return_value = 1000.0
+        pool = HostPool(HOSTS[:2], eject_after=2, eject_seconds=30.0)
+
+        for _ in range(2):
+            pool.release(pool.acquire(exclude=[HOSTS[1]]), ok=False)
+
+        assert pool.is_ejected(HOSTS[0])
+        assert pool.available_hosts() == [HOSTS[1]]
+        assert pool.acquire() == HOSTS[1]
+
+        mock_time.return_value = 1031.0
+        assert pool.available_hosts() == HOSTS[:2]
+
+        # One more failure on probation ejects the host again
+        pool.release(HOSTS[0], ok=False)
+        assert pool.is_ejected(HOSTS[0])
+
+        mock_time.return_value = 1062.0
+        pool.release(HOSTS[0], ok=True)
+        assert pool.failures[HOSTS[0]] == 0
+        assert not pool.is_ejected(HOSTS[0])
+
+    def test_all_ejected_uses_first_due_back(self):
+        """Test a request is still routed when every host is ejected."""
+        pool = HostPool(HOSTS[:2], eject_seconds=30.0)
+        pool.eject(HOSTS[1])
+        pool.eject(HOSTS[0])
+
+        assert pool.acquire() == HOSTS[1]
+
+    def test_hedge_delay(self):
+        """Test the hedging delay needs enough samples."""
+        pool = HostPool(HOSTS, hedge_percentile=0.5)
+
+        for ttft in (0.1, 0.2, 0.3, 0.4):
+            pool.release(pool.acquire(), ok=True, first_token=ttft)
+        assert pool.hedge_delay() is None
+
+        pool.release(pool.acquire(), ok=True, first_token=0.5)
+        assert pool.hedge_delay() == 0.3
+
+    def test_state_persists_across_pools(self, tmp_path):
+        """Test health and latency survive into the next run."""
+        path = str(tmp_path / "hosts.json")
+        pool = HostPool(HOSTS[:2], state_path=path)
+        pool.release(pool.acquire(), ok=True, first_token=0.25)
+        pool.eject(HOSTS[0])
+
+        restored = HostPool(HOSTS[:2], state_path=path)
+
+        assert restored.is_ejected(HOSTS[0])
+        assert restored.samples == [0.25]
+
+    def test_malformed_state_skipped(self, tmp_path):
+        """Test entries of the wrong type are skipped instead of failing the run."""
+        path = tmp_path / "hosts.json"
+        path.write_text(json.dumps({
+            "hosts": {
+                HOSTS[0]: {"failures": "many", "ejected_until": 0.0},
+                HOSTS[1]: {"failures": 1, "ejected_until": [9e9]},
+            },
+            "samples": [0.25, "slow", None],
+        }))
+
+        pool = HostPool(HOSTS[:2], state_path=str(path))
+
+        assert pool.failures == {HOSTS[0]: 0, HOSTS[1]: 0}
+        assert not pool.is_ejected(HOSTS[1])
+        assert pool.samples == [0.25]
+
+        path.write_text(json.dumps({"hosts": ["not", "a", "table"]}))
+        pool = HostPool(HOSTS[:2], state_path=str(path))
+        pool.eject(HOSTS[0])
+
+        assert HostPool(HOSTS[:2], state_path=str(path)).is_ejected(HOSTS[0])
+
+    def test_release_saves_only_changes(self, tmp_path):
+        """Test the state file is only rewritten when a host's health changes."""
+        path = str(tmp_path / "hosts.json")
+        pool = HostPool(HOSTS[:2], state_path=path)
+        pool.release(pool.acquire(), ok=True, first_token=0.25)
+
+        with patch("git_camus.core.host_pool.write_json") as mock_write:
+            pool.release(pool.acquire(), ok=True, first_token=0.5)
+            pool.release(pool.acquire(), ok=True)
+
+            assert mock_write.call_count == 0
+
+            pool.release(HOSTS[0], ok=False)
+
+            assert mock_write.call_count == 1
+
+        with patch("git_camus.core.host_pool.time.time", return_value=pool.saved_at + 61.0):
+            pool.release(pool.acquire(), ok=True, first_token=0.75)
+
+        assert HostPool(HOSTS[:2], state_path=path).samples == [0.25, 0.5, 0.75]
+
+    def test_for_user(self, tmp_path, monkeypatch):
+        """Test the shared pool state lives in the user's cache directory."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+        pool = HostPool.for_user(HOSTS, eject_after=5)
+
+        assert pool.state_path == str(tmp_path / "git-camus" / "hosts.json")
+        assert pool.eject_after == 5
@@ -0,0 +1,41 @@
+"""Tests for lazy import module."""
+
+import sys
+
+import pytest
+
+from git_camus.core.lazy import lazy_import, load_now
+
+
+class TestLazyImport:
+    """Test lazy_import function."""
+
+    def test_loads_on_attribute_access(self, monkeypatch):
+        """Test the module only runs once one of its attributes is used."""
+        monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+
+        module = lazy_import("colorsys")
+
+        assert sys.modules["colorsys"] is module
+        assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+
+    def test_already_imported(self):
+        """Test a loaded module is returned as is."""
+        assert lazy_import("json") is sys.modules["json"]
+
+    def test_missing_module(self):
+        """Test a module that is not installed fails right away."""
+        with pytest.raises(ModuleNotFoundError):
+            lazy_import("git_camus_no_such_module")
+
+
+class TestLoadNow:
+    """Test load_now function."""
+
+    def test_loads_right_away(self, monkeypatch):
+        """Test the module is fully loaded without using one of its attributes."""
+        monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+
+        module = load_now(lazy_import("colorsys"))
+
+        assert "rgb_to_hsv" in vars(module)
@@ -1,11 +1,37 @@
 """Tests for Ollama client module."""
 
+import os
+import subprocess
+import sys
+import textwrap
+import time
 from unittest.mock import Mock, patch
 
 import httpx
 import pytest
 
-from git_camus.core.ollama_client import OllamaClient
+import git_camus
+from git_camus.core.config import LatencyProfile
+from git_camus.core.deadline import Deadline, DeadlineExceeded
+from git_camus.core.health import HealthCache
+from git_camus.core.ollama_client import OllamaClient, OllamaUnavailable, context_size
+from git_camus.tests.fake_ollama import FakeOllama
+
+
+class TestContextSize:
+    """Test context_size function."""
+
+    def test_small_prompt_gets_minimum(self):
+        """Test a short prompt gets the smallest window."""
+        assert context_size(100, LatencyProfile()) == 2048
+
+    def test_sized_to_power_of_two(self):
+        """Test larger prompts round up to the next power of two."""
+        assert context_size(9000, LatencyProfile(max_ctx=16384)) == 4096
+
+    def test_capped_by_profile(self):
+        """Test the window never exceeds the profile's maximum."""
+        assert context_size(100000, LatencyProfile(max_ctx=4096)) == 4096
 
 
 class TestOllamaClient:
@@ -38,6 +64,10 @@ class TestOllamaClient:
         assert "new line" in request["messages"][0]["content"]
         assert "M  file.txt" in request["messages"][0]["content"]
         assert request["options"]["temperature"] == 0.7
+        assert request["options"]["num_predict"] == 64
+        assert request["options"]["num_ctx"] == 2048
+        assert request["options"]["stop"] == ["\n"]
+        assert "max_tokens" not in request["options"]
 
     def test_generate_commit_message_request_truncate_diff(self):
         """Test diff truncation for long diffs."""
@@ -54,6 +84,253 @@ class TestOllamaClient:
         assert "... (truncated)" in content
         assert len(content) < 9000
 
+    def test_generate_commit_message_request_profile(self):
+        """Test a latency profile bounds the diff and the generation."""
+        profile = LatencyProfile(num_predict=16, max_ctx=8192, max_diff_length=100, num_thread=4)
+
+        request = self.client.generate_commit_message_request(
+            "x" * 500, "M  file.txt", "llama3.2", "{diff}", profile=profile
+        )
+
+        assert len(request["messages"][0]["content"]) < 150
+        assert request["options"]["num_predict"] == 16
+        assert request["options"]["num_thread"] == 4
+
+    def test_generate_commit_message_request_system_prompt(self):
+        """Test instructions go into a fixed system message before the diff."""
+        request = self.client.generate_commit_message_request(
+            "+new line", "M  file.txt", "llama3.2", "{status}\n{diff}", system_prompt="Be Camus"
+        )
+
+        assert request["messages"][0] == {"role": "system", "content": "Be Camus"}
+        assert request["messages"][1]["role"] == "user"
+        assert request["messages"][1]["content"].endswith("+new line")
+
+    def test_generate_commit_message_request_keep_alive(self):
+        """Test the configured keep_alive is sent with the request."""
+        client = OllamaClient(self.host, keep_alive="1h")
+
+        request = client.generate_commit_message_request("diff", "M  file.txt", "llama3.2", "{diff}")
+
+        assert request["keep_alive"] == "1h"
+        assert "keep_alive" not in self.client.generate_commit_message_request(
+            "diff", "M  file.txt", "llama3.2", "{diff}"
+        )
+
+    def test_generate_commit_message_request_examples(self):
+        """Test examples come ahead of the changes, leaving the system message unchanged."""
+        request = self.client.generate_commit_message_request(
+            "+new line",
+            "M  file.txt",
+            "llama3.2",
+            "{status}\n{diff}",
+            system_prompt="Be Camus",
+            examples=["Fix the absurd parser"],
+        )
+
+        assert request["messages"][0] == {"role": "system", "content": "Be Camus"}
+        content = request["messages"][1]["content"]
+        assert content.index("Fix the absurd parser") < content.index("+new line")
+        assert content.endswith("+new line")
+
+    def test_generate_commit_message_request_history(self):
+        """Test recent subjects take part of the diff budget, newest first."""
+        profile = LatencyProfile(max_diff_length=800)
+
+        request = self.client.generate_commit_message_request(
+            "+" * 1000,
+            "M  file.txt",
+            "llama3.2",
+            "{diff}",
+            profile=profile,
+            history=["Newest stone", "Older stone", "x" * 100],
+        )
+
+        content = request["messages"][0]["content"]
+        assert content.startswith(
+            "Recent commit subjects in this repository:\n- Newest stone\n- Older stone\n\n"
+        )
+        assert "x" * 100 not in content
+        prefix = content.index("+")
+        assert content[prefix:] == "+" * (800 - prefix) + "\n... (truncated)"
+
+    def test_generate_commit_message_request_body(self):
+        """Test large changes ask for a body from the same generation."""
+        diff = "".join(f"diff --git a/f{i}.py b/f{i}.py\n+line\n" for i in range(3))
+
+        small = self.client.generate_commit_message_request(
+            diff, "", "llama3.2", "{diff}", body_min_files=4
+        )
+        large = self.client.generate_commit_message_request(
+            diff, "", "llama3.2", "{diff}", body_min_files=3
+        )
+
+        assert small["options"]["stop"] == ["\n"]
+        assert "body" not in small["messages"][0]["content"]
+        assert large["options"]["stop"] == []
+        assert large["options"]["num_predict"] == 64 + 3 * 24
+        content = large["messages"][0]["content"]
+        assert content.index("+line") < content.index("body")
+        assert content.endswith("for each changed file: f0.py, f1.py, f2.py.")
+
+    def test_generate_commit_message_request_revision(self):
+        """Test a revision sends the earlier message and only the newly staged diff."""
+        request = self.client.generate_commit_message_request(
+            "+stone\n+hill",
+            "M  stone.txt\nA  hill.txt",
+            "llama3.2",
+            "Git Status:\n{status}\n\nGit Diff:\n{diff}",
+            system_prompt="Be Camus",
+            revision=("Roll the boulder", "+hill"),
+        )
+
+        system, user = request["messages"]
+        assert system == {"role": "system", "content": "Be Camus"}
+        assert user["content"].startswith("This commit message was written for the changes")
+        assert "Roll the boulder" in user["content"]
+        assert user["content"].endswith("A  hill.txt\n\nGit Diff:\n+hill")
+        assert request["options"]["stop"] == ["\n"]
+
+    def test_generate_commit_message_request_revision_body(self):
+        """Test a revision asks for a body when all staged files call for one."""
+        diff = "".join(f"diff --git a/f{i}.py b/f{i}.py\n+line\n" for i in range(3))
+        request = self.client.generate_commit_message_request(
+            diff,
+            "",
+            "llama3.2",
+            "{diff}",
+            body_min_files=3,
+            revision=("Roll the boulder", "diff --git a/f2.py b/f2.py\n+line\n"),
+        )
+
+        content = request["messages"][0]["content"]
+        assert request["options"]["stop"] == []
+        assert content.endswith("for each changed file: f0.py, f1.py, f2.py.")
+        assert "f0.py b/f0.py" not in content
+
+    def test_embed(self):
+        """Test texts are embedded in one request."""
+        with FakeOllama() as fake:
+            client = OllamaClient(fake.url)
+
+            vectors = client.embed("nomic-embed-text", ["first text", "second text"])
+
+        assert vectors == [FakeOllama.embed("first text"), FakeOllama.embed("second text")]
+        assert fake.requests == [
+            ("/api/embed", {"model": "nomic-embed-text", "input": ["first text", "second text"]})
+        ]
+
+    @patch("git_camus.core.ollama_client.httpx.post")
+    def test_embed_malformed_response(self, mock_post):
+        """Test a response without one vector per text is rejected."""
+        mock_post.return_value.is_server_error = False
+        mock_post.return_value.json.return_value = {"embeddings": [[1.0]]}
+
+        with pytest.raises(ValueError):
+            self.client.embed("nomic-embed-text", ["first", "second"])
+
+    def test_warm(self):
+        """Test warming loads the model with the configured keep_alive."""
+        with FakeOllama() as fake:
+            client = OllamaClient(fake.url, keep_alive="2h")
+
+            client.warm("llama3.2")
+
+        assert fake.loaded == {"llama3.2"}
+        assert fake.requests == [("/api/generate", {"model": "llama3.2", "keep_alive": "2h"})]
+
+    def test_create_model(self):
+        """Test a derived model is created with the prompt and options baked in."""
+        with FakeOllama() as fake:
+            client = OllamaClient(fake.url)
+
+            client.create_model("git-camus", "llama3.2", "Be Camus", {"num_predict": 64})
+
+        assert fake.created["git-camus"] == {
+            "model": "git-camus",
+            "from": "llama3.2",
+            "system": "Be Camus",
+            "parameters": {"num_predict": 64},
+            "stream": False,
+        }
+
+    def test_warm_async(self):
+        """Test the model is loaded on every host in the background."""
+        with FakeOllama() as first, FakeOllama() as second:
+            client = OllamaClient(f"{first.url},{second.url}")
+
+            client.warm_async("llama3.2").join(5)
+
+        assert first.loaded == second.loaded == {"llama3.2"}
+
+    def test_warm_async_ignores_errors(self):
+        """Test a failing warm-up does not raise."""
+        client = OllamaClient("http://127.0.0.1:9")
+
+        thread = client.warm_async("llama3.2")
+        thread.join(5)
+
+        assert not thread.is_alive()
+
+    def test_warm_async_swallows_any_error(self):
+        """Test an unexpected error in the warm-up thread is not raised on that thread."""
+        client = OllamaClient("http://127.0.0.1:9")
+        uncaught = []
+
+        with patch.object(client, "warm", side_effect=AttributeError("half loaded")), patch(
+            "threading.excepthook", side_effect=uncaught.append
+        ):
+            client.warm_async("llama3.2").join(5)
+
+        assert uncaught == []
+
+    def test_warm_async_while_generating(self):
+        """Test warming up and generating at the same time both complete."""
+        with FakeOllama(load_delay=0.2) as fake:
+            client = OllamaClient(fake.url)
+            request = client.generate_commit_message_request("+x", "M  x", "llama3.2", "{diff}")
+
+            thread = client.warm_async("llama3.2")
+            response = client.call_api(request, deadline=Deadline(5.0))
+            thread.join(5)
+
+        assert response["message"]["content"] == "One must imagine Sisyphus committing"
+        assert not thread.is_alive()
+        assert fake.loaded == {"llama3.2"}
+        assert sorted(path for path, _ in fake.requests) == ["/api/chat", "/api/generate"]
+
+    def test_warm_async_and_call_api_from_cold_start(self):
+        """Test warming up while generating, before httpx was ever used, in a new interpreter."""
+        script = textwrap.dedent(
+            """
+            import sys
+            sys.setswitchinterval(1e-6)
+            from git_camus.core.ollama_client import OllamaClient
+            from git_camus.tests.fake_ollama import FakeOllama
+            with FakeOllama() as fake:
+                client = OllamaClient(fake.url)
+                request = client.generate_commit_message_request("+x", "M  x", "m", "{diff}")
+                warm = client.warm_async("m")
+                print(client.call_api(request)["message"]["content"])
+                warm.join(5)
+            """
+        )
+        # The directory holding the git_camus package, ahead of the repository's git_camus.py
+        root = os.path.dirname(os.path.abspath(git_camus.__path__[0]))
+        env = {**os.environ, "PYTHONPATH": root}
+
+        for _ in range(3):
+            result = subprocess.run(
+                [sys.executable, "-c", script],
+                capture_output=True,
+                text=True,
+                env=env,
+                cwd=root,
+                timeout=60,
+            )
+            assert result.returncode == 0, result.stderr
+            assert result.stdout.strip() == "One must imagine Sisyphus committing"
+
     @patch("httpx.post")
     def test_call_api_success(self, mock_post):
         """Test successful API call."""
@@ -93,12 +370,253 @@ class TestOllamaClient:
     @patch("httpx.post")
     @patch("click.echo")
     def test_call_api_connection_error(self, mock_echo, mock_post):
-        """Test API call with connection error."""
+        """Test a refused connection is raised for the fallback path."""
         mock_post.side_effect = httpx.ConnectError("Cannot connect")
 
         request_data = {"model": "test"}
 
-        with pytest.raises(SystemExit):
+        with pytest.raises(OllamaUnavailable, match="Could not connect"):
             self.client.call_api(request_data)
 
-        assert mock_echo.call_count == 2
+    @patch("httpx.post")
+    def test_call_api_clamps_timeout_to_deadline(self, mock_post):
+        """Test the request timeout never exceeds the remaining budget."""
+        mock_post.return_value.json.return_value = {"message": {"content": "msg"}}
+
+        self.client.call_api({"model": "test"}, deadline=Deadline(2.0))
+
+        assert mock_post.call_args.kwargs["timeout"] <= 2.0
+
+    @patch("httpx.post")
+    @patch("click.echo")
+    def test_call_api_deadline_exceeded(self, mock_echo, mock_post):
+        """Test a timeout within a deadline is reported for the fallback path."""
+        mock_post.side_effect = httpx.ReadTimeout("timed out")
+
+        with pytest.raises(DeadlineExceeded):
+            self.client.call_api({"model": "test"}, deadline=Deadline(2.0))
+
+    @patch("httpx.get")
+    def test_check_health(self, mock_get):
+        """Test the probe uses the version endpoint with a short timeout."""
+        assert self.client.check_health(timeout=0.25) is True
+        mock_get.assert_called_once_with(f"{self.host}/api/version", timeout=0.25)
+
+    @patch("httpx.get")
+    def test_check_health_unreachable(self, mock_get):
+        """Test connection failures mark the server as down."""
+        mock_get.side_effect = httpx.ConnectError("Connection refused")
+
+        assert self.client.check_health() is False
+
+    @patch("httpx.get")
+    def test_is_available_reuses_cached_state(self, mock_get, tmp_path):
+        """Test a recent probe result spares the next probe."""
+        mock_get.side_effect = httpx.ConnectError("Connection refused")
+        client = OllamaClient(self.host, health_cache=HealthCache(str(tmp_path / "h.json")))
+
+        assert client.is_available() is False
+        assert client.is_available() is False
+        assert mock_get.call_count == 1
+
+    @patch("httpx.post")
+    @patch("click.echo")
+    def test_call_api_connection_error_records_down(self, mock_echo, mock_post, tmp_path):
+        """Test a refused connection is remembered for the next run."""
+        mock_post.side_effect = httpx.ConnectError("Cannot connect")
+        health_cache = HealthCache(str(tmp_path / "h.json"))
+        client = OllamaClient(self.host, health_cache=health_cache)
+
+        with pytest.raises(OllamaUnavailable, match=f"at {self.host}"):
+            client.call_api({"model": "test"})
+
+        assert health_cache.get(self.host) is False
+
+    @patch("httpx.post")
+    @patch("click.echo")
+    def test_call_api_refused_after_cached_probe(self, mock_echo, mock_post, tmp_path):
+        """Test a server that goes down within the health TTL is still reported unavailable."""
+        mock_post.side_effect = httpx.ConnectError("Cannot connect")
+        health_cache = HealthCache(str(tmp_path / "h.json"))
+        health_cache.put(self.host, True)
+        client = OllamaClient(self.host, health_cache=health_cache)
+
+        assert client.is_available(timeout=0.5) is True
+        with pytest.raises(OllamaUnavailable):
+            client.call_api({"model": "test"})
+
+        assert health_cache.get(self.host) is False
+
+    @patch("httpx.stream")
+    def test_stream_api(self, mock_stream):
+        """Test streamed chunks are yielded as they arrive."""
+        mock_response = mock_stream.return_value.__enter__.return_value
+        mock_response.iter_lines.return_value = iter([
+            '{"message": {"content": "In the "}, "done": false}',
+            "",
+            '{"message": {"content": "absurd"}, "done": false}',
+            '{"message": {"content": ""}, "done": true}',
+        ])
+
+        request_data = {"model": "llama3.2", "messages": [], "stream": False, "options": {}}
+
+        chunks = list(self.client.stream_api(request_data, timeout=5.0))
+
+        assert chunks == ["In the ", "absurd"]
+        mock_stream.assert_called_once_with(
+            "POST",
+            f"{self.host}/api/chat",
+            json={**request_data, "stream": True},
+            timeout=5.0,
+        )
+
+
+class TestOllamaClientPool:
+    """Test OllamaClient routing over several fake Ollama servers."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.request_data = {
+            "model": "llama3.2",
+            "messages": [{"role": "user", "content": "test"}],
+            "stream": False,
+            "options": {},
+        }
+
+    def test_hosts_from_comma_separated_list(self):
+        """Test several hosts can be configured at once."""
+        client = OllamaClient("http://gpu-a:11434,http://gpu-b:11434")
+
+        assert client.hosts == ["http://gpu-a:11434", "http://gpu-b:11434"]
+        assert client.host == "http://gpu-a:11434"
+
+    @patch("click.echo")
+    def test_failover_to_next_host(self, mock_echo):
+        """Test a refused connection moves the request to the next host."""
+        with FakeOllama(reply="Second box answers") as fake:
+            client = OllamaClient(f"http://127.0.0.1:9,{fake.url}")
+
+            response = client.call_api(self.request_data)
+
+        assert response["message"]["content"] == "Second box answers"
+        assert client.pool.failures["http://127.0.0.1:9"] == 1
+
+    @patch("click.echo")
+    def test_failing_host_is_ejected(self, mock_echo):
+        """Test repeated failures take a host out of rotation."""
+        with FakeOllama(status=500) as broken, FakeOllama() as healthy:
+            client = OllamaClient(f"{broken.url},{healthy.url}")
+            client.pool.eject_after = 1
+
+            with pytest.raises(SystemExit):
+                client.call_api(self.request_data)
+            response = client.call_api(self.request_data)
+
+        assert client.pool.is_ejected(broken.url)
+        assert len(broken.requests) == 1
+        assert response["message"]["content"] == "One must imagine Sisyphus committing"
+
+    def test_is_available_ejects_unreachable_hosts(self):
+        """Test hosts failing the probe are not routed to."""
+        with FakeOllama() as fake:
+            client = OllamaClient(f"http://127.0.0.1:9,{fake.url}")
+
+            assert client.is_available()
+
+        assert client.pool.available_hosts() == [fake.url]
+
+    @patch("click.echo")
+    def test_hedged_request_wins_on_faster_host(self, mock_echo):
+        """Test a slow first host is raced by a duplicate to a second one."""
+        with FakeOllama(reply="Slow", first_token_delay=2.0) as slow, FakeOllama(
+            reply="Fast"
+        ) as fast:
+            client = OllamaClient(f"{slow.url},{fast.url}", hedge=True)
+            client.pool.samples = [0.05] * 5
+
+            response = client.call_api(self.request_data)
+
+        assert response["message"]["content"] == "Fast"
+        assert response["done"] is True
+        assert [path for path, _ in slow.requests] == ["/api/chat"]
+        assert [path for path, _ in fast.requests] == ["/api/chat"]
+
+    @patch("click.echo")
+    def test_hedged_request_fails_over_refused_connection(self, mock_echo):
+        """Test a host refusing the connection is replaced without waiting to hedge."""
+        with FakeOllama(reply="Rescued") as fake:
+            client = OllamaClient(f"http://127.0.0.1:9,{fake.url}", hedge=True)
+            client.pool.samples = [30.0] * 5
+
+            started = time.monotonic()
+            response = client.call_api(self.request_data)
+
+        assert response["message"]["content"] == "Rescued"
+        assert time.monotonic() - started < 5.0
+        assert client.pool.failures["http://127.0.0.1:9"] == 1
+        assert [path for path, _ in fake.requests] == ["/api/chat"]
+
+    def test_hedged_request_total_timeout(self):
+        """Test the timeout bounds the whole hedged call, not each attempt."""
+        with FakeOllama(first_token_delay=3.0) as slow, FakeOllama(
+            first_token_delay=3.0
+        ) as slower:
+            client = OllamaClient(f"{slow.url},{slower.url}", hedge=True)
+            client.pool.samples = [0.4] * 5
+
+            started = time.monotonic()
+            with pytest.raises(httpx.TimeoutException):
+                client._call_hedged(self.request_data, timeout=1.0)
+
+        assert time.monotonic() - started < 2.0
+        assert len(slower.requests) == 1
+
+    def test_hedged_request_without_hosts(self):
+        """Test an explicit error is raised when the pool has no host to offer."""
+        client = OllamaClient("http://gpu-a:11434,http://gpu-b:11434", hedge=True)
+
+        with patch.object(client.pool, "acquire", return_value=None):
+            with pytest.raises(OllamaUnavailable):
+                client._call_hedged(self.request_data, timeout=1.0)
+
+    @patch("click.echo")
+    def test_hedged_request_not_sent_when_first_host_is_fast(self, mock_echo):
+        """Test no duplicate is sent when the first token arrives in time."""
+        with FakeOllama(reply="Quick") as first, FakeOllama() as second:
+            client = OllamaClient(f"{first.url},{second.url}", hedge=True)
+            client.pool.samples = [1.0] * 5
+
+            response = client.call_api(self.request_data)
+
+        assert response["message"]["content"] == "Quick"
+        assert second.requests == []
+        assert len(client.pool.samples) == 6
+
+    @patch("click.echo")
+    def test_context_reuse_skips_shared_prefix(self, mock_echo):
+        """Test a follow-up on a returned context only sends the new instruction."""
+        request_data = {
+            "model": "llama3.2",
+            "messages": [
+                {"role": "system", "content": "Be Camus about it"},
+                {"role": "user", "content": "a long diff to process"},
+            ],
+            "stream": False,
+            "options": {},
+        }
+        with FakeOllama(reply="Absurd") as fake:
+            client = OllamaClient(fake.url)
+
+            first = client.call_api(request_data, context=[])
+            follow_up = {**request_data, "messages": [{"role": "user", "content": "Shorter"}]}
+            second = client.call_api(follow_up, context=first["context"])
+
+        assert first["message"]["content"] == "Absurd"
+        assert second["message"]["content"] == "Absurd"
+        first_payload, second_payload = fake.requests[0][1], fake.requests[1][1]
+        assert first_payload["system"] == "Be Camus about it"
+        assert "context" not in first_payload
+        assert second_payload["context"] == first["context"]
+        assert second_payload["prompt"] == "Shorter"
+        assert second["prompt_eval_count"] < first["prompt_eval_count"]
+        assert len(second["context"]) > len(first["context"])
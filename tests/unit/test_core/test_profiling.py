@@ -0,0 +1,73 @@
+"""Tests for run profiling module."""
+
+import pstats
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from git_camus.core.profiling import Profiler
+
+
+def busy(n):
+    """Spend a little time in a recognisable function."""
+    return sum(i * i for i in range(n))
+
+
+class TestProfiler:
+    """Test Profiler class."""
+
+    def test_writes_pstats_and_summary(self, tmp_path):
+        """Test the profile and summary are written on exit."""
+        path = tmp_path / "profiles" / "run.prof"
+
+        with Profiler(str(path), top=5):
+            busy(1000)
+
+        stats = pstats.Stats(str(path))
+        assert any(func[2] == "busy" for func in stats.stats)
+        summary = (tmp_path / "profiles" / "run.prof.txt").read_text()
+        assert "Top 5 functions by cumulative time" in summary
+        assert "busy" in summary
+        assert "Peak memory" not in summary
+
+    def test_records_git_commands(self, tmp_path):
+        """Test git subprocesses are timed and others are not."""
+        real_run = subprocess.run
+        with patch("subprocess.run") as mock_run:
+            with Profiler(str(tmp_path / "run.prof")) as profiler:
+                subprocess.check_output(["git", "diff", "--cached"])
+                subprocess.run(["ls"])
+            assert subprocess.run is mock_run
+
+        assert subprocess.run is real_run
+        assert [command for command, _ in profiler.git_calls] == ["git diff --cached"]
+        assert "git diff --cached" in profiler.summary()
+
+    def test_memory(self, tmp_path):
+        """Test memory tracing adds the peak and top allocations."""
+        with Profiler(str(tmp_path / "run.prof"), memory=True) as profiler:
+            data = [bytes(1000) for _ in range(100)]
+
+        assert data
+        assert profiler.peak_memory >= 100_000
+        summary = profiler.summary()
+        assert "Peak memory" in summary
+        assert "Top allocations" in summary
+
+    def test_written_when_run_fails(self, tmp_path):
+        """Test a failing run still leaves its profile behind."""
+        path = tmp_path / "run.prof"
+
+        with pytest.raises(SystemExit):
+            with Profiler(str(path)):
+                raise SystemExit(1)
+
+        assert path.exists()
+
+    def test_unwritable_path(self, tmp_path, capsys):
+        """Test a profile that cannot be written only warns."""
+        with Profiler(str(tmp_path)):
+            pass
+
+        assert "could not write the profile" in capsys.readouterr().err
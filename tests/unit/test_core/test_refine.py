@@ -0,0 +1,118 @@
+"""Tests for interactive refinement module."""
+
+from unittest.mock import Mock, patch
+
+from git_camus.core.ollama_client import OllamaClient, OllamaUnavailable
+from git_camus.core.refine import (
+    MENTION_INSTRUCTION,
+    SHORTER_INSTRUCTION,
+    Conversation,
+    refine_interactively,
+)
+from git_camus.tests.fake_ollama import FakeOllama
+
+
+class TestConversation:
+    """Test Conversation class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.request_data = {
+            "model": "llama3.2",
+            "messages": [
+                {"role": "system", "content": "Be Camus about it"},
+                {"role": "user", "content": "a very long diff"},
+            ],
+            "stream": False,
+            "options": {},
+        }
+
+    @patch("click.echo")
+    def test_ask_continues_context(self, mock_echo):
+        """Test refinements send only the instruction on top of the context."""
+        with FakeOllama(reply="Revolt") as fake:
+            client = OllamaClient(fake.url)
+            first = client.call_api(self.request_data, context=[])
+            conversation = Conversation(client, self.request_data, first)
+
+            message = conversation.ask(SHORTER_INSTRUCTION)
+
+        assert message == "Revolt"
+        path, payload = fake.requests[-1]
+        assert path == "/api/generate"
+        assert payload["prompt"] == SHORTER_INSTRUCTION
+        assert payload["context"] == first["context"]
+        assert "system" not in payload
+        assert conversation.context != first["context"]
+
+    @patch("click.echo")
+    def test_ask_resends_history_without_context(self, mock_echo):
+        """Test refinements fall back to the chat history without a context."""
+        with FakeOllama(reply="Revolt") as fake:
+            client = OllamaClient(fake.url)
+            first = client.call_api(self.request_data)
+            conversation = Conversation(client, self.request_data, first)
+
+            conversation.ask(SHORTER_INSTRUCTION)
+
+        path, payload = fake.requests[-1]
+        assert path == "/api/chat"
+        assert [m["role"] for m in payload["messages"]] == [
+            "system",
+            "user",
+            "assistant",
+            "user",
+        ]
+        assert payload["messages"][-1]["content"] == SHORTER_INSTRUCTION
+
+
+class TestRefineInteractively:
+    """Test refine_interactively function."""
+
+    @patch("click.echo")
+    @patch("click.prompt", return_value="a")
+    def test_accept(self, mock_prompt, mock_echo):
+        """Test accepting returns the message unchanged."""
+        assert refine_interactively("The absurd", Mock()) == "The absurd"
+
+    @patch("click.echo")
+    @patch("click.prompt", return_value="q")
+    def test_quit(self, mock_prompt, mock_echo):
+        """Test quitting returns no message."""
+        assert refine_interactively("The absurd", Mock()) is None
+
+    @patch("click.echo")
+    @patch("click.prompt", side_effect=["m", "rebellion", "a"])
+    def test_mention(self, mock_prompt, mock_echo):
+        """Test asking to mention a topic sends the instruction."""
+        conversation = Mock()
+        conversation.ask.return_value = "The rebellion"
+
+        assert refine_interactively("The absurd", conversation) == "The rebellion"
+        conversation.ask.assert_called_once_with(
+            MENTION_INSTRUCTION.format(topic="rebellion")
+        )
+
+    @patch("click.echo")
+    @patch("click.prompt", side_effect=["s", "a"])
+    def test_unreachable_keeps_message(self, mock_prompt, mock_echo):
+        """Test a refinement that cannot reach Ollama keeps the current message."""
+        conversation = Mock()
+        conversation.ask.side_effect = OllamaUnavailable("Could not connect")
+
+        assert refine_interactively("The absurd", conversation) == "The absurd"
+
+    @patch("click.echo")
+    @patch("click.edit", return_value="Edited by hand\n")
+    @patch("click.prompt", side_effect=["e", "a"])
+    def test_edit(self, mock_prompt, mock_edit, mock_echo):
+        """Test editing replaces the message with the edited text."""
+        assert refine_interactively("The absurd", None) == "Edited by hand"
+
+    @patch("click.echo")
+    @patch("click.prompt", return_value="a")
+    def test_local_message_cannot_be_refined(self, mock_prompt, mock_echo):
+        """Test model choices are not offered without a conversation."""
+        refine_interactively("Roll the boulder", None)
+
+        assert mock_prompt.call_args.args[0] == "[a] accept, [e] edit, [q] quit"
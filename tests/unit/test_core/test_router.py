@@ -0,0 +1,82 @@
+"""Tests for model router module."""
+
+from unittest.mock import Mock
+
+from git_camus.core.config import LatencyProfile, RouteTier
+from git_camus.core.router import ModelRouter
+
+
+def make_diff(lines: int, files: int = 1) -> str:
+    """Build a diff adding a number of lines spread over files."""
+    parts = []
+    for i in range(files):
+        parts.append(f"diff --git a/f{i}.py b/f{i}.py\n--- a/f{i}.py\n+++ b/f{i}.py\n")
+        parts.append("+x\n" * (lines // files))
+    return "".join(parts)
+
+
+class TestModelRouter:
+    """Test ModelRouter class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.tiers = [
+            RouteTier(max_lines=20, max_files=2, models=["llama3.2:1b"]),
+            RouteTier(max_lines=500, models=["llama3.2"]),
+            RouteTier(models=["qwen2.5:14b", "llama3.2"], budget=5.0),
+        ]
+        self.profile = LatencyProfile()
+
+    def test_small_change_gets_small_model(self):
+        """Test a typo fix goes to the smallest tier."""
+        router = ModelRouter(self.tiers)
+
+        assert router.route(make_diff(1), "M  f0.py", self.profile) == "llama3.2:1b"
+
+    def test_many_files_skip_tier(self):
+        """Test the file limit moves small but wide changes up a tier."""
+        router = ModelRouter(self.tiers)
+
+        assert router.route(make_diff(6, files=3), "", self.profile) == "llama3.2"
+
+    def test_large_change_gets_large_model(self):
+        """Test a refactor goes to the unbounded tier."""
+        router = ModelRouter(self.tiers)
+
+        assert router.route(make_diff(3000), "", self.profile) == "qwen2.5:14b"
+
+    def test_no_matching_tier(self):
+        """Test no model is picked when no tier admits the changes."""
+        router = ModelRouter(self.tiers[:1])
+
+        assert router.route(make_diff(100), "", self.profile) is None
+
+    def test_budget_skips_slow_model(self):
+        """Test a model measured too slow for the budget is passed over."""
+        throughput = Mock()
+        throughput.estimate.side_effect = lambda model, *args: {
+            "qwen2.5:14b": 12.0,
+            "llama3.2": 3.0,
+        }[model]
+        router = ModelRouter(self.tiers, throughput)
+
+        assert router.route(make_diff(3000), "", self.profile) == "llama3.2"
+
+    def test_fastest_when_none_fits(self):
+        """Test the fastest candidate is used when none fits the budget."""
+        throughput = Mock()
+        throughput.estimate.side_effect = lambda model, *args: {
+            "qwen2.5:14b": 12.0,
+            "llama3.2": 8.0,
+        }[model]
+        router = ModelRouter(self.tiers, throughput)
+
+        assert router.route(make_diff(3000), "", self.profile) == "llama3.2"
+
+    def test_unmeasured_model_is_tried(self):
+        """Test a model without measurements is given a chance."""
+        throughput = Mock()
+        throughput.estimate.return_value = None
+        router = ModelRouter(self.tiers, throughput)
+
+        assert router.route(make_diff(3000), "", self.profile) == "qwen2.5:14b"
@@ -0,0 +1,125 @@
+"""Tests for settings validation module."""
+
+from dataclasses import asdict
+
+import pytest
+
+from git_camus.core.config import (
+    ApiPrefix,
+    LatencyProfile,
+    OllamaConfig,
+    RouteTier,
+    RunConfig,
+    load_settings,
+)
+from git_camus.core.schema import Settings, check_settings, validation_problems
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    """Work in a repository with a user configuration directory."""
+    (tmp_path / "repo" / ".git").mkdir(parents=True)
+    (tmp_path / "config" / "git-camus").mkdir(parents=True)
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.chdir(tmp_path / "repo")
+    return tmp_path
+
+
+class TestSettings:
+    """Test the validated settings."""
+
+    def test_same_values_as_fast_path(self, repository, monkeypatch):
+        """Test the validated settings match the ones the CLI loads."""
+        (repository / "repo" / ".git-camus.toml").write_text(
+            '[run]\nmodel_name = "repo-model"\n'
+            '[[run.routes]]\nmax_lines = 20\nmodels = ["llama3.2:1b"]\n'
+            "[profiles.fast]\nnum_predict = 32\n"
+        )
+        monkeypatch.setenv("OLLAMA", '{"hedge": true}')
+
+        assert Settings().model_dump() == asdict(load_settings())
+
+    def test_same_conversions_as_fast_path(self, repository):
+        """Test values given as strings are read the same way on both paths."""
+        (repository / "repo" / ".git-camus.toml").write_text(
+            '[run]\ndeadline = "5"\nhistory = "3"\nrecord_stats = "false"\n'
+            '[[run.routes]]\nmax_lines = "20"\nmodels = ["llama3.2:1b"]\n'
+        )
+
+        assert Settings().model_dump() == asdict(load_settings())
+        assert check_settings()[1] == []
+
+    def test_defaults(self, repository):
+        """Test both paths share their defaults."""
+        assert Settings().model_dump() == asdict(load_settings())
+
+
+class TestCheckSettings:
+    """Test check_settings function."""
+
+    def test_valid(self, repository):
+        """Test valid files report no problems."""
+        (repository / "config" / "git-camus" / "config.toml").write_text(
+            '[run]\nlatency_profile = "fast"\n'
+        )
+
+        files, problems = check_settings()
+
+        assert files == [str(repository / "config" / "git-camus" / "config.toml")]
+        assert problems == []
+
+    def test_unknown_key_and_wrong_type(self, repository):
+        """Test typos and wrongly typed values are reported with their file."""
+        path = repository / "repo" / ".git-camus.toml"
+        path.write_text('[run]\nmodle_name = "x"\nhook_deadline = "soon"\n')
+
+        _, problems = check_settings()
+
+        assert len(problems) == 2
+        assert all(problem.startswith(str(path)) for problem in problems)
+        assert any("run.modle_name" in problem for problem in problems)
+        assert any("run.hook_deadline" in problem for problem in problems)
+
+    def test_invalid_toml(self, repository):
+        """Test a file that does not parse is reported."""
+        (repository / "repo" / ".git-camus.toml").write_text("[run\n")
+
+        _, problems = check_settings()
+
+        assert len(problems) == 1
+
+    def test_unknown_latency_profile(self, repository, monkeypatch):
+        """Test the selected latency profile must exist."""
+        monkeypatch.setenv("RUN", '{"latency_profile": "instant"}')
+
+        _, problems = check_settings()
+
+        assert problems == [
+            "run.latency_profile: unknown profile 'instant', "
+            "expected one of: fast, balanced, quality"
+        ]
+
+    def test_unknown_keys_in_every_section(self):
+        """Test typos are caught in nested sections without changing the CLI's dataclasses."""
+        problems = validation_problems(
+            "test",
+            {
+                "ollama": {"hots": "x"},
+                "run": {"routes": [{"models": ["llama3.2:1b"], "max_line": 5}]},
+                "profiles": {"fast": {"num_predit": 32}},
+            },
+        )
+
+        assert [problem.split(":")[1].strip() for problem in problems] == [
+            "ollama.hots",
+            "run.routes.0.max_line",
+            "profiles.fast.num_predit",
+        ]
+        for section in (OllamaConfig, RunConfig, RouteTier, LatencyProfile, ApiPrefix):
+            assert not hasattr(section, "__pydantic_config__")
+
+    def test_route_without_models(self):
+        """Test a route tier needs its models."""
+        problems = validation_problems("test", {"run": {"routes": [{"max_lines": 5}]}})
+
+        assert problems == ["test: run.routes.0.models: Field required"]
@@ -0,0 +1,131 @@
+"""Tests for message similarity module."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from git_camus.core.ollama_client import OllamaClient
+from git_camus.core.similarity import (
+    RecentMessages,
+    cosine_similarity,
+    minhash,
+    shingles,
+    signature_similarity,
+)
+from git_camus.tests.fake_ollama import FakeOllama
+
+
+class TestSketches:
+    """Test shingles and MinHash signatures."""
+
+    def test_shingles(self):
+        """Test shingles are pairs of words, ignoring case and punctuation."""
+        assert shingles("Sisyphus pushes, the Boulder!") == {
+            "sisyphus pushes",
+            "pushes the",
+            "the boulder",
+        }
+        assert shingles("Revolt") == {"revolt"}
+        assert shingles("...") == set()
+
+    def test_signature_similarity(self):
+        """Test signatures estimate how much wording two texts share."""
+        sisyphus = minhash("Sisyphus pushes the boulder up the hill once more")
+        again = minhash("Sisyphus pushes the boulder up the hill once again")
+        stranger = minhash("Meursault shoots a man on the beach at noon")
+
+        assert signature_similarity(sisyphus, sisyphus) == 1.0
+        assert signature_similarity(sisyphus, again) > 0.5
+        assert signature_similarity(sisyphus, stranger) < 0.2
+        assert signature_similarity(sisyphus, minhash("")) == 0.0
+
+    def test_cosine_similarity(self):
+        """Test the cosine of orthogonal, parallel and zero vectors."""
+        assert cosine_similarity([1, 0], [0, 1]) == 0.0
+        assert cosine_similarity([1, 1], [2, 2]) == pytest.approx(1.0)
+        assert cosine_similarity([0, 0], [1, 1]) == 0.0
+
+
+@patch("git_camus.core.similarity.read_recent_messages")
+class TestRecentMessages:
+    """Test RecentMessages class."""
+
+    def test_seeded_from_history_once(self, mock_read, tmp_path):
+        """Test the history is only read when the store does not exist yet."""
+        mock_read.return_value = ["Newest", "Oldest"]
+        recent = RecentMessages(str(tmp_path / "recent.json"))
+
+        assert recent.messages() == ["Oldest", "Newest"]
+        assert recent.messages() == ["Oldest", "Newest"]
+        mock_read.assert_called_once_with(16)
+
+    def test_add_keeps_latest(self, mock_read, tmp_path):
+        """Test the oldest messages are forgotten and repeats moved to the end."""
+        mock_read.return_value = []
+        recent = RecentMessages(str(tmp_path / "recent.json"), max_entries=2)
+
+        for message in ["First", "Second", "First", "Third"]:
+            recent.add(message)
+
+        assert recent.messages() == ["First", "Third"]
+
+    @patch("git_camus.core.similarity.get_head")
+    def test_follow_head(self, mock_head, mock_read, tmp_path):
+        """Test the message at HEAD is remembered once per commit."""
+        mock_read.return_value = []
+        recent = RecentMessages(str(tmp_path / "recent.json"))
+        recent.add("Generated")
+
+        mock_head.return_value = "abc123"
+        mock_read.return_value = ["Generated, then edited"]
+        recent.follow_head()
+        recent.follow_head()
+
+        assert recent.messages() == ["Generated", "Generated, then edited"]
+        assert mock_read.call_count == 2
+
+    @patch("git_camus.core.similarity.get_head", return_value="abc123")
+    def test_follow_head_after_add(self, mock_head, mock_read, tmp_path):
+        """Test the commit git-camus made is not read back from git."""
+        mock_read.return_value = []
+        recent = RecentMessages(str(tmp_path / "recent.json"))
+        recent.messages()
+
+        recent.add("Generated", head="abc123")
+        recent.follow_head()
+
+        assert recent.messages() == ["Generated"]
+        assert mock_read.call_count == 1
+
+    def test_closest(self, mock_read, tmp_path):
+        """Test the message sharing the most wording is found without git."""
+        mock_read.return_value = [
+            "Sisyphus pushes the boulder up the hill once more",
+            "Meursault shoots a man on the beach at noon",
+        ]
+        recent = RecentMessages(str(tmp_path / "recent.json"))
+        recent.messages()
+
+        repeated, score = recent.closest("Sisyphus pushes the boulder up the hill once again")
+
+        assert repeated == "Sisyphus pushes the boulder up the hill once more"
+        assert score > 0.5
+        assert RecentMessages(str(tmp_path / "empty.json")).closest("x") == (None, 0.0)
+
+    def test_closest_by_meaning_stores_embeddings(self, mock_read, tmp_path):
+        """Test remembered messages are embedded once, in the candidate's request."""
+        mock_read.return_value = ["the boulder rolls down", "a man on the beach"]
+        recent = RecentMessages(str(tmp_path / "recent.json"))
+
+        with FakeOllama() as fake:
+            client = OllamaClient(fake.url)
+            first = recent.closest_by_meaning("down rolls the boulder", client, "embed", 5.0)
+            second = recent.closest_by_meaning("the beach man", client, "embed", 5.0)
+
+        assert first == ("the boulder rolls down", pytest.approx(1.0))
+        assert second[0] == "a man on the beach"
+        assert [len(payload["input"]) for _, payload in fake.requests] == [3, 1]
+        stored = json.loads((tmp_path / "recent.json").read_text())
+        assert stored["model"] == "embed"
+        assert all(entry["vector"] for entry in stored["messages"])
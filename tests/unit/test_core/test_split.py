@@ -0,0 +1,190 @@
+"""Tests for staged change splitting module."""
+
+import subprocess
+from collections import Counter
+
+import pytest
+
+from git_camus.core.split import (
+    ChangeGroup,
+    commit_groups,
+    group_files,
+    read_co_changes,
+    split_diff,
+    split_staged_changes,
+)
+
+
+def git(*args):
+    """Run git in the test repository and return its output."""
+    return subprocess.check_output(["git", *args], text=True).strip()
+
+
+def write(path, text):
+    """Write a file of the test repository, creating its directory."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    """Work in a git repository with one commit."""
+    for variable in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{variable}_NAME", "Sisyphus")
+        monkeypatch.setenv(f"GIT_{variable}_EMAIL", "sisyphus@example.com")
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    monkeypatch.chdir(tmp_path)
+    write(tmp_path / "hill" / "boulder.txt", "The boulder rests\n")
+    write(tmp_path / "sea" / "beach.txt", "The sun on the beach\n")
+    git("add", ".")
+    git("commit", "-q", "-m", "Initial stone")
+    return tmp_path
+
+
+class TestSplitDiff:
+    """Test split_diff function."""
+
+    def test_split_diff(self):
+        """Test every file gets its own part, headers included, named from the path list."""
+        diff = (
+            "diff --git a/hill/boulder.txt b/hill/boulder.txt\n"
+            "+rolls\n"
+            'diff --git "a/sea side/caf\\303\\251.txt" "b/sea side/caf\\303\\251.txt"\n'
+            "+shines\n"
+        )
+
+        parts = split_diff(diff, ["hill/boulder.txt", "sea side/café.txt"])
+
+        assert list(parts) == ["hill/boulder.txt", "sea side/café.txt"]
+        assert parts["hill/boulder.txt"].endswith("+rolls\n")
+        assert parts["sea side/café.txt"].endswith("+shines\n")
+        assert split_diff("", []) == {}
+
+    def test_split_diff_mismatch(self):
+        """Test a diff that does not match the path list is rejected."""
+        with pytest.raises(ValueError):
+            split_diff("diff --git a/x b/x\n+x\n", ["x", "y"])
+
+
+class TestGroupFiles:
+    """Test group_files function."""
+
+    def test_groups_by_directory(self):
+        """Test files of one directory stay together, others are apart."""
+        parts = {
+            "hill/boulder.txt": "+the boulder rolls down again\n",
+            "sea/beach.txt": "+a man walks on the beach at noon\n",
+            "hill/summit.txt": "+the summit is never reached\n",
+        }
+
+        assert group_files(parts) == [["hill/boulder.txt", "hill/summit.txt"], ["sea/beach.txt"]]
+
+    def test_groups_by_co_changes(self):
+        """Test files often committed together stay together."""
+        parts = {
+            "hill/boulder.txt": "+the boulder rolls down again\n",
+            "sea/beach.txt": "+a man walks on the beach at noon\n",
+        }
+
+        assert len(group_files(parts, Counter({("hill/boulder.txt", "sea/beach.txt"): 1}))) == 2
+        assert len(group_files(parts, Counter({("hill/boulder.txt", "sea/beach.txt"): 2}))) == 1
+
+    def test_groups_by_diff_similarity(self):
+        """Test the same change made in several directories stays together."""
+        parts = {
+            "hill/boulder.txt": "-import absurd from hope\n+import absurd from revolt\n",
+            "sea/beach.txt": "-import absurd from hope\n+import absurd from revolt\n",
+            "city/plague.txt": "+the rats come out to die\n",
+        }
+
+        assert group_files(parts) == [
+            ["hill/boulder.txt", "sea/beach.txt"],
+            ["city/plague.txt"],
+        ]
+
+
+class TestReadCoChanges:
+    """Test read_co_changes function."""
+
+    def test_read_co_changes(self, repository):
+        """Test commits changing two of the files are counted per pair."""
+        write(repository / "hill" / "boulder.txt", "The boulder rolls\n")
+        write(repository / "sea" / "beach.txt", "The sun burns\n")
+        git("commit", "-q", "-am", "Both again")
+
+        assert read_co_changes(["hill/boulder.txt", "sea/beach.txt", "city/plague.txt"]) == {
+            ("hill/boulder.txt", "sea/beach.txt"): 2
+        }
+
+    def test_unusual_paths(self, repository):
+        """Test paths with spaces and non-ASCII characters are read as they are."""
+        for _ in range(2):
+            write(repository / "sea side" / "café.txt", f"{_}\n")
+            write(repository / "hill" / "boulder.txt", f"{_}\n")
+            git("add", ".")
+            git("commit", "-q", "-m", "Together")
+
+        assert read_co_changes(["sea side/café.txt", "hill/boulder.txt"]) == {
+            ("hill/boulder.txt", "sea side/café.txt"): 2
+        }
+
+
+class TestChangeGroup:
+    """Test ChangeGroup class."""
+
+    def test_status(self):
+        """Test only the status lines of the group's files are kept."""
+        group = ChangeGroup(["hill/boulder.txt", "sea/shore.txt"], "")
+        status = "M  hill/boulder.txt\nM  city/plague.txt\nR  sea/beach.txt -> sea/shore.txt\n"
+
+        assert group.status(status) == "M  hill/boulder.txt\nR  sea/beach.txt -> sea/shore.txt\n"
+        assert ChangeGroup(["elsewhere"], "").status(status) == ""
+
+    def test_status_quoted_path(self):
+        """Test paths git quotes in the status are matched."""
+        group = ChangeGroup(["sea side/café.txt"], "")
+
+        assert group.status('A  "sea side/caf\\303\\251.txt"\n') == (
+            'A  "sea side/caf\\303\\251.txt"\n'
+        )
+
+
+class TestCommitGroups:
+    """Test splitting and committing the staged changes."""
+
+    def test_commits_each_group(self, repository):
+        """Test one commit per group, leaving the working tree and unstaged changes alone."""
+        write(repository / "hill" / "boulder.txt", "The boulder rolls down\n")
+        write(repository / "sea" / "shells.txt", "Shells in the sand\n")
+        git("rm", "-q", "sea/beach.txt")
+        git("add", "hill", "sea")
+        write(repository / "hill" / "boulder.txt", "The boulder rolls down once more\n")
+        staged_tree = git("write-tree")
+        head = git("rev-parse", "HEAD")
+
+        groups = split_staged_changes()
+        commits = commit_groups(groups, ["Push the boulder", "Leave the beach"])
+
+        assert [group.paths for group in groups] == [
+            ["hill/boulder.txt"],
+            ["sea/beach.txt", "sea/shells.txt"],
+        ]
+        assert git("rev-parse", "HEAD") == commits[1]
+        assert git("log", "--format=%s", f"{head}..HEAD") == "Leave the beach\nPush the boulder"
+        assert git("diff", "--name-only", f"{head}", commits[0]) == "hill/boulder.txt"
+        assert git("rev-parse", "HEAD^{tree}") == staged_tree
+        assert git("status", "--porcelain") == "M hill/boulder.txt"
+        assert (repository / "hill" / "boulder.txt").read_text().endswith("once more\n")
+        assert git("reflog", "-1", "--format=%gs") == "commit (split): Leave the beach"
+
+    def test_incomplete_groups_leave_head(self, repository):
+        """Test HEAD stays put when the groups miss some staged changes."""
+        write(repository / "hill" / "boulder.txt", "The boulder rolls down\n")
+        write(repository / "sea" / "beach.txt", "The sun burns\n")
+        git("add", ".")
+        head = git("rev-parse", "HEAD")
+
+        with pytest.raises(subprocess.CalledProcessError):
+            commit_groups([ChangeGroup(["hill/boulder.txt"], "")], ["Push the boulder"])
+
+        assert git("rev-parse", "HEAD") == head
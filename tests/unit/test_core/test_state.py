@@ -0,0 +1,51 @@
+"""Tests for state module."""
+
+import os
+from unittest.mock import patch
+
+from git_camus.core.state import read_json, user_cache_dir, write_json
+
+
+class TestUserCacheDir:
+    """Test user_cache_dir function."""
+
+    def test_xdg_cache_home(self):
+        """Test XDG_CACHE_HOME is honoured."""
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": "/xdg"}):
+            assert user_cache_dir() == "/xdg/git-camus"
+
+    def test_default(self):
+        """Test the default cache directory is under the home directory."""
+        with patch.dict(os.environ, {"HOME": "/home/sisyphus"}, clear=True):
+            assert user_cache_dir() == "/home/sisyphus/.cache/git-camus"
+
+
+class TestJsonState:
+    """Test read_json and write_json functions."""
+
+    def test_round_trip(self, tmp_path):
+        """Test written objects are read back."""
+        path = str(tmp_path / "nested" / "state.json")
+
+        write_json(path, {"key": [1, 2]})
+
+        assert read_json(path) == {"key": [1, 2]}
+        assert os.listdir(tmp_path / "nested") == ["state.json"]
+
+    def test_missing_file(self, tmp_path):
+        """Test a missing file reads as empty."""
+        assert read_json(str(tmp_path / "missing.json")) == {}
+
+    def test_non_object(self, tmp_path):
+        """Test a file not holding an object reads as empty."""
+        path = tmp_path / "state.json"
+        path.write_text("[1, 2]")
+
+        assert read_json(str(path)) == {}
+
+    def test_unwritable_directory(self, tmp_path):
+        """Test write errors are swallowed."""
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+
+        write_json(str(blocker / "state.json"), {"key": 1})
@@ -0,0 +1,103 @@
+"""Tests for run statistics module."""
+
+import pytest
+
+from git_camus.core.stats import Histogram, RunLog, run_record, summarize
+from git_camus.core.timings import Timings
+
+
+class TestRunLog:
+    """Test RunLog class."""
+
+    def test_append_and_read(self, tmp_path):
+        """Test records are read back in order."""
+        log = RunLog(str(tmp_path / "runs.jsonl"))
+
+        log.append({"ts": 1.0, "model": "a"})
+        log.append({"ts": 2.0, "model": "b"})
+
+        assert [r["model"] for r in log.records()] == ["a", "b"]
+
+    def test_since(self, tmp_path):
+        """Test older records are skipped."""
+        log = RunLog(str(tmp_path / "runs.jsonl"))
+        log.append({"ts": 1.0, "model": "a"})
+        log.append({"ts": 2.0, "model": "b"})
+
+        assert [r["model"] for r in log.records(since=1.5)] == ["b"]
+
+    def test_rotation(self, tmp_path):
+        """Test the log rotates and drops the oldest files."""
+        log = RunLog(str(tmp_path / "runs.jsonl"), max_bytes=1, backups=2)
+
+        for i in range(4):
+            log.append({"ts": float(i), "model": "a"})
+
+        assert [r["ts"] for r in log.records()] == [1.0, 2.0, 3.0]
+        assert len(log.files()) == 3
+
+    def test_corrupt_lines_skipped(self, tmp_path):
+        """Test unreadable lines do not stop the reading."""
+        path = tmp_path / "runs.jsonl"
+        path.write_text('{"ts": 1.0}\nnot json\n[1]\n{"ts": 2.0}\n')
+
+        assert [r["ts"] for r in RunLog(str(path)).records()] == [1.0, 2.0]
+
+
+class TestHistogram:
+    """Test Histogram class."""
+
+    def test_empty(self):
+        """Test an empty histogram has no quantiles."""
+        assert Histogram().quantile(0.5) is None
+
+    def test_quantiles_within_precision(self):
+        """Test quantiles are accurate to the bucket precision."""
+        histogram = Histogram(precision=0.01)
+        for i in range(1, 1001):
+            histogram.add(i / 100)
+
+        assert histogram.quantile(0.50) == pytest.approx(5.0, rel=0.01)
+        assert histogram.quantile(0.99) == pytest.approx(9.9, rel=0.01)
+
+    def test_memory_bounded(self):
+        """Test the number of buckets does not grow with the number of values."""
+        histogram = Histogram()
+        for _ in range(10000):
+            histogram.add(1.5)
+
+        assert len(histogram.buckets) == 1
+
+
+class TestSummarize:
+    """Test run_record and summarize functions."""
+
+    def test_run_record(self):
+        """Test a record carries sizes and Ollama's counts."""
+        clock = Timings()
+        clock.record_response({"eval_count": 12, "eval_duration": 600_000_000})
+
+        record = run_record(clock, "run", "llama3.2", "diff", "msg", fallback=True)
+
+        assert record["diff_bytes"] == 4
+        assert record["message_bytes"] == 3
+        assert record["eval_count"] == 12
+        assert record["eval_seconds"] == 0.6
+        assert record["fallback"] is True
+        assert record["cache_hit"] is None
+
+    def test_summarize_per_model(self):
+        """Test records are aggregated per model."""
+        records = [
+            {"model": "a", "duration": 1.0, "cache_hit": True, "fallback": False},
+            {"model": "a", "duration": 2.0, "cache_hit": None, "fallback": True},
+            {"model": "b", "duration": 0.5, "eval_count": 10, "eval_seconds": 0.5},
+        ]
+
+        stats = {name: s.to_dict() for name, s in summarize(iter(records)).items()}
+
+        assert stats["a"]["runs"] == 2
+        assert stats["a"]["cache_hit_rate"] == 1.0
+        assert stats["a"]["fallback_rate"] == 0.5
+        assert stats["a"]["tokens_per_second"] is None
+        assert stats["b"]["tokens_per_second"] == 20.0
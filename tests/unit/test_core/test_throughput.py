@@ -0,0 +1,61 @@
+"""Tests for throughput statistics module."""
+
+from git_camus.core.throughput import ThroughputStats, tokens_per_second
+
+
+class TestTokensPerSecond:
+    """Test tokens_per_second function."""
+
+    def test_rate(self):
+        """Test speeds are computed from nanosecond durations."""
+        assert tokens_per_second(50, 500_000_000) == 100.0
+
+    def test_missing_or_zero(self):
+        """Test unmeasurable values give no speed."""
+        assert tokens_per_second(None, 1000) is None
+        assert tokens_per_second(10, 0) is None
+
+
+class TestThroughputStats:
+    """Test ThroughputStats class."""
+
+    def test_unknown_model(self, tmp_path):
+        """Test models never measured have no speeds or estimate."""
+        stats = ThroughputStats(str(tmp_path / "throughput.json"))
+
+        assert stats.get("llama3.2") == {}
+        assert stats.estimate("llama3.2", 1000, 64) is None
+
+    def test_record_and_estimate(self, tmp_path):
+        """Test recorded speeds give a time estimate."""
+        stats = ThroughputStats(str(tmp_path / "throughput.json"))
+
+        stats.record(
+            "llama3.2",
+            {
+                "prompt_eval_count": 1000,
+                "prompt_eval_duration": 1_000_000_000,
+                "eval_count": 20,
+                "eval_duration": 1_000_000_000,
+            },
+        )
+
+        assert stats.get("llama3.2") == {"prompt": 1000.0, "eval": 20.0}
+        assert stats.estimate("llama3.2", 2000, 40) == 4.0
+
+    def test_moving_average(self, tmp_path):
+        """Test new measurements are blended into the previous speed."""
+        stats = ThroughputStats(str(tmp_path / "throughput.json"), smoothing=0.5)
+
+        stats.record("llama3.2", {"eval_count": 10, "eval_duration": 1_000_000_000})
+        stats.record("llama3.2", {"eval_count": 30, "eval_duration": 1_000_000_000})
+
+        assert stats.get("llama3.2") == {"eval": 20.0}
+
+    def test_response_without_stats_ignored(self, tmp_path):
+        """Test responses without timing fields leave no trace."""
+        stats = ThroughputStats(str(tmp_path / "throughput.json"))
+
+        stats.record("llama3.2", {"message": {"content": "msg"}})
+
+        assert not (tmp_path / "throughput.json").exists()
@@ -0,0 +1,78 @@
+"""Tests for run timings module."""
+
+import json
+from unittest.mock import patch
+
+from git_camus.core.timings import Timings
+
+RESPONSE = {
+    "message": {"content": "msg"},
+    "total_duration": 1_500_000_000,
+    "load_duration": 200_000_000,
+    "prompt_eval_count": 400,
+    "prompt_eval_duration": 500_000_000,
+    "eval_count": 30,
+    "eval_duration": 750_000_000,
+}
+
+
+class TestTimings:
+    """Test Timings class."""
+
+    @patch("git_camus.core.timings.time.perf_counter")
+    def test_phases_add_up(self, mock_clock):
+        """Test repeated phases accumulate their durations."""
+        mock_clock.side_effect = [0.0, 1.0, 1.5, 2.0, 2.25, 3.0]
+        clock = Timings()
+
+        with clock.phase("git"):
+            pass
+        with clock.phase("git"):
+            pass
+
+        assert clock.to_dict() == {"phases": {"git": 0.75}, "total": 3.0}
+
+    @patch("git_camus.core.timings.time.perf_counter")
+    def test_ollama_breakdown(self, mock_clock):
+        """Test Ollama's durations, speeds and overhead are reported."""
+        mock_clock.side_effect = [0.0, 1.0, 3.0, 4.0]
+        clock = Timings()
+        with clock.phase("ollama"):
+            pass
+
+        clock.record_response(RESPONSE)
+        ollama = clock.to_dict()["ollama"]
+
+        assert ollama["load"] == 0.2
+        assert ollama["prompt_eval"] == 0.5
+        assert ollama["prompt_eval_count"] == 400
+        assert ollama["prompt_tokens_per_second"] == 800.0
+        assert ollama["eval_tokens_per_second"] == 40.0
+        assert ollama["overhead"] == 0.5
+
+    def test_no_ollama_without_response(self):
+        """Test runs without a response have no Ollama section."""
+        assert "ollama" not in Timings().to_dict()
+
+    def test_format_text(self):
+        """Test the text report lists phases and token speeds."""
+        clock = Timings()
+        with clock.phase("git"):
+            pass
+        clock.record_response(RESPONSE)
+
+        report = clock.format()
+
+        assert report.startswith("Timings:\n  git")
+        assert "prefill" in report
+        assert "30 tokens at 40.0 tokens/s" in report
+
+    def test_format_json(self):
+        """Test the JSON report is a single parsable line."""
+        clock = Timings()
+        clock.record_response(RESPONSE)
+
+        report = clock.format("json")
+
+        assert "\n" not in report
+        assert json.loads(report)["ollama"]["eval_count"] == 30
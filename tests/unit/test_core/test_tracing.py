@@ -0,0 +1,143 @@
+"""Tests for span tracing module."""
+
+import json
+
+import pytest
+
+from git_camus.core import tracing
+
+
+def read_traces(path):
+    """Read the exported trace requests from a file."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def spans_of(request):
+    """Get the spans of an exported trace request."""
+    return request["resourceSpans"][0]["scopeSpans"][0]["spans"]
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    """Turn tracing on for a test and off again afterwards."""
+    path = tmp_path / "trace.jsonl"
+    tracing.configure(str(path))
+    yield path
+    tracing.configure(None)
+
+
+class TestDisabled:
+    """Test tracing while it is off."""
+
+    def test_noop_span(self, tmp_path):
+        """Test spans are a shared no-op and nothing is written."""
+        tracing.configure(None)
+
+        with tracing.span("work", size=1) as span:
+            span.set_attribute("key", "value")
+
+        assert span is tracing.current_span()
+        assert not tracing.enabled()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_traced_calls_through(self):
+        """Test a traced function runs normally."""
+        tracing.configure(None)
+
+        @tracing.traced("double")
+        def double(value):
+            return value * 2
+
+        assert double(2) == 4
+
+
+class TestEnabled:
+    """Test tracing while it is on."""
+
+    def test_nested_spans(self, trace_file):
+        """Test nested spans are exported together as one trace."""
+        with tracing.span("root", command="run"):
+            with tracing.span("child") as child:
+                child.set_attribute("git.diff.bytes", 42)
+                child.set_attribute("ignored", None)
+
+        requests = read_traces(trace_file)
+        assert len(requests) == 1
+        spans = {span["name"]: span for span in spans_of(requests[0])}
+        assert spans["root"]["traceId"] == spans["child"]["traceId"]
+        assert spans["child"]["parentSpanId"] == spans["root"]["spanId"]
+        assert "parentSpanId" not in spans["root"]
+        assert spans["child"]["attributes"] == [
+            {"key": "git.diff.bytes", "value": {"intValue": "42"}}
+        ]
+        assert spans["root"]["status"] == {"code": 1}
+
+    def test_separate_traces(self, trace_file):
+        """Test each root span is exported as its own line."""
+        with tracing.span("first"):
+            pass
+        with tracing.span("second"):
+            pass
+
+        requests = read_traces(trace_file)
+        assert [spans_of(r)[0]["name"] for r in requests] == ["first", "second"]
+        assert spans_of(requests[0])[0]["traceId"] != spans_of(requests[1])[0]["traceId"]
+
+    def test_error_status(self, trace_file):
+        """Test a failing block marks its span as an error."""
+        with pytest.raises(ValueError):
+            with tracing.span("fail"):
+                raise ValueError("boom")
+
+        span = spans_of(read_traces(trace_file)[0])[0]
+        assert span["status"] == {"code": 2, "message": "ValueError: boom"}
+
+    def test_clean_exit_is_not_an_error(self, trace_file):
+        """Test exiting with status 0 leaves the span status ok."""
+        with pytest.raises(SystemExit):
+            with tracing.span("exit"):
+                raise SystemExit(0)
+
+        span = spans_of(read_traces(trace_file)[0])[0]
+        assert span["status"] == {"code": 1}
+
+    def test_traced_decorator(self, trace_file):
+        """Test a traced function gets its own span."""
+
+        @tracing.traced("double")
+        def double(value):
+            tracing.current_span().set_attribute("value", value)
+            return value * 2
+
+        assert double(2) == 4
+
+        span = spans_of(read_traces(trace_file)[0])[0]
+        assert span["name"] == "double"
+        assert {"key": "value", "value": {"intValue": "2"}} in span["attributes"]
+
+    def test_unwritable_file(self, tmp_path):
+        """Test a trace file that cannot be written is ignored."""
+        tracing.configure(str(tmp_path))
+        try:
+            with tracing.span("work"):
+                pass
+        finally:
+            tracing.configure(None)
+
+
+class TestOtlpAttribute:
+    """Test otlp_attribute function."""
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            (True, {"boolValue": True}),
+            (3, {"intValue": "3"}),
+            (0.5, {"doubleValue": 0.5}),
+            ("llama3", {"stringValue": "llama3"}),
+        ],
+    )
+    def test_value_types(self, value, expected):
+        """Test values are converted to their OTLP types."""
+        assert tracing.otlp_attribute("key", value) == {"key": "key", "value": expected}